@@ -4,7 +4,20 @@ Central API router: includes all route modules.
 
 from fastapi import APIRouter
 
-from app.api.routes import auth, dashboard, files, projects, users, versions
+from app.api.routes import (
+    auth,
+    dashboard,
+    deletions,
+    files,
+    jobs,
+    metrics,
+    projects,
+    search,
+    storage,
+    updates,
+    users,
+    versions,
+)
 
 api_router = APIRouter()
 
@@ -12,5 +25,11 @@ api_router.include_router(auth.router)
 api_router.include_router(projects.router)
 api_router.include_router(versions.router)
 api_router.include_router(files.router)
+api_router.include_router(updates.router)
+api_router.include_router(search.router)
 api_router.include_router(dashboard.router)
 api_router.include_router(users.router)
+api_router.include_router(deletions.router)
+api_router.include_router(jobs.router)
+api_router.include_router(storage.router)
+api_router.include_router(metrics.router)
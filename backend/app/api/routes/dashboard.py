@@ -2,19 +2,85 @@
 Dashboard API route.
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
 
-from app.core.dependencies import CurrentUser, DbDep
+from app.core.coalesce import coalesce
+from app.core.config import get_settings
+from app.core.dependencies import CurrentUser, DbDep, FileUser
+from app.core.events import event_bus
+from app.core.executors import Workload, run_in
+from app.models.user import UserRole
 from app.schemas.common import BaseResponse
-from app.schemas.dashboard import DashboardStats
+from app.schemas.dashboard import DashboardDownloadAnalytics, DashboardStats, DashboardTopFile
+from app.services.access import project_access
 from app.services.dashboard import DashboardService
 
+settings = get_settings()
+
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
 
 @router.get("/stats", response_model=BaseResponse[DashboardStats])
-def get_stats(db: DbDep, _user: CurrentUser):
+async def get_stats(db: DbDep, current_user: CurrentUser):
     """Get aggregated dashboard statistics."""
-    service = DashboardService(db)
-    stats = service.get_stats()
+    # Everyone with the same project set sees the same stats.
+    scope = None
+    if current_user.role != UserRole.ADMIN:
+        scope = await run_in(Workload.API, project_access.allowed_projects, db, current_user.id)
+    stats = await coalesce(
+        "dashboard_stats", (scope,), lambda session: DashboardService(session).get_stats(current_user)
+    )
     return BaseResponse.ok(stats)
+
+
+@router.get("/events", response_class=StreamingResponse)
+def stream_events(db: DbDep, current_user: CurrentUser):
+    """
+    Server-Sent Events with incremental dashboard updates: downloads, uploads,
+    deletions and counter changes to apply to /dashboard/stats. Browsers pass
+    the token as ?token=, since EventSource cannot set headers.
+    """
+    allowed = None
+    if current_user.role != UserRole.ADMIN:
+        allowed = project_access.allowed_projects(db, current_user.id)
+    return StreamingResponse(
+        event_bus.stream(allowed),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/downloads", response_model=BaseResponse[DashboardDownloadAnalytics])
+def get_download_analytics(
+    db: DbDep,
+    _user: CurrentUser,
+    days: int = Query(30, ge=1, le=settings.ANALYTICS_MAX_DAYS),
+):
+    """Downloads and estimated unique client IPs per day over the last `days` days."""
+    service = DashboardService(db)
+    return BaseResponse.ok(service.get_download_analytics(days))
+
+
+@router.get("/files/{file_id}/downloads", response_model=BaseResponse[DashboardDownloadAnalytics])
+def get_file_download_analytics(
+    file_id: int,
+    db: DbDep,
+    _user: FileUser,
+    days: int = Query(30, ge=1, le=settings.ANALYTICS_MAX_DAYS),
+):
+    """Downloads and estimated unique client IPs of one file per day."""
+    service = DashboardService(db)
+    return BaseResponse.ok(service.get_download_analytics(days, file_id))
+
+
+@router.get("/top-files", response_model=BaseResponse[list[DashboardTopFile]])
+def get_top_files(
+    db: DbDep,
+    current_user: CurrentUser,
+    days: int = Query(7, ge=1, le=settings.ANALYTICS_MAX_DAYS),
+    limit: int = Query(10, ge=1, le=100),
+):
+    """Most downloaded files over the last `days` days, among the projects the caller can see."""
+    service = DashboardService(db)
+    return BaseResponse.ok(service.get_top_files(current_user, days, limit))
@@ -0,0 +1,31 @@
+"""
+Deletion task API routes: progress of background project/version deletions.
+"""
+
+from fastapi import APIRouter
+
+from app.core.dependencies import AdminUser, DbDep
+from app.core.executors import Workload, workload
+from app.schemas.common import BaseResponse
+from app.schemas.deletion import DeletionTaskRead
+from app.services.deletion import DeletionService
+
+router = APIRouter(prefix="/deletions", tags=["Deletions"])
+
+
+@router.get("", response_model=BaseResponse[list[DeletionTaskRead]])
+@workload(Workload.ADMIN)
+def list_deletions(db: DbDep, _admin: AdminUser):
+    """List recent deletion tasks. Admin only."""
+    service = DeletionService(db)
+    tasks = service.list_tasks()
+    return BaseResponse.ok(tasks)
+
+
+@router.get("/{task_id}", response_model=BaseResponse[DeletionTaskRead])
+@workload(Workload.ADMIN)
+def get_deletion(task_id: int, db: DbDep, _admin: AdminUser):
+    """Get progress of a deletion task. Admin only."""
+    service = DeletionService(db)
+    task = service.get_task(task_id)
+    return BaseResponse.ok(task)
@@ -2,50 +2,132 @@
 APK files API routes: upload, list, download, delete.
 """
 
-from fastapi import APIRouter, Request, UploadFile
+from typing import Annotated, Optional
 
-from app.core.dependencies import AdminUser, CurrentUser, DbDep
-from app.schemas.apk_file import APKFileDetail, APKFileRead
+from fastapi import APIRouter, Depends, Query, Request, UploadFile
+
+from app.core.coalesce import coalesce
+from app.core.dependencies import AdminUser, DbDep, FileUser, ProjectUser, VersionUser
+from app.core.executors import Workload, workload
+from app.schemas.apk_file import (
+    APKFileDetail,
+    APKFileFilters,
+    APKFileRead,
+    BatchUploadResult,
+    UploadCheckRequest,
+    UploadCheckResult,
+)
 from app.schemas.common import BaseResponse
 from app.services.apk_file import APKFileService
+from app.services.download_analytics import download_analytics
+from app.utils.client_ip import get_client_ip
 
 router = APIRouter(tags=["APK Files"])
 
 
 @router.post("/versions/{version_id}/upload", response_model=BaseResponse[APKFileRead], status_code=201)
-async def upload_apk(version_id: int, file: UploadFile, db: DbDep, current_user: CurrentUser):
+async def upload_apk(
+    version_id: int, file: UploadFile, request: Request, db: DbDep, current_user: VersionUser
+):
     """Upload an APK file to a version."""
     service = APKFileService(db)
-    apk = await service.upload_apk(version_id, file, current_user)
+    # The volume upload admission checked and reserved space on.
+    volume_id = getattr(request.state, "upload_volume", None)
+    apk = await service.upload_apk(version_id, file, current_user, volume_id)
     return BaseResponse.ok(apk)
 
 
+@router.post("/versions/{version_id}/upload/check", response_model=BaseResponse[UploadCheckResult])
+def check_upload(version_id: int, payload: UploadCheckRequest, db: DbDep, current_user: VersionUser):
+    """
+    Announce an upload by SHA-256 and size. If the bytes are already stored the
+    file is added to the version by reference ("created"); otherwise upload it
+    ("upload_required").
+    """
+    service = APKFileService(db)
+    result = service.check_upload(version_id, payload, current_user)
+    return BaseResponse.ok(result)
+
+
+@router.post(
+    "/versions/{version_id}/upload/batch",
+    response_model=BaseResponse[BatchUploadResult],
+    status_code=201,
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"files": {"type": "array", "items": {"type": "string", "format": "binary"}}},
+                    }
+                },
+                "application/x-tar": {"schema": {"type": "string", "format": "binary"}},
+            }
+        }
+    },
+)
+async def upload_batch(version_id: int, request: Request, db: DbDep, current_user: VersionUser):
+    """Upload several APK files to a version in one request, as multipart files or a tar archive."""
+    service = APKFileService(db)
+    volume_id = getattr(request.state, "upload_volume", None)
+    result = await service.upload_batch(version_id, request, current_user, volume_id)
+    return BaseResponse.ok(result)
+
+
 @router.get("/versions/{version_id}/files", response_model=BaseResponse[list[APKFileDetail]])
-def list_files(version_id: int, db: DbDep, _user: CurrentUser):
-    """List all APK files for a version."""
+async def list_files(
+    version_id: int,
+    filters: Annotated[APKFileFilters, Depends()],
+    _user: VersionUser,
+):
+    """List APK files for a version, optionally filtered by manifest metadata."""
+    files = await coalesce(
+        "list_files",
+        (version_id, filters.model_dump_json()),
+        lambda db: APKFileService(db).list_files(version_id, filters),
+    )
+    return BaseResponse.ok(files)
+
+
+@router.get("/projects/{project_id}/files", response_model=BaseResponse[list[APKFileDetail]])
+def list_project_files(
+    project_id: int,
+    filters: Annotated[APKFileFilters, Depends()],
+    db: DbDep,
+    _user: ProjectUser,
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """Find APK files across all versions of a project by manifest metadata."""
     service = APKFileService(db)
-    files = service.list_files(version_id)
+    files = service.list_project_files(project_id, filters, limit)
     return BaseResponse.ok(files)
 
 
 @router.get("/files/{file_id}/download")
-def download_file(file_id: int, request: Request, db: DbDep, _user: CurrentUser):
-    """Download an APK file by ID."""
+@workload(Workload.DOWNLOAD)
+def download_file(
+    file_id: int,
+    request: Request,
+    db: DbDep,
+    _user: FileUser,
+    from_sha256: Optional[str] = Query(None, pattern="^[0-9a-fA-F]{64}$"),
+):
+    """
+    Download an APK file by ID.
+
+    With `from_sha256` (the checksum of an APK of this project the client
+    already has) the response may be a patch (application/x-apk-delta) instead.
+    """
     from app.repositories.download_log import DownloadLogRepository
-    
-    # Get client IP, handle potential reverse proxy headers
-    client_ip = request.headers.get("X-Forwarded-For")
-    if not client_ip:
-        client_ip = request.client.host if request.client else "unknown"
-    else:
-        # X-Forwarded-For can contain multiple IPs separated by commas
-        client_ip = client_ip.split(",")[0].strip()
-        
+
+    client_ip = get_client_ip(request.headers, request.client)
     log_repo = DownloadLogRepository(db)
     log_repo.log_download(file_id, client_ip)
+    download_analytics.record(file_id, client_ip)
     
     service = APKFileService(db)
-    return service.download_file(file_id)
+    return service.download_file(file_id, from_sha256, client_ip)
 
 
 @router.delete("/files/{file_id}", response_model=BaseResponse[None])
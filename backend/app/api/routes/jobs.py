@@ -0,0 +1,40 @@
+"""
+Background job API routes: queue status and manual retries (Admin only).
+"""
+
+from fastapi import APIRouter
+
+from app.core.dependencies import AdminUser, DbDep
+from app.core.executors import Workload, workload
+from app.schemas.common import BaseResponse
+from app.schemas.job import JobQueueStatus, JobRead
+from app.services.jobs import JobService
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.get("", response_model=BaseResponse[JobQueueStatus])
+@workload(Workload.ADMIN)
+def get_job_status(db: DbDep, _admin: AdminUser):
+    """Queue depth per job type, this worker's running jobs and recent failures. Admin only."""
+    service = JobService(db)
+    job_status = service.get_status()
+    return BaseResponse.ok(job_status)
+
+
+@router.get("/{job_id}", response_model=BaseResponse[JobRead])
+@workload(Workload.ADMIN)
+def get_job(job_id: int, db: DbDep, _admin: AdminUser):
+    """Get a single job. Admin only."""
+    service = JobService(db)
+    job = service.get_job(job_id)
+    return BaseResponse.ok(job)
+
+
+@router.post("/{job_id}/retry", response_model=BaseResponse[JobRead])
+@workload(Workload.ADMIN)
+def retry_job(job_id: int, db: DbDep, _admin: AdminUser):
+    """Re-queue a failed job. Admin only."""
+    service = JobService(db)
+    job = service.retry_job(job_id)
+    return BaseResponse.ok(job)
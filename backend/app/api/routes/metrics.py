@@ -0,0 +1,17 @@
+"""
+Metrics API route: Prometheus text exposition of in-process metrics (Admin only).
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.dependencies import AdminUser
+from app.core.metrics import render_metrics
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics(_admin: AdminUser):
+    """Counters and gauges of this worker process. Admin only."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
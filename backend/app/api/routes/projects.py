@@ -6,8 +6,11 @@ from fastapi import APIRouter
 
 from app.core.dependencies import AdminUser, CurrentUser, DbDep
 from app.schemas.common import BaseResponse
-from app.schemas.project import ProjectCreate, ProjectRead, ProjectUpdate
+from app.schemas.deletion import DeletionTaskRead
+from app.schemas.project import ProjectCreate, ProjectQuota, ProjectRead, ProjectUpdate
+from app.schemas.retention import RetentionPolicy, RetentionReport
 from app.services.project import ProjectService
+from app.services.retention import RetentionService
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
@@ -36,9 +39,33 @@ def update_project(project_id: int, payload: ProjectUpdate, db: DbDep, _admin: A
     return BaseResponse.ok(project)
 
 
-@router.delete("/{project_id}", response_model=BaseResponse[None])
-def delete_project(project_id: int, db: DbDep, _admin: AdminUser):
-    """Delete a project and all its versions/files. Admin only."""
+@router.put("/{project_id}/quota", response_model=BaseResponse[ProjectRead])
+def set_quota(project_id: int, payload: ProjectQuota, db: DbDep, _admin: AdminUser):
+    """Set the project's storage quota in bytes (null = unlimited). Admin only."""
     service = ProjectService(db)
-    service.delete_project(project_id)
-    return BaseResponse.ok(None)
+    project = service.set_quota(project_id, payload.quota_bytes)
+    return BaseResponse.ok(project)
+
+
+@router.put("/{project_id}/retention", response_model=BaseResponse[ProjectRead])
+def set_retention(project_id: int, payload: RetentionPolicy, db: DbDep, _admin: AdminUser):
+    """Set the project's retention rules; both unset turns retention off. Admin only."""
+    service = RetentionService(db)
+    project = service.set_policy(project_id, payload)
+    return BaseResponse.ok(project)
+
+
+@router.get("/{project_id}/retention/preview", response_model=BaseResponse[RetentionReport])
+def preview_retention(project_id: int, db: DbDep, _admin: AdminUser):
+    """Dry run: versions the next retention sweep would delete and the bytes it would free. Admin only."""
+    service = RetentionService(db)
+    report = service.preview(project_id)
+    return BaseResponse.ok(report)
+
+
+@router.delete("/{project_id}", response_model=BaseResponse[DeletionTaskRead], status_code=202)
+def delete_project(project_id: int, db: DbDep, current_admin: AdminUser):
+    """Delete a project and all its versions/files in the background. Admin only."""
+    service = ProjectService(db)
+    task = service.delete_project(project_id, current_admin)
+    return BaseResponse.ok(task)
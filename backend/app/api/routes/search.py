@@ -0,0 +1,32 @@
+"""
+Search API route.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Query
+
+from app.core.dependencies import CurrentUser, DbDep
+from app.schemas.common import BaseResponse, PaginatedData
+from app.schemas.search import SearchHit, SearchKind
+from app.services.search import SearchService
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get("", response_model=BaseResponse[PaginatedData[SearchHit]])
+def search(
+    db: DbDep,
+    current_user: CurrentUser,
+    q: str = Query(..., min_length=2, max_length=100),
+    kind: Optional[list[SearchKind]] = Query(None),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+):
+    """
+    Search projects, versions and files by prefix, substring or approximate
+    (typo-tolerant) match, best match first. Restricted to the caller's projects.
+    """
+    service = SearchService(db)
+    result = service.search(q, kind, page, page_size, current_user)
+    return BaseResponse.ok(result)
@@ -0,0 +1,51 @@
+"""
+Storage API routes: reconciliation against the database and integrity scrubbing.
+"""
+
+from fastapi import APIRouter
+
+from app.core.dependencies import AdminUser, DbDep
+from app.core.executors import Workload, workload
+from app.schemas.common import BaseResponse
+from app.schemas.integrity import IntegrityStatusRead
+from app.schemas.reconcile import ReconcileRequest, ReconcileRunRead
+from app.services.integrity import IntegrityService
+from app.services.reconcile import ReconcileService
+
+router = APIRouter(prefix="/storage", tags=["Storage"])
+
+
+@router.post("/reconcile", response_model=BaseResponse[ReconcileRunRead], status_code=202)
+@workload(Workload.ADMIN)
+def start_reconcile(payload: ReconcileRequest, db: DbDep, admin: AdminUser):
+    """Start a reconciliation run (REPORT, QUARANTINE or DELETE). Admin only."""
+    service = ReconcileService(db)
+    run = service.start(payload.mode, admin.id)
+    return BaseResponse.ok(run)
+
+
+@router.get("/reconcile", response_model=BaseResponse[list[ReconcileRunRead]])
+@workload(Workload.ADMIN)
+def list_reconcile_runs(db: DbDep, _admin: AdminUser):
+    """List recent reconciliation runs. Admin only."""
+    service = ReconcileService(db)
+    runs = service.list_runs()
+    return BaseResponse.ok(runs)
+
+
+@router.get("/reconcile/{run_id}", response_model=BaseResponse[ReconcileRunRead])
+@workload(Workload.ADMIN)
+def get_reconcile_run(run_id: int, db: DbDep, _admin: AdminUser):
+    """Get progress and findings of a reconciliation run. Admin only."""
+    service = ReconcileService(db)
+    run = service.get_run(run_id)
+    return BaseResponse.ok(run)
+
+
+@router.get("/integrity", response_model=BaseResponse[IntegrityStatusRead])
+@workload(Workload.ADMIN)
+def get_integrity_status(db: DbDep, _admin: AdminUser):
+    """Checksum coverage, scrub progress and throughput, and flagged files. Admin only."""
+    service = IntegrityService(db)
+    integrity = service.get_status()
+    return BaseResponse.ok(integrity)
@@ -0,0 +1,85 @@
+"""
+Update-check API routes: latest build per project/channel for device polling.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Request, Response, status
+from fastapi.responses import RedirectResponse
+
+from app.core.dependencies import CurrentUser, DbDep
+from app.schemas.common import BaseResponse
+from app.schemas.latest_build import LatestBuildRead
+from app.services.latest_build import LatestBuildService
+
+router = APIRouter(prefix="/projects", tags=["Updates"])
+
+
+def _not_modified(request: Request, etag: str) -> Optional[Response]:
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
+
+
+@router.get("/{project_name}/latest", response_model=BaseResponse[LatestBuildRead])
+def get_latest(
+    project_name: str,
+    request: Request,
+    response: Response,
+    db: DbDep,
+    current_user: CurrentUser,
+    channel: str = "stable",
+    abi: Optional[str] = None,
+):
+    """Newest build of a project on a channel. Supports If-None-Match → 304."""
+    service = LatestBuildService(db)
+    latest = service.get_latest(project_name, channel, abi, current_user)
+    etag = service.etag(latest)
+    if cached := _not_modified(request, etag):
+        return cached
+    response.headers["ETag"] = etag
+    return BaseResponse.ok(latest)
+
+
+@router.get("/{project_name}/latest/download")
+def download_latest(
+    project_name: str,
+    request: Request,
+    db: DbDep,
+    current_user: CurrentUser,
+    channel: str = "stable",
+    abi: Optional[str] = None,
+):
+    """Redirect to the download URL of the newest build."""
+    service = LatestBuildService(db)
+    latest = service.get_latest(project_name, channel, abi, current_user)
+    url = latest.download_url
+    if token := request.query_params.get("token"):
+        url = f"{url}?token={token}"
+    return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+
+
+@router.get("/{project_name}/update-check", response_model=BaseResponse[LatestBuildRead])
+def check_update(
+    project_name: str,
+    current_version: str,
+    request: Request,
+    response: Response,
+    db: DbDep,
+    current_user: CurrentUser,
+    channel: str = "stable",
+    abi: Optional[str] = None,
+):
+    """
+    Device update check: 304 when `current_version` is already the latest,
+    otherwise the latest build with its download URL.
+    """
+    service = LatestBuildService(db)
+    latest = service.check_update(project_name, channel, current_version, abi, current_user)
+    if latest is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    etag = service.etag(latest)
+    if cached := _not_modified(request, etag):
+        return cached
+    response.headers["ETag"] = etag
+    return BaseResponse.ok(latest)
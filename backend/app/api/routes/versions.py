@@ -2,21 +2,30 @@
 Versions API routes.
 """
 
-from fastapi import APIRouter
+from typing import Optional
 
-from app.core.dependencies import AdminUser, CurrentUser, DbDep
+from fastapi import APIRouter, Query
+
+from app.core.coalesce import coalesce
+from app.core.dependencies import AdminUser, DbDep, ProjectUser
 from app.schemas.common import BaseResponse
-from app.schemas.version import VersionCreate, VersionRead
+from app.schemas.deletion import DeletionTaskRead
+from app.schemas.version import VersionCreate, VersionPin, VersionRead
 from app.services.version import VersionService
 
 router = APIRouter(prefix="/projects", tags=["Versions"])
 
 
 @router.get("/{project_id}/versions", response_model=BaseResponse[list[VersionRead]])
-def list_versions(project_id: int, db: DbDep, _user: CurrentUser):
-    """List all versions for a project."""
-    service = VersionService(db)
-    versions = service.list_versions(project_id)
+async def list_versions(
+    project_id: int,
+    _user: ProjectUser,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+):
+    """List versions for a project, newest semantic version first (optionally the newest N)."""
+    versions = await coalesce(
+        "list_versions", (project_id, limit), lambda db: VersionService(db).list_versions(project_id, limit)
+    )
     return BaseResponse.ok(versions)
 
 
@@ -26,3 +35,23 @@ def create_version(project_id: int, payload: VersionCreate, db: DbDep, _admin: A
     service = VersionService(db)
     version = service.create_version(project_id, payload)
     return BaseResponse.ok(version)
+
+
+@router.put("/{project_id}/versions/{version_id}/pin", response_model=BaseResponse[VersionRead])
+def pin_version(project_id: int, version_id: int, payload: VersionPin, db: DbDep, _admin: AdminUser):
+    """Pin or unpin a version so retention never deletes it. Admin only."""
+    service = VersionService(db)
+    version = service.set_pinned(project_id, version_id, payload.pinned)
+    return BaseResponse.ok(version)
+
+
+@router.delete(
+    "/{project_id}/versions/{version_id}",
+    response_model=BaseResponse[DeletionTaskRead],
+    status_code=202,
+)
+def delete_version(project_id: int, version_id: int, db: DbDep, current_admin: AdminUser):
+    """Delete a version and all its files in the background. Admin only."""
+    service = VersionService(db)
+    task = service.delete_version(project_id, version_id, current_admin)
+    return BaseResponse.ok(task)
@@ -0,0 +1,263 @@
+"""
+Upload admission control.
+
+Uploads are admitted by an ASGI middleware before their body is read, using
+the declared Content-Length (the size limit when the body is chunked). Batch
+uploads count as one upload, limited to UPLOAD_BATCH_MAX_SIZE as a whole:
+
+- oversized uploads get 413 and unauthenticated ones 401 straight away, and
+  uploads that would take their project over its storage quota get 507;
+- an upload must fit the global and per-user limits on concurrent uploads and
+  in-flight bytes, otherwise it waits up to UPLOAD_QUEUE_TIMEOUT for a slot,
+  and gets 429 with Retry-After if the wait is too long or the queue is full;
+- once admitted, its size is reserved on the volume it will be stored on, so
+  parallel uploads cannot all count the same free space (507 if none has room).
+
+Limits are per worker process.
+"""
+
+import asyncio
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, QueryParams
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.executors import Workload, run_in
+from app.core.metrics import Counter, Gauge
+from app.core.security import decode_access_token
+from app.services.quota import version_would_exceed_quota
+from app.services.storage import StorageService
+from app.utils.logger import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+UPLOAD_PATH_RE = re.compile(r"^/api/versions/(\d+)/upload(/batch)?$")
+MULTIPART_OVERHEAD = 64 * 1024  # form boundaries and part headers around the file
+
+uploads_admitted = Counter("apk_uploads_admitted_total", "Uploads admitted")
+uploads_queued = Counter("apk_uploads_queued_total", "Uploads that had to wait for a slot")
+uploads_rejected = Counter(
+    "apk_uploads_rejected_total", "Uploads rejected before their body was read", ["reason"]
+)
+uploads_in_flight = Gauge("apk_uploads_in_flight", "Uploads currently admitted")
+upload_bytes_in_flight = Gauge("apk_upload_bytes_in_flight", "Declared bytes of admitted uploads")
+uploads_waiting = Gauge("apk_uploads_waiting", "Uploads waiting for a slot")
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, status_code: int, detail: str, reason: str, retry_after: Optional[int] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass
+class UploadTicket:
+    user: str
+    size: int
+    volume_id: str
+
+
+class UploadAdmission:
+    def __init__(self):
+        self._condition: Optional[asyncio.Condition] = None
+        self.count = 0
+        self.bytes = 0
+        self.waiting = 0
+        self.user_count: dict[str, int] = {}
+        self.user_bytes: dict[str, int] = {}
+        self.volume_bytes: dict[str, int] = {}
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        # Created on first use so it binds to the server's event loop.
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def _fits(self, user: str, size: int) -> bool:
+        """Whether an upload fits now; one that alone exceeds a byte budget runs when nothing else does."""
+        if self.count >= settings.UPLOAD_MAX_CONCURRENT:
+            return False
+        if self.count and self.bytes + size > settings.UPLOAD_MAX_INFLIGHT_BYTES:
+            return False
+        user_count = self.user_count.get(user, 0)
+        if user_count >= settings.UPLOAD_MAX_CONCURRENT_PER_USER:
+            return False
+        if user_count and self.user_bytes.get(user, 0) + size > settings.UPLOAD_MAX_INFLIGHT_BYTES_PER_USER:
+            return False
+        return True
+
+    async def admit(self, user: str, size: int, max_size: int) -> UploadTicket:
+        """
+        Wait for a slot for an upload of `size` bytes and reserve its space.
+
+        Raises:
+            AdmissionRejected (413, 429 or 507).
+        """
+        if size > max_size + MULTIPART_OVERHEAD:
+            raise AdmissionRejected(
+                413,
+                f"Upload exceeds maximum size of {max_size // (1024*1024)} MB",
+                "too_large",
+            )
+        async with self.condition:
+            if not self._fits(user, size):
+                if self.waiting >= settings.UPLOAD_QUEUE_MAX:
+                    raise self._busy("queue_full")
+                uploads_queued.inc()
+                self.waiting += 1
+                uploads_waiting.inc()
+                try:
+                    await asyncio.wait_for(
+                        self.condition.wait_for(lambda: self._fits(user, size)),
+                        settings.UPLOAD_QUEUE_TIMEOUT,
+                    )
+                except asyncio.TimeoutError:
+                    raise self._busy("queue_timeout")
+                finally:
+                    self.waiting -= 1
+                    uploads_waiting.dec()
+
+            # Hold the slot while the volumes are queried off the loop.
+            self.count += 1
+            self.bytes += size
+            self.user_count[user] = self.user_count.get(user, 0) + 1
+            self.user_bytes[user] = self.user_bytes.get(user, 0) + size
+
+        storage = StorageService()
+        try:
+            capacities = await run_in(Workload.UPLOAD, storage.capacities)
+        except BaseException:
+            await self._release_slot(user, size)
+            raise
+        async with self.condition:
+            # Chosen with the reservations as they are now, so parallel uploads
+            # cannot all count the same free space.
+            try:
+                volume = storage.pick_volume(size, reserved=self.volume_bytes, capacities=capacities)
+            except HTTPException as e:
+                self._release_slot_locked(user, size)
+                raise AdmissionRejected(e.status_code, e.detail, "no_space")
+            self.volume_bytes[volume.id] = self.volume_bytes.get(volume.id, 0) + size
+        uploads_admitted.inc()
+        uploads_in_flight.inc()
+        upload_bytes_in_flight.inc(size)
+        return UploadTicket(user, size, volume.id)
+
+    async def release(self, ticket: UploadTicket) -> None:
+        async with self.condition:
+            self._decrement(self.volume_bytes, ticket.volume_id, ticket.size)
+            self._release_slot_locked(ticket.user, ticket.size)
+        uploads_in_flight.dec()
+        upload_bytes_in_flight.dec(ticket.size)
+
+    async def _release_slot(self, user: str, size: int) -> None:
+        async with self.condition:
+            self._release_slot_locked(user, size)
+
+    def _release_slot_locked(self, user: str, size: int) -> None:
+        self.count -= 1
+        self.bytes -= size
+        self._decrement(self.user_count, user, 1)
+        self._decrement(self.user_bytes, user, size)
+        self.condition.notify_all()
+
+    @staticmethod
+    def _decrement(counts: dict[str, int], key: str, amount: int) -> None:
+        counts[key] -= amount
+        if counts[key] <= 0:
+            del counts[key]
+
+    @staticmethod
+    def _busy(reason: str) -> AdmissionRejected:
+        return AdmissionRejected(
+            429, "Too many uploads in progress, retry later", reason, settings.UPLOAD_RETRY_AFTER
+        )
+
+
+upload_admission = UploadAdmission()
+
+
+class UploadAdmissionMiddleware:
+    """Admit or reject APK uploads before FastAPI parses the multipart body."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        match = UPLOAD_PATH_RE.match(scope["path"]) if scope["type"] == "http" else None
+        if match is None or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        batch = scope["path"].endswith("/batch")
+        max_size = settings.UPLOAD_BATCH_MAX_SIZE if batch else settings.MAX_UPLOAD_SIZE
+        try:
+            user = self._user(scope, headers)
+            size = self._declared_size(headers, max_size)
+            if "content-length" in headers:
+                await self._check_quota(int(match.group(1)), size)
+            ticket = await upload_admission.admit(user, size, max_size)
+        except AdmissionRejected as e:
+            uploads_rejected.inc(reason=e.reason)
+            logger.warning(f"Upload to {scope['path']} rejected: {e.reason}")
+            response_headers = {}
+            if e.retry_after:
+                response_headers["Retry-After"] = str(e.retry_after)
+            if e.status_code == 401:
+                response_headers["WWW-Authenticate"] = "Bearer"
+            response = JSONResponse(
+                status_code=e.status_code, content={"detail": e.detail}, headers=response_headers
+            )
+            await response(scope, receive, send)
+            return
+
+        scope.setdefault("state", {})["upload_volume"] = ticket.volume_id
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            await upload_admission.release(ticket)
+
+    @staticmethod
+    async def _check_quota(version_id: int, size: int) -> None:
+        """Reject from Content-Length alone; the exact size is enforced again when stored."""
+        try:
+            exceeded = await run_in_threadpool(
+                version_would_exceed_quota, version_id, max(0, size - MULTIPART_OVERHEAD)
+            )
+        except Exception as e:
+            logger.error(f"Quota pre-check failed for version id={version_id}: {e}")
+            return
+        if exceeded:
+            raise AdmissionRejected(507, "Project storage quota exceeded", "quota")
+
+    @staticmethod
+    def _declared_size(headers: Headers, max_size: int) -> int:
+        try:
+            return int(headers["content-length"])
+        except (KeyError, ValueError):
+            return max_size
+
+    @staticmethod
+    def _user(scope: Scope, headers: Headers) -> str:
+        """The uploading user id, from the same token sources as get_current_user."""
+        scheme, _, credentials = headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and credentials:
+            token = credentials
+        else:
+            token = QueryParams(scope.get("query_string", b"")).get("token")
+        payload = decode_access_token(token) if token else None
+        if not payload or payload.get("sub") is None:
+            raise AdmissionRejected(401, "Could not validate credentials", "unauthenticated")
+        return str(payload["sub"])
@@ -0,0 +1,107 @@
+"""
+Single-flight coalescing of identical concurrent reads.
+
+When a release lands, many clients ask for the same listing at once. With
+coalescing, the first request for a key (route, parameters, access scope)
+computes the result. Requests for the same key that arrive while it runs wait
+for it and return the same result, or raise the same exception. The
+computation runs on the API pool while followers await it on the event loop,
+so a burst of identical requests holds one thread, not one each. Nothing is
+kept once the computation finishes: this only merges requests that overlap in
+time.
+
+The shared call outlives the request that started it, so it opens and closes
+its own session rather than borrowing that request's, which is closed as soon
+as the request ends.
+
+A follower may therefore get a result whose reads began just before its own
+request arrived. Routes opt in through COALESCE_ROUTES. The share of
+requests served as followers is apk_coalesced_requests_total{role="follower"}
+over the total. Coalescing is per worker process.
+"""
+
+import asyncio
+from typing import Callable, Hashable, TypeVar
+
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.core.executors import Workload, run_in
+from app.core.metrics import Counter
+from app.utils.logger import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+coalesced_requests = Counter(
+    "apk_coalesced_requests_total", "Requests to coalescing routes", ["route", "role"]
+)
+
+
+class SingleFlight:
+    """Only used from the event loop, so the table needs no lock."""
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], T], wait: float) -> tuple[T, bool]:
+        """
+        Run `fn` on the API pool unless a call for `key` is already in flight,
+        in which case await its outcome for up to `wait` seconds; past that,
+        run `fn` anyway.
+
+        The call runs as its own task: a leader whose client disconnects
+        stops waiting, but the followers still get the result.
+
+        Returns:
+            (result, whether this call was the one that computed it).
+        """
+        call = self._calls.get(key)
+        if call is not None:
+            try:
+                return await asyncio.wait_for(asyncio.shield(call), wait), False
+            except asyncio.TimeoutError:
+                logger.warning(f"Coalesced call {key!r} still running after {wait}s; computing separately")
+                return await run_in(Workload.API, fn), True
+
+        call = self._calls[key] = asyncio.ensure_future(run_in(Workload.API, fn))
+        call.add_done_callback(lambda _: self._forget(key, call))
+        return await asyncio.shield(call), True
+
+    def _forget(self, key: Hashable, call: asyncio.Future) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.cancelled():
+            call.exception()  # retrieved here, in case every waiter went away
+
+
+single_flight = SingleFlight()
+
+
+def _own_session(fn: Callable[[Session], T]) -> Callable[[], T]:
+    def call() -> T:
+        db = SessionLocal()
+        try:
+            return fn(db)
+        finally:
+            db.close()
+
+    return call
+
+
+async def coalesce(route: str, key: tuple, fn: Callable[[Session], T]) -> T:
+    """
+    Share `fn(db)` between concurrent requests to `route` with the same `key`.
+    `fn` is blocking and runs on the API pool with a session of its own;
+    waiting requests hold no thread. `key` must cover every input of `fn`,
+    including whatever decides what the caller may see.
+    """
+    call = _own_session(fn)
+    if route not in settings.COALESCE_ROUTE_SET:
+        return await run_in(Workload.API, call)
+    result, leader = await single_flight.do((route, *key), call, settings.COALESCE_WAIT_SECONDS)
+    coalesced_requests.inc(route=route, role="leader" if leader else "follower")
+    return result
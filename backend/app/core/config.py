@@ -51,6 +51,164 @@ class Settings(BaseSettings):
     # ─── Storage ──────────────────────────────────────────────────────────
     STORAGE_PATH: str = "/storage"
     MAX_UPLOAD_SIZE: int = 500 * 1024 * 1024  # 500 MB
+    # Storage roots as "id=location[:weight],...", where location is a directory or
+    # s3://bucket/prefix, e.g. "disk1=/storage:1,disk2=/mnt/disk2:2,s3=s3://apks/prod".
+    # Empty means a single volume "default" at STORAGE_PATH.
+    STORAGE_VOLUMES: str = ""
+    STORAGE_MIN_FREE_BYTES: int = 1024 * 1024 * 1024  # volumes below this take no new files
+
+    @property
+    def STORAGE_VOLUME_SPECS(self) -> list[tuple[str, str, float]]:
+        specs = []
+        for item in self.STORAGE_VOLUMES.split(","):
+            if "=" not in item:
+                continue
+            volume_id, path = item.split("=", 1)
+            weight = 1.0
+            head, _, tail = path.rpartition(":")
+            if head and tail.replace(".", "", 1).isdigit():
+                path, weight = head, float(tail)
+            specs.append((volume_id.strip(), path.strip(), weight))
+        return specs or [("default", self.STORAGE_PATH, 1.0)]
+
+    # ─── S3-compatible storage (for s3:// volumes) ────────────────────────
+    S3_ENDPOINT_URL: str = ""  # empty for AWS; e.g. http://minio:9000 for MinIO
+    S3_ACCESS_KEY: str = ""
+    S3_SECRET_KEY: str = ""
+    S3_REGION: str = "us-east-1"
+    S3_PART_SIZE: int = 16 * 1024 * 1024  # multipart part size (S3 minimum is 5 MB)
+    S3_UPLOAD_CONCURRENCY: int = 4  # parts uploaded in parallel per upload
+    S3_PRESIGN_EXPIRY: int = 300  # seconds a download redirect stays valid
+
+    # ─── Background Jobs ──────────────────────────────────────────────────
+    JOB_WORKER_ENABLED: bool = True
+    JOB_POLL_INTERVAL: float = 2.0  # seconds between queue polls when idle
+    JOB_DEFAULT_CONCURRENCY: int = 2  # per job type, per process
+    JOB_CONCURRENCY: str = ""  # per-type overrides, e.g. "purge_deletion=1,prune_jobs=1"
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_BACKOFF_BASE: float = 10.0  # seconds; doubles on every failed attempt
+    JOB_BACKOFF_MAX: float = 3600.0
+    JOB_HEARTBEAT_INTERVAL: float = 30.0
+    JOB_LOCK_TIMEOUT: float = 300.0  # running jobs without heartbeat are requeued after this
+    JOB_RETENTION_DAYS: int = 7  # finished jobs are pruned after this
+
+    @property
+    def JOB_CONCURRENCY_OVERRIDES(self) -> dict[str, int]:
+        overrides = {}
+        for item in self.JOB_CONCURRENCY.split(","):
+            if "=" in item:
+                name, value = item.split("=", 1)
+                overrides[name.strip()] = int(value)
+        return overrides
+
+    # ─── Background Deletion ──────────────────────────────────────────────
+    DELETION_BATCH_SIZE: int = 500  # rows removed per transaction
+    DELETION_BATCHES_PER_JOB: int = 20  # batches before the purge job yields its slot
+
+    # ─── Storage Quotas ───────────────────────────────────────────────────
+    QUOTA_RECOUNT_INTERVAL: int = 86400  # seconds between recounts of per-project usage; 0 disables
+
+    # ─── Retention ────────────────────────────────────────────────────────
+    RETENTION_INTERVAL: int = 86400  # seconds between retention sweeps; 0 disables
+    RETENTION_DRY_RUN: bool = False  # only log what each sweep would delete
+    RETENTION_MAX_VERSIONS_PER_RUN: int = 100  # versions scheduled for deletion per sweep
+
+    # ─── Storage Reconciliation ───────────────────────────────────────────
+    RECONCILE_INTERVAL: int = 86400  # seconds between scheduled report-only runs; 0 disables
+    RECONCILE_UNITS_PER_JOB: int = 16  # fan-out directories checked before the job yields its slot
+    RECONCILE_GRACE_SECONDS: int = 3600  # files and rows younger than this are never flagged
+    RECONCILE_SCAN_THREADS: int = 8  # parallel directory walkers on local volumes
+    RECONCILE_MAX_FINDINGS: int = 1000  # findings kept per run; counters are always exact
+
+    # ─── Integrity Scrubbing ──────────────────────────────────────────────
+    SCRUB_INTERVAL: int = 3600  # seconds between scrub passes; 0 disables
+    SCRUB_VERIFY_EVERY_DAYS: int = 30  # each file is re-hashed at least this often
+    SCRUB_FILES_PER_PASS: int = 200
+    SCRUB_THREADS: int = 2
+    SCRUB_MAX_BYTES_PER_SEC: int = 20 * 1024 * 1024  # shared by all scrub threads; 0 = unlimited
+
+    # ─── Executors ────────────────────────────────────────────────────────
+    # Independent thread pools per workload class (see app/core/executors.py).
+    EXECUTOR_API_THREADS: int = 40  # metadata routes and all FastAPI dependencies
+    EXECUTOR_DOWNLOAD_THREADS: int = 32  # download routes and file reads for responses
+    EXECUTOR_UPLOAD_THREADS: int = 8  # storing and parsing uploaded APKs
+    EXECUTOR_ADMIN_THREADS: int = 4  # storage administration routes
+
+    # ─── Rate Limiting ────────────────────────────────────────────────────
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" (per process) or "postgres" (shared by all workers)
+    RATE_LIMIT_API_RPS: float = 20.0  # per user; burst is the bucket size
+    RATE_LIMIT_API_BURST: float = 100.0
+    RATE_LIMIT_DOWNLOAD_RPS: float = 0.5
+    RATE_LIMIT_DOWNLOAD_BURST: float = 10.0
+    RATE_LIMIT_DOWNLOAD_BYTES_PER_SEC: int = 50 * 1024 * 1024  # 0 = unpaced
+    RATE_LIMIT_DOWNLOAD_BYTES_BURST: int = 64 * 1024 * 1024
+    RATE_LIMIT_IP_FACTOR: float = 10.0  # per-IP limits are this multiple of per-user ones
+    RATE_LIMIT_PACE_SLICE_BYTES: int = 8 * 1024 * 1024  # download byte tokens taken per bucket update
+    # Peers (IPs or CIDRs, comma-separated) whose X-Forwarded-For is believed; empty ignores the header.
+    TRUSTED_PROXIES: str = "127.0.0.1,::1"
+
+    # ─── Project Access ───────────────────────────────────────────────────
+    ACL_CACHE_TTL: int = 60  # seconds a user's project set is trusted; bounds staleness if an invalidation is lost
+    ACL_OWNER_CACHE_SIZE: int = 100_000  # version/file → project ids kept in memory, each
+
+    # ─── Health Checks ────────────────────────────────────────────────────
+    READINESS_CACHE_SECONDS: float = 5.0  # /readyz reuses its last probe for this long
+    READINESS_DB_TIMEOUT: int = 3  # seconds allowed to connect to the database when probing
+
+    # ─── Request Coalescing ───────────────────────────────────────────────
+    # Routes whose concurrent identical requests share one computation; empty disables.
+    COALESCE_ROUTES: str = "list_versions,list_files,dashboard_stats"
+    COALESCE_WAIT_SECONDS: float = 30.0  # a follower computes on its own if the shared call takes longer
+
+    @property
+    def COALESCE_ROUTE_SET(self) -> frozenset[str]:
+        return frozenset(name.strip() for name in self.COALESCE_ROUTES.split(",") if name.strip())
+
+    # ─── Search ───────────────────────────────────────────────────────────
+    SEARCH_MAX_RESULTS: int = 1000  # best matches ranked per kind; pages are cut from these
+
+    # ─── Cross-worker Messaging ───────────────────────────────────────────
+    PUBSUB_POLL_INTERVAL: float = 1.0  # seconds between checks of the LISTEN connection when idle
+    PUBSUB_RECONNECT_DELAY: float = 5.0  # seconds before reconnecting a failed LISTEN connection
+    PUBSUB_OUTBOX_SIZE: int = 10_000  # messages queued for NOTIFY; the oldest are dropped beyond this
+
+    # ─── Live Dashboard Events ────────────────────────────────────────────
+    EVENTS_HEARTBEAT_INTERVAL: int = 15  # seconds between keep-alive comments on idle event streams
+    EVENTS_CLIENT_BACKLOG: int = 256  # events queued for a slow client before its stream is closed
+    EVENTS_MAX_STREAM_SECONDS: int = 900  # streams are closed after this; clients reconnect with fresh access
+
+    # ─── Download Analytics ───────────────────────────────────────────────
+    ANALYTICS_FLUSH_INTERVAL: int = 10  # seconds each worker buffers download sketches before merging them
+    ANALYTICS_TOP_CAPACITY: int = 200  # most downloaded files kept per day; top lists are cut from these
+    ANALYTICS_MAX_DAYS: int = 365  # longest range the analytics endpoints accept
+
+    # ─── Idempotency Keys ─────────────────────────────────────────────────
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_TTL: int = 86400  # seconds a completed response is replayed for its key
+    IDEMPOTENCY_WAIT_SECONDS: int = 300  # a duplicate waits this long for the first request, then gets 409
+    IDEMPOTENCY_LOCK_TIMEOUT: int = 3600  # a key held longer than this is presumed orphaned and taken over
+    IDEMPOTENCY_MAX_RESPONSE_BYTES: int = 1024 * 1024  # larger responses are not stored
+
+    # ─── Upload Admission ─────────────────────────────────────────────────
+    UPLOAD_MAX_CONCURRENT: int = 8  # per process
+    UPLOAD_MAX_INFLIGHT_BYTES: int = 2 * 1024 * 1024 * 1024  # declared bytes of admitted uploads
+    UPLOAD_MAX_CONCURRENT_PER_USER: int = 2
+    UPLOAD_MAX_INFLIGHT_BYTES_PER_USER: int = 1024 * 1024 * 1024
+    UPLOAD_QUEUE_MAX: int = 32  # uploads waiting for a slot; beyond this they get 429
+    UPLOAD_QUEUE_TIMEOUT: int = 30  # seconds an upload waits for a slot before 429
+    UPLOAD_RETRY_AFTER: int = 30  # Retry-After sent with 429
+    UPLOAD_BATCH_MAX_FILES: int = 64
+    UPLOAD_BATCH_MAX_SIZE: int = 4 * 1024 * 1024 * 1024  # whole batch request; files keep MAX_UPLOAD_SIZE
+    UPLOAD_BATCH_CONCURRENCY: int = 4  # files of one batch stored in parallel
+
+    # ─── Delta Downloads ──────────────────────────────────────────────────
+    DELTA_ENABLED: bool = True
+    DELTA_CACHE_PATH: str = "/storage/.delta-cache"
+    DELTA_CACHE_MAX_BYTES: int = 5 * 1024 * 1024 * 1024  # least recently served patches are evicted past this
+    DELTA_WORKERS: int = 2  # processes building patches
+    DELTA_WAIT_SECONDS: int = 30  # a request waits this long for a new patch, then gets the full APK
+    DELTA_MAX_RATIO: float = 0.8  # patches larger than this fraction of the APK are not served
 
     # ─── CORS ─────────────────────────────────────────────────────────────
     ALLOWED_ORIGINS: str = "*"
@@ -1,6 +1,6 @@
 """
 FastAPI dependency injection providers.
-Provides database sessions, current user, and role guards.
+Provides database sessions, current user, role guards and project access guards.
 """
 
 from typing import Annotated, Optional
@@ -12,6 +12,7 @@ from sqlalchemy.orm import Session
 from app.core.database import SessionLocal
 from app.core.security import decode_access_token
 from app.models.user import User, UserRole
+from app.services.access import project_access
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
@@ -97,3 +98,37 @@ def require_admin(current_user: CurrentUser) -> User:
 
 
 AdminUser = Annotated[User, Depends(require_admin)]
+
+
+# ─── Project Access ───────────────────────────────────────────────────────────
+# Answered from the in-memory ACL cache (app/services/access.py); admins skip it.
+
+
+def require_project_access(project_id: int, db: DbDep, current_user: CurrentUser) -> User:
+    """
+    Ensure the current user may see the project in the path.
+
+    Raises:
+        HTTPException 403 if the user is not assigned to the project.
+    """
+    project_access.authorize(db, current_user, project_id)
+    return current_user
+
+
+def require_version_access(version_id: int, db: DbDep, current_user: CurrentUser) -> User:
+    """Same as require_project_access, for the project owning the version in the path."""
+    if current_user.role != UserRole.ADMIN:
+        project_access.authorize(db, current_user, project_access.project_of_version(db, version_id))
+    return current_user
+
+
+def require_file_access(file_id: int, db: DbDep, current_user: CurrentUser) -> User:
+    """Same as require_project_access, for the project owning the file in the path."""
+    if current_user.role != UserRole.ADMIN:
+        project_access.authorize(db, current_user, project_access.project_of_file(db, file_id))
+    return current_user
+
+
+ProjectUser = Annotated[User, Depends(require_project_access)]
+VersionUser = Annotated[User, Depends(require_version_access)]
+FileUser = Annotated[User, Depends(require_file_access)]
@@ -0,0 +1,106 @@
+"""
+Live dashboard events, streamed to clients as Server-Sent Events.
+
+Write paths publish small events: downloads, uploads, deletions, and
+created or deleted projects and versions. Each event carries the changes to
+the dashboard counters it implies. Events travel between workers over the
+pubsub channel and are fanned out to the streams open in each worker from
+memory, so an open dashboard costs no database queries after connecting.
+
+Event shape: {"type", "project_id", "data": {...}, "counters": {...}}, where
+counters holds increments to DashboardStats fields. A client that cannot see
+the event's project gets only its counters, as a "counters" event.
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Optional
+
+from app.core.config import get_settings
+from app.core.metrics import Counter, Gauge
+from app.core.pubsub import pubsub
+
+settings = get_settings()
+
+CHANNEL = "apk_events"
+
+event_streams = Gauge("apk_event_streams", "Open dashboard event streams")
+event_streams_dropped = Counter("apk_event_streams_dropped_total", "Event streams closed for falling behind")
+
+
+class EventBus:
+    def __init__(self):
+        self._queues: set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        pubsub.subscribe(CHANNEL, self._deliver)
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+
+    def publish(
+        self,
+        event_type: str,
+        project_id: Optional[int],
+        data: Optional[dict[str, Any]] = None,
+        counters: Optional[dict[str, int]] = None,
+    ) -> None:
+        pubsub.publish(
+            CHANNEL, {"type": event_type, "project_id": project_id, "data": data or {}, "counters": counters or {}}
+        )
+
+    async def stream(self, allowed: Optional[frozenset[int]]) -> AsyncIterator[str]:
+        """
+        SSE frames for one client until it disconnects, falls behind, or
+        reaches EVENTS_MAX_STREAM_SECONDS. `allowed` is the client's project
+        set, None for all projects.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.EVENTS_MAX_STREAM_SECONDS
+        queue: asyncio.Queue = asyncio.Queue()
+        self._queues.add(queue)
+        event_streams.inc()
+        try:
+            yield "retry: 3000\n\n"
+            while (remaining := deadline - loop.time()) > 0:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), min(settings.EVENTS_HEARTBEAT_INTERVAL, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if event is None:
+                    return  # fell behind; the client reconnects and reloads the stats
+                frame = self._frame(event, allowed)
+                if frame:
+                    yield frame
+        finally:
+            self._queues.discard(queue)
+            event_streams.dec()
+
+    @staticmethod
+    def _frame(event: dict[str, Any], allowed: Optional[frozenset[int]]) -> Optional[str]:
+        project_id = event.get("project_id")
+        if allowed is None or project_id is None or project_id in allowed:
+            return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        if event.get("counters"):
+            return f"event: counters\ndata: {json.dumps({'counters': event['counters']})}\n\n"
+        return None
+
+    def _deliver(self, events: list[Any]) -> None:
+        """Called from any thread; the queues are only touched on the event loop."""
+        if self._loop is not None and self._queues:
+            self._loop.call_soon_threadsafe(self._fan_out, events)
+
+    def _fan_out(self, events: list[Any]) -> None:
+        for queue in list(self._queues):
+            if queue.qsize() + len(events) > settings.EVENTS_CLIENT_BACKLOG:
+                self._queues.discard(queue)
+                queue.put_nowait(None)
+                event_streams_dropped.inc()
+                continue
+            for event in events:
+                queue.put_nowait(event)
+
+
+event_bus = EventBus()
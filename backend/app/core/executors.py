@@ -0,0 +1,107 @@
+"""
+Workload classes and the thread pools they run on.
+
+Blocking work runs on a pool chosen by what it is, so a class that saturates
+its own pool (slow clients on large downloads, upload copy loops) only queues
+behind itself:
+
+- API: metadata routes. These use AnyIO's default thread limiter, which
+  FastAPI applies to every sync route and dependency, sized by
+  EXECUTOR_API_THREADS.
+- DOWNLOAD, UPLOAD, ADMIN: a dedicated ThreadPoolExecutor each.
+
+Background jobs already run on the job runner's own pool.
+"""
+
+import asyncio
+import contextvars
+import enum
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterator, TypeVar
+
+import anyio.to_thread
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+
+class Workload(str, enum.Enum):
+    API = "api"
+    DOWNLOAD = "download"
+    UPLOAD = "upload"
+    ADMIN = "admin"
+
+
+_executors: dict[Workload, ThreadPoolExecutor] = {}
+_lock = threading.Lock()
+_DONE = object()
+
+
+def _pool_size(workload: Workload) -> int:
+    return {
+        Workload.DOWNLOAD: settings.EXECUTOR_DOWNLOAD_THREADS,
+        Workload.UPLOAD: settings.EXECUTOR_UPLOAD_THREADS,
+        Workload.ADMIN: settings.EXECUTOR_ADMIN_THREADS,
+    }[workload]
+
+
+def get_executor(workload: Workload) -> ThreadPoolExecutor:
+    with _lock:
+        executor = _executors.get(workload)
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=_pool_size(workload), thread_name_prefix=workload.value
+            )
+            _executors[workload] = executor
+        return executor
+
+
+async def run_in(workload: Workload, func: Callable[..., T], *args, **kwargs) -> T:
+    """Run a blocking call on the pool of `workload`."""
+    if workload == Workload.API:
+        return await run_in_threadpool(func, *args, **kwargs)
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(workload), call)
+
+
+async def iterate_in(workload: Workload, iterator: Iterator[T]) -> AsyncIterator[T]:
+    """Drive a blocking iterator (e.g. a file read loop) on the pool of `workload`."""
+    try:
+        while (item := await run_in(workload, next, iterator, _DONE)) is not _DONE:
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            await run_in(workload, close)
+
+
+def workload(kind: Workload):
+    """Run a sync route on the pool of `kind` instead of the shared threadpool."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await run_in(kind, func, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def configure_executors() -> None:
+    """Size the API class; must run inside the server's event loop."""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.EXECUTOR_API_THREADS
+
+
+def shutdown_executors() -> None:
+    with _lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        _executors.clear()
@@ -0,0 +1,306 @@
+"""
+Idempotency-Key support for POST routes.
+
+A POST carrying an Idempotency-Key header is recorded in idempotency_keys
+under the caller's user id, together with a fingerprint of the request:
+method, path, query and, for bodies up to FINGERPRINT_MAX_BODY, the body
+itself. Larger bodies (APK uploads) are identified by their route, since
+multipart boundaries differ between retries.
+
+- The first request claims the key and runs; its response is stored for
+  IDEMPOTENCY_TTL seconds unless it failed in a way worth retrying (5xx,
+  408, 429), in which case the key is released.
+- A duplicate that arrives while the first is running waits for it, up to
+  IDEMPOTENCY_WAIT_SECONDS, and then gets its response; past that it gets
+  409 with Retry-After. It never does the work a second time.
+- A completed duplicate gets the stored response straight away, marked with
+  Idempotent-Replayed: true.
+- Reusing a key for a different request is rejected with 422.
+- A key held past IDEMPOTENCY_LOCK_TIMEOUT is taken over by the next
+  request. The stale owner's outcome is then dropped: storing and releasing
+  both match the claim's locked_at.
+
+Waiters in the same worker are woken as soon as the first request finishes;
+other workers poll the table. Requests without a valid token are passed
+through untouched and fail authentication in the route as usual.
+"""
+
+import asyncio
+import hashlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, QueryParams
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.core.metrics import Counter
+from app.core.security import decode_access_token
+from app.models.idempotency import IdempotencyKey, IdempotencyStatus
+from app.repositories.idempotency import IdempotencyRepository
+from app.utils.logger import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+HEADER = "idempotency-key"
+MAX_KEY_LENGTH = 255
+FINGERPRINT_MAX_BODY = 64 * 1024
+POLL_INTERVAL = 0.5  # seconds between checks on a key held by another worker
+UNCACHED_STATUSES = {408, 429}
+
+idempotent_requests = Counter(
+    "apk_idempotent_requests_total", "POST requests carrying an Idempotency-Key", ["outcome"]
+)
+
+
+@dataclass
+class _CapturedResponse:
+    status: Optional[int] = None
+    headers: list[list[str]] = field(default_factory=list)
+    body: bytearray = field(default_factory=bytearray)
+    complete: bool = False
+    oversized: bool = False
+
+    def record(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+            self.headers = [
+                [name.decode("latin-1"), value.decode("latin-1")]
+                for name, value in message.get("headers", [])
+                if name.lower() != b"content-length"
+            ]
+        elif message["type"] == "http.response.body":
+            chunk = message.get("body", b"")
+            if len(self.body) + len(chunk) > settings.IDEMPOTENCY_MAX_RESPONSE_BYTES:
+                self.oversized = True
+            elif not self.oversized:
+                self.body += chunk
+            self.complete = not message.get("more_body", False)
+
+    @property
+    def cacheable(self) -> bool:
+        return (
+            self.complete
+            and not self.oversized
+            and self.status is not None
+            and self.status < 500
+            and self.status not in UNCACHED_STATUSES
+        )
+
+
+def _with_repo(method: str, *args):
+    db = SessionLocal()
+    try:
+        return getattr(IdempotencyRepository(db), method)(*args)
+    finally:
+        db.close()
+
+
+class IdempotencyMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._running: dict[str, asyncio.Event] = {}  # keys owned by requests in this worker
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if HEADER not in headers:
+            await self.app(scope, receive, send)
+            return
+
+        client_key = headers[HEADER]
+        if not client_key or len(client_key) > MAX_KEY_LENGTH:
+            response = JSONResponse(
+                status_code=400,
+                content={"detail": f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"},
+            )
+            await response(scope, receive, send)
+            return
+
+        user = self._user(scope, headers)
+        if user is None:
+            await self.app(scope, receive, send)
+            return
+
+        receive, body = await self._buffer_body(headers, receive)
+        key = f"{user}:{client_key}"
+        fingerprint = self._fingerprint(scope, body)
+        await self._handle(key, fingerprint, scope, receive, send)
+
+    async def _handle(self, key: str, fingerprint: str, scope: Scope, receive: Receive, send: Send) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.IDEMPOTENCY_WAIT_SECONDS
+        waited = False
+        while True:
+            try:
+                claimed = await run_in_threadpool(
+                    _with_repo,
+                    "claim",
+                    key,
+                    fingerprint,
+                    settings.IDEMPOTENCY_TTL,
+                    settings.IDEMPOTENCY_LOCK_TIMEOUT,
+                )
+                record = None if claimed else await run_in_threadpool(_with_repo, "get", key)
+            except Exception as e:
+                # Fail open: without the table the request runs as it would without the header.
+                logger.error(f"Idempotency store failed for {key}: {e}")
+                await self.app(scope, receive, send)
+                return
+
+            if claimed:
+                idempotent_requests.inc(outcome="executed")
+                await self._execute(key, claimed, scope, receive, send)
+                return
+            if record is None:
+                continue  # released between the claim and the read; claim again
+
+            if record.fingerprint != fingerprint:
+                idempotent_requests.inc(outcome="mismatch")
+                await self._reply(
+                    422, "Idempotency-Key was already used for a different request", scope, receive, send
+                )
+                return
+            if record.status == IdempotencyStatus.COMPLETED:
+                idempotent_requests.inc(outcome="replayed_after_wait" if waited else "replayed")
+                await self._replay(record)(scope, receive, send)
+                return
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                idempotent_requests.inc(outcome="in_progress")
+                await self._reply(
+                    409,
+                    "A request with this Idempotency-Key is still in progress",
+                    scope,
+                    receive,
+                    send,
+                    retry_after=settings.IDEMPOTENCY_WAIT_SECONDS,
+                )
+                return
+            waited = True
+            await self._wait(key, remaining)
+
+    async def _execute(self, key: str, locked_at: datetime, scope: Scope, receive: Receive, send: Send) -> None:
+        event = self._running[key] = asyncio.Event()
+        captured = _CapturedResponse()
+
+        async def send_capturing(message: Message) -> None:
+            captured.record(message)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_capturing)
+        finally:
+            try:
+                if captured.cacheable:
+                    await run_in_threadpool(
+                        _with_repo,
+                        "complete",
+                        key,
+                        locked_at,
+                        captured.status,
+                        captured.headers,
+                        bytes(captured.body),
+                    )
+                else:
+                    await run_in_threadpool(_with_repo, "release", key, locked_at)
+            except Exception as e:
+                logger.error(f"Could not record idempotent response for {key}: {e}")
+            finally:
+                if self._running.get(key) is event:
+                    del self._running[key]
+                event.set()
+
+    async def _wait(self, key: str, remaining: float) -> None:
+        """Wait for the owner of `key` to finish: woken directly if it runs in this worker."""
+        event = self._running.get(key)
+        if event is None:
+            await asyncio.sleep(min(POLL_INTERVAL, remaining))
+            return
+        try:
+            await asyncio.wait_for(event.wait(), remaining)
+        except asyncio.TimeoutError:
+            pass
+
+    @staticmethod
+    def _replay(record: IdempotencyKey) -> Response:
+        response = Response(content=record.response_body or b"", status_code=record.response_status)
+        response.raw_headers.extend(
+            (name.encode("latin-1"), value.encode("latin-1")) for name, value in record.response_headers or []
+        )
+        response.raw_headers.append((b"idempotent-replayed", b"true"))
+        return response
+
+    @staticmethod
+    async def _reply(
+        status_code: int,
+        detail: str,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        retry_after: Optional[int] = None,
+    ) -> None:
+        headers = {"Retry-After": str(retry_after)} if retry_after else None
+        response = JSONResponse(status_code=status_code, content={"detail": detail}, headers=headers)
+        await response(scope, receive, send)
+
+    @staticmethod
+    async def _buffer_body(headers: Headers, receive: Receive) -> tuple[Receive, Optional[bytes]]:
+        """
+        Read a small body up front so it can be fingerprinted, and hand the app
+        a receive that replays it. Large or chunked bodies are left unread.
+        """
+        try:
+            size = int(headers["content-length"])
+        except (KeyError, ValueError):
+            return receive, None
+        if size > FINGERPRINT_MAX_BODY:
+            return receive, None
+
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                return receive, None  # client went away; the app will see the disconnect
+            body += message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+
+        replayed = False
+
+        async def replay() -> Message:
+            nonlocal replayed
+            if replayed:
+                return await receive()
+            replayed = True
+            return {"type": "http.request", "body": bytes(body), "more_body": False}
+
+        return replay, bytes(body)
+
+    @staticmethod
+    def _fingerprint(scope: Scope, body: Optional[bytes]) -> str:
+        digest = hashlib.sha256()
+        for part in (scope["method"], scope["path"], scope.get("query_string", b"").decode("latin-1")):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        if body is not None:
+            digest.update(body)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _user(scope: Scope, headers: Headers) -> Optional[str]:
+        scheme, _, credentials = headers.get("authorization", "").partition(" ")
+        token = credentials if scheme.lower() == "bearer" and credentials else None
+        token = token or QueryParams(scope.get("query_string", b"")).get("token")
+        payload = decode_access_token(token) if token else None
+        if not payload or payload.get("sub") is None:
+            return None
+        return str(payload["sub"])
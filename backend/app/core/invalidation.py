@@ -0,0 +1,87 @@
+"""
+Cross-worker cache invalidation.
+
+Process-local caches register a kind with two callbacks: `apply(key)` drops
+or reloads one entry, and `flush()` resets the whole cache. A write path
+updates its own process's cache as before and then calls publish(kind, key).
+The other processes, on this node and on other replicas, receive the message
+over the pubsub channel and apply it, usually within milliseconds.
+
+Invalidations published while a process was not listening are lost. Every
+cache is therefore flushed each time the LISTEN connection is (re)established.
+
+Handlers run on the listener thread, which opens its own sessions.
+Duplicate keys within one batch of messages are applied once.
+apk_invalidation_lag_seconds_total / apk_invalidations_applied_total gives the
+mean propagation latency.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable
+
+from app.core.metrics import Counter
+from app.core.pubsub import PgPubSub, pubsub
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CHANNEL = "apk_invalidate"
+
+invalidations_applied = Counter(
+    "apk_invalidations_applied_total", "Invalidations received from other processes", ["kind"]
+)
+invalidation_lag = Counter(
+    "apk_invalidation_lag_seconds_total", "Publish-to-apply delay of received invalidations", ["kind"]
+)
+invalidation_flushes = Counter("apk_invalidation_flushes_total", "Full cache flushes after (re)connecting")
+
+
+@dataclass(frozen=True)
+class _Cache:
+    apply: Callable[[Any], None]
+    flush: Callable[[], None]
+
+
+class InvalidationBus:
+    def __init__(self, transport: PgPubSub = pubsub):
+        self._caches: dict[str, _Cache] = {}
+        self._pubsub = transport
+        transport.subscribe(CHANNEL, self._deliver)
+        transport.on_connect(self.flush_all)
+
+    def register(self, kind: str, apply: Callable[[Any], None], flush: Callable[[], None]) -> None:
+        self._caches[kind] = _Cache(apply, flush)
+
+    def publish(self, kind: str, key: Hashable) -> None:
+        """Tell the other processes that `key` of `kind` changed; JSON-serialisable keys only."""
+        self._pubsub.publish(CHANNEL, {"kind": kind, "key": key, "sent_at": time.time()}, local=False)
+
+    def flush_all(self) -> None:
+        for kind, cache in self._caches.items():
+            try:
+                cache.flush()
+            except Exception as e:
+                logger.error(f"Flushing {kind} cache failed: {e}")
+        invalidation_flushes.inc()
+
+    def _deliver(self, messages: list[Any]) -> None:
+        now = time.time()
+        seen: set[tuple[str, Hashable]] = set()
+        for message in messages:
+            kind, key = message.get("kind"), message.get("key")
+            cache = self._caches.get(kind)
+            if cache is None:
+                continue  # a kind this process does not cache
+            invalidations_applied.inc(kind=kind)
+            invalidation_lag.inc(max(0.0, now - message.get("sent_at", now)), kind=kind)
+            if (kind, key) in seen:
+                continue
+            seen.add((kind, key))
+            try:
+                cache.apply(key)
+            except Exception as e:
+                logger.error(f"Applying {kind} invalidation for {key!r} failed: {e}")
+
+
+invalidation = InvalidationBus()
@@ -0,0 +1,198 @@
+"""
+Postgres LISTEN/NOTIFY fan-out between worker processes.
+
+Each worker process runs one listener thread on a dedicated connection, kept
+out of the SQLAlchemy pool. publish() hands a message to the local handlers
+straight away and queues it for the listener thread. That thread sends queued
+messages as NOTIFY batches and dispatches notifications from other processes
+to the same handlers. Handlers run on the listener thread, or on the
+publisher's thread for local messages, and must be quick and thread-safe.
+
+Notifications sent while a worker is not listening are lost. Each time the
+LISTEN connection is (re)established, the on_connect callbacks run so that
+state which depends on them can be rebuilt.
+"""
+
+import json
+import select
+import socket
+import threading
+from collections import defaultdict, deque
+from typing import Any, Callable, Optional
+
+from app.core.config import get_settings
+from app.core.database import engine
+from app.core.metrics import Counter
+from app.utils.logger import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+MAX_PAYLOAD = 7900  # Postgres caps a NOTIFY payload at 8000 bytes
+
+Handler = Callable[[list[Any]], None]
+
+pubsub_messages = Counter("apk_pubsub_messages_total", "Messages through LISTEN/NOTIFY", ["channel", "direction"])
+pubsub_reconnects = Counter("apk_pubsub_reconnects_total", "LISTEN connections re-established")
+
+
+class PgPubSub:
+    def __init__(self):
+        self._handlers: dict[str, list[Handler]] = defaultdict(list)
+        self._connect_handlers: list[Callable[[], None]] = []
+        self._outbox: deque[tuple[str, str]] = deque(maxlen=settings.PUBSUB_OUTBOX_SIZE)
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def subscribe(self, channel: str, handler: Handler) -> None:
+        """Call `handler` with each batch of messages published on `channel` by any process."""
+        self._handlers[channel].append(handler)
+
+    def on_connect(self, handler: Callable[[], None]) -> None:
+        """Call `handler` on the listener thread whenever LISTEN is (re)established."""
+        self._connect_handlers.append(handler)
+
+    def publish(self, channel: str, message: Any, local: bool = True) -> None:
+        """
+        Deliver a JSON-serialisable `message` to other processes shortly, and
+        to this one straight away unless `local` is False.
+        """
+        if local:
+            self._dispatch(channel, [message])
+        # ASCII-only JSON: pg8000 decodes notification payloads as ASCII.
+        payload = json.dumps(message, separators=(",", ":"), default=str)
+        if len(payload) > MAX_PAYLOAD:
+            logger.warning(f"Dropped {len(payload)}-byte message on {channel}: too large to NOTIFY")
+            return
+        self._outbox.append((channel, payload))
+        self._wake()
+
+    # ─── Lifecycle ────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="pubsub", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wake()
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    # ─── Listener thread ──────────────────────────────────────────────────
+
+    def _run(self) -> None:
+        connected_before = False
+        while not self._stopping.is_set():
+            connection = None
+            try:
+                connection, backend_pid = self._connect()
+                if connected_before:
+                    pubsub_reconnects.inc()
+                    logger.info("LISTEN connection re-established")
+                connected_before = True
+                self._run_connect_handlers()
+                self._listen(connection, backend_pid)
+            except Exception as e:
+                logger.error(f"LISTEN connection failed: {e}")
+                self._stopping.wait(settings.PUBSUB_RECONNECT_DELAY)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+    def _connect(self):
+        connection = engine.raw_connection()
+        connection.detach()  # held for the life of the thread; never returned to the pool
+        dbapi = connection.dbapi_connection
+        dbapi.rollback()  # LISTEN only takes effect outside a transaction
+        dbapi.autocommit = True
+        cursor = dbapi.cursor()
+        for channel in self._handlers:
+            cursor.execute(f'LISTEN "{channel}"')
+        cursor.execute("SELECT pg_backend_pid()")
+        return connection, cursor.fetchone()[0]
+
+    def _listen(self, connection, backend_pid: int) -> None:
+        dbapi = connection.dbapi_connection
+        cursor = dbapi.cursor()
+        sock = getattr(dbapi, "_usock", None)  # pg8000's socket; without it, poll on the interval
+        while not self._stopping.is_set():
+            self._send(cursor)
+            readable = [self._wake_r] + ([sock] if sock is not None else [])
+            ready, _, _ = select.select(readable, [], [], settings.PUBSUB_POLL_INTERVAL)
+            if self._wake_r in ready:
+                self._drain_wake()
+            # Notifications are only read off the socket while a query runs.
+            cursor.execute("SELECT 1")
+            self._receive(dbapi, backend_pid)
+
+    def _send(self, cursor) -> None:
+        batches: dict[str, list[str]] = defaultdict(list)
+        while self._outbox:
+            channel, payload = self._outbox.popleft()
+            batches[channel].append(payload)
+        for channel, payloads in batches.items():
+            batch: list[str] = []
+            size = 2
+            for payload in payloads:
+                if batch and size + len(payload) + 1 > MAX_PAYLOAD:
+                    cursor.execute("SELECT pg_notify(%s, %s)", (channel, f"[{','.join(batch)}]"))
+                    batch, size = [], 2
+                batch.append(payload)
+                size += len(payload) + 1
+            cursor.execute("SELECT pg_notify(%s, %s)", (channel, f"[{','.join(batch)}]"))
+            pubsub_messages.inc(len(payloads), channel=channel, direction="sent")
+
+    def _receive(self, dbapi, backend_pid: int) -> None:
+        while dbapi.notifications:
+            pid, channel, payload = dbapi.notifications.popleft()
+            if pid == backend_pid:
+                continue  # our own NOTIFY; delivered locally when published
+            try:
+                messages = json.loads(payload)
+            except ValueError:
+                logger.warning(f"Ignored malformed notification on {channel}")
+                continue
+            pubsub_messages.inc(len(messages), channel=channel, direction="received")
+            self._dispatch(channel, messages)
+
+    def _dispatch(self, channel: str, messages: list[Any]) -> None:
+        for handler in self._handlers.get(channel, ()):
+            try:
+                handler(messages)
+            except Exception as e:
+                logger.error(f"Handler for {channel} failed: {e}")
+
+    def _run_connect_handlers(self) -> None:
+        for handler in self._connect_handlers:
+            try:
+                handler()
+            except Exception as e:
+                logger.error(f"Connect handler failed: {e}")
+
+    def _wake(self) -> None:
+        try:
+            self._wake_w.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass  # already pending
+
+    def _drain_wake(self) -> None:
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+
+pubsub = PgPubSub()
@@ -0,0 +1,252 @@
+"""
+Token-bucket rate limiting for API calls and downloads.
+
+Every /api request takes a token from two buckets, one keyed by the user id
+from its token (when it has a valid one) and one keyed by the client IP.
+Download routes have their own, stricter request buckets and are also paced
+in bytes per second: each body chunk waits for enough byte tokens before it
+is sent. Byte tokens are taken in slices of RATE_LIMIT_PACE_SLICE_BYTES (or
+the rest of the body, if shorter) and spent chunk by chunk, so the buckets
+see one update per slice. Redirects to presigned URLs are counted as
+requests only. The client IP comes from X-Forwarded-For only behind
+TRUSTED_PROXIES.
+
+Buckets live in this process by default. With RATE_LIMIT_BACKEND=postgres
+they are rows updated atomically, so limits hold across uvicorn workers.
+Responses carry RateLimit-Limit / RateLimit-Remaining / RateLimit-Reset, and
+rejected requests get 429 with Retry-After.
+"""
+
+import asyncio
+import math
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.core.metrics import Counter
+from app.core.security import decode_access_token
+from app.repositories.rate_limit import RateLimitRepository
+from app.utils.client_ip import get_client_ip
+from app.utils.logger import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+DOWNLOAD_PATH_RE = re.compile(r"^/api/(files/\d+/download|projects/[^/]+/latest/download)$")
+MAX_MEMORY_BUCKETS = 100_000
+
+requests_limited = Counter(
+    "apk_requests_rate_limited_total", "Requests rejected with 429", ["scope"]
+)
+
+
+@dataclass(frozen=True)
+class Policy:
+    rate: float  # tokens per second
+    burst: float  # bucket size
+
+    def scaled(self, factor: float) -> "Policy":
+        return Policy(self.rate * factor, self.burst * factor)
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int  # seconds until the bucket is full again
+    wait: float  # exact seconds until the request would be allowed
+
+    @property
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.wait))
+
+    @classmethod
+    def of(cls, tokens: float, allowed: bool, amount: float, policy: Policy) -> "Decision":
+        return cls(
+            allowed=allowed,
+            limit=int(policy.burst),
+            remaining=max(0, int(tokens)),
+            reset=math.ceil(max(0.0, policy.burst - tokens) / policy.rate),
+            wait=0.0 if allowed else (amount - tokens) / policy.rate,
+        )
+
+
+# ─── Backends ─────────────────────────────────────────────────────────────────
+
+
+class MemoryBackend:
+    """Buckets in this process only."""
+
+    blocking = False
+
+    def __init__(self):
+        self._buckets: dict[str, tuple[float, float]] = {}  # key -> (tokens, monotonic time)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, amount: float, policy: Policy) -> Decision:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (policy.burst, now))
+            tokens = min(policy.burst, tokens + (now - updated) * policy.rate)
+            allowed = tokens >= amount
+            if allowed:
+                tokens -= amount
+            if len(self._buckets) >= MAX_MEMORY_BUCKETS and key not in self._buckets:
+                self._prune(now)
+            self._buckets[key] = (tokens, now)
+        return Decision.of(tokens, allowed, amount, policy)
+
+    def _prune(self, now: float) -> None:
+        # A bucket idle for a minute has refilled under any sane policy; forgetting it changes nothing.
+        self._buckets = {k: v for k, v in self._buckets.items() if now - v[1] < 60}
+
+
+class PostgresBackend:
+    """Buckets shared by every worker through the rate_limit_buckets table."""
+
+    blocking = True
+
+    def take(self, key: str, amount: float, policy: Policy) -> Decision:
+        db = SessionLocal()
+        try:
+            tokens, allowed = RateLimitRepository(db).take(key, amount, policy.rate, policy.burst)
+        finally:
+            db.close()
+        return Decision.of(tokens, allowed, amount, policy)
+
+
+def _create_backend():
+    if settings.RATE_LIMIT_BACKEND == "postgres":
+        return PostgresBackend()
+    return MemoryBackend()
+
+
+# ─── Middleware ───────────────────────────────────────────────────────────────
+
+
+class RateLimitMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.backend = _create_backend()
+        self.api = Policy(settings.RATE_LIMIT_API_RPS, settings.RATE_LIMIT_API_BURST)
+        self.download = Policy(settings.RATE_LIMIT_DOWNLOAD_RPS, settings.RATE_LIMIT_DOWNLOAD_BURST)
+        self.download_bytes = Policy(
+            settings.RATE_LIMIT_DOWNLOAD_BYTES_PER_SEC, settings.RATE_LIMIT_DOWNLOAD_BYTES_BURST
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        keys = self._keys(scope, headers)
+        is_download = bool(DOWNLOAD_PATH_RE.match(scope["path"]))
+        name, policy = ("download", self.download) if is_download else ("api", self.api)
+
+        decision = await self._take_all(name, keys, 1, policy)
+        if not decision.allowed:
+            requests_limited.inc(scope=name)
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "Rate limit exceeded"},
+                headers={**self._headers(decision), "Retry-After": str(decision.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        pace = is_download and settings.RATE_LIMIT_DOWNLOAD_BYTES_PER_SEC > 0
+        credit = {key: 0.0 for key, _ in keys}  # byte tokens taken but not yet spent
+        remaining: Optional[int] = None  # body bytes still to send, when declared
+
+        async def send_with_limits(message: Message) -> None:
+            nonlocal remaining
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.update(self._headers(decision))
+                length = headers.get("content-length", "")
+                remaining = int(length) if length.isdigit() else None
+            elif message["type"] == "http.response.body" and pace:
+                size = len(message.get("body", b""))
+                await self._pace(keys, size, credit, remaining)
+                if remaining is not None:
+                    remaining = max(0, remaining - size)
+            await send(message)
+
+        await self.app(scope, receive, send_with_limits)
+
+    async def _take(self, key: str, amount: float, policy: Policy) -> Decision:
+        if not self.backend.blocking:
+            return self.backend.take(key, amount, policy)
+        try:
+            return await run_in_threadpool(self.backend.take, key, amount, policy)
+        except Exception as e:
+            # Fail open: an unreachable limiter store must not take the API down with it.
+            logger.error(f"Rate limit backend failed for {key}: {e}")
+            return Decision.of(policy.burst, True, amount, policy)
+
+    async def _take_all(
+        self, name: str, keys: list[tuple[str, float]], amount: float, policy: Policy
+    ) -> Decision:
+        """Take from every bucket; the answer is the most restrictive one."""
+        decisions = [
+            await self._take(f"{name}:{key}", amount, policy.scaled(factor)) for key, factor in keys
+        ]
+        denied = [d for d in decisions if not d.allowed]
+        if denied:
+            return max(denied, key=lambda d: d.wait)
+        return min(decisions, key=lambda d: d.remaining)
+
+    async def _pace(
+        self,
+        keys: list[tuple[str, float]],
+        size: int,
+        credit: dict[str, float],
+        remaining: Optional[int],
+    ) -> None:
+        """
+        Wait until every byte bucket covers a chunk (capped at the burst so it
+        always can), spending `credit` first and topping it up by a slice.
+        """
+        for key, factor in keys:
+            policy = self.download_bytes.scaled(factor)
+            need = min(size, policy.burst)
+            if need <= credit[key]:
+                credit[key] -= need
+                continue
+            unpaid = (remaining - credit[key]) if remaining is not None else math.inf
+            slice_size = min(settings.RATE_LIMIT_PACE_SLICE_BYTES, unpaid)
+            amount = min(policy.burst, max(need - credit[key], slice_size))
+            while not (decision := await self._take(f"download-bytes:{key}", amount, policy)).allowed:
+                await asyncio.sleep(decision.wait)
+            credit[key] = max(0.0, credit[key] + amount - need)
+
+    @staticmethod
+    def _keys(scope: Scope, headers: Headers) -> list[tuple[str, float]]:
+        """Bucket keys with their policy factor: the user's, and the client IP's (shared behind NAT)."""
+        keys = [(f"ip:{get_client_ip(headers, scope.get('client'))}", settings.RATE_LIMIT_IP_FACTOR)]
+        scheme, _, credentials = headers.get("authorization", "").partition(" ")
+        token = credentials if scheme.lower() == "bearer" and credentials else None
+        token = token or QueryParams(scope.get("query_string", b"")).get("token")
+        payload: Optional[dict] = decode_access_token(token) if token else None
+        if payload and payload.get("sub") is not None:
+            keys.insert(0, (f"user:{payload['sub']}", 1.0))
+        return keys
+
+    @staticmethod
+    def _headers(decision: Decision) -> dict[str, str]:
+        return {
+            "RateLimit-Limit": str(decision.limit),
+            "RateLimit-Remaining": str(decision.remaining),
+            "RateLimit-Reset": str(decision.reset),
+        }
@@ -8,14 +8,26 @@ from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 from app.api.router import api_router
+from app.core.admission import UploadAdmissionMiddleware
 from app.core.config import get_settings
+from app.core.events import event_bus
+from app.core.executors import configure_executors, shutdown_executors
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.pubsub import pubsub
+from app.core.rate_limit import RateLimitMiddleware
 from app.core.database import Base, engine
+from app.services.delta import shutdown_delta_pool
+from app.services.download_analytics import download_analytics
+from app.services.health import readiness_probe
+from app.services.latest_build import rebuild_latest_build_index
+from app.workers.runner import job_runner
 
 settings = get_settings()
 logger = logging.getLogger("apk_manager")
@@ -28,11 +40,23 @@ TEMPLATES_DIR = BASE_DIR / "templates"
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Wait for DB (handled by Alembic in prod)."""
+    """Wait for DB (handled by Alembic in prod) and run background workers."""
+    configure_executors()
     # Base.metadata.create_all(bind=engine)
     logger.info("Database tables verified/created by Alembic.")
+    await run_in_threadpool(rebuild_latest_build_index)
+    if settings.JOB_WORKER_ENABLED:
+        job_runner.start()
+    download_analytics.start()
+    event_bus.start()
+    pubsub.start()
     yield
     logger.info("Application shutting down.")
+    await run_in_threadpool(pubsub.stop)
+    await download_analytics.stop()
+    await job_runner.stop()
+    shutdown_delta_pool()
+    shutdown_executors()
 
 
 app = FastAPI(
@@ -43,7 +67,27 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Each middleware added wraps the ones added before it, so they are listed
+# innermost first.
+
+# ─── Upload Admission ─────────────────────────────────────────────────────────
+# Innermost of the limiters, but still ahead of the routes: uploads are
+# admitted before their body is read.
+app.add_middleware(UploadAdmissionMiddleware)
+
+# ─── Idempotency Keys ─────────────────────────────────────────────────────────
+# Outside admission, so a retry waiting on its first attempt holds no upload slot.
+if settings.IDEMPOTENCY_ENABLED:
+    app.add_middleware(IdempotencyMiddleware)
+
+# ─── Rate Limiting ────────────────────────────────────────────────────────────
+# Outside the other limiters, so over-limit clients are turned away before any other work.
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
 # ─── CORS ─────────────────────────────────────────────────────────────────────
+# Outermost, so every response gets CORS headers, including the 401/413/429/507
+# the middlewares above answer on their own, and preflights skip the limiters.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[origin.strip() for origin in settings.ALLOWED_ORIGINS.split(",")],
@@ -71,6 +115,24 @@ app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 
 
+# ─── Health Checks ────────────────────────────────────────────────────────────
+# Registered before the SPA catch-all, outside /api so no middleware limits them.
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    """Liveness: the event loop answers. No I/O."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Readiness: database, connection pool and storage volumes, probed at most every few seconds."""
+    report = await readiness_probe.report()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if report.ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=report.model_dump(mode="json"),
+    )
+
+
 @app.get("/", include_in_schema=False)
 async def serve_root(request: Request):
     """Serve the SPA shell."""
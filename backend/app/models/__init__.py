@@ -2,10 +2,39 @@
 Models package — import all models to ensure they are registered with SQLAlchemy.
 """
 
-from app.models.apk_file import APKFile
+from app.models.apk_file import APKFile, IntegrityStatus
+from app.models.deletion_task import DeletionStatus, DeletionTarget, DeletionTask
 from app.models.download_log import FileDownloadLog
+from app.models.download_stats import DownloadDailyStats, FileDownloadDailyStats
+from app.models.idempotency import IdempotencyKey, IdempotencyStatus
+from app.models.job import Job, JobStatus
 from app.models.project import Project
+from app.models.rate_limit import RateLimitBucket
+from app.models.reconcile_run import ReconcileMode, ReconcileRun, ReconcileStatus
+from app.models.scrub_run import ScrubRun
 from app.models.user import User, UserRole
 from app.models.version import Version
 
-__all__ = ["User", "UserRole", "Project", "Version", "APKFile", "FileDownloadLog"]
+__all__ = [
+    "User",
+    "UserRole",
+    "Project",
+    "Version",
+    "APKFile",
+    "IntegrityStatus",
+    "FileDownloadLog",
+    "DownloadDailyStats",
+    "FileDownloadDailyStats",
+    "IdempotencyKey",
+    "IdempotencyStatus",
+    "DeletionTask",
+    "DeletionTarget",
+    "DeletionStatus",
+    "Job",
+    "JobStatus",
+    "RateLimitBucket",
+    "ReconcileRun",
+    "ReconcileMode",
+    "ReconcileStatus",
+    "ScrubRun",
+]
@@ -2,21 +2,50 @@
 APKFile model — represents an uploaded APK file tied to a version.
 """
 
+import enum
 from datetime import datetime
 
-from sqlalchemy import BigInteger, DateTime, ForeignKey, String, func
+from sqlalchemy import BigInteger, DateTime, Enum, ForeignKey, Index, Integer, String, func
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
 
 
+class IntegrityStatus(str, enum.Enum):
+    OK = "OK"
+    MISMATCH = "MISMATCH"  # stored bytes no longer hash to `sha256`
+    MISSING = "MISSING"  # the file is gone from its volume
+
+
 class APKFile(Base):
     __tablename__ = "apk_files"
+    __table_args__ = (
+        # GIN index so `abis @> ARRAY['arm64-v8a']` filters without a scan.
+        Index("ix_apk_files_abis", "abis", postgresql_using="gin"),
+        # Trigram index for /search by filename (prefix, substring, typos).
+        Index(
+            "ix_apk_files_filename_trgm",
+            "filename",
+            postgresql_using="gin",
+            postgresql_ops={"filename": "gin_trgm_ops"},
+        ),
+        # Prefix scans of one volume's fan-out directory (`file_path LIKE 'ab/%'`).
+        Index(
+            "ix_apk_files_volume_path",
+            "volume_id",
+            "file_path",
+            postgresql_ops={"file_path": "text_pattern_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     filename: Mapped[str] = mapped_column(String(255), nullable=False)
     file_size: Mapped[int] = mapped_column(BigInteger, nullable=False)
     file_path: Mapped[str] = mapped_column(String(512), nullable=False)
+    # Storage volume holding the file; file_path is relative to its root.
+    # NULL for files stored before volumes existed (file_path is absolute).
+    volume_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
     version_id: Mapped[int] = mapped_column(
         ForeignKey("versions.id", ondelete="CASCADE"), nullable=False, index=True
     )
@@ -27,14 +56,39 @@ class APKFile(Base):
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
 
+    # Integrity: SHA-256 taken at upload (or backfilled), re-checked by the scrubber.
+    sha256: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+    integrity_status: Mapped[IntegrityStatus | None] = mapped_column(
+        Enum(IntegrityStatus), nullable=True, index=True
+    )  # NULL until first verified
+    verified_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # Manifest metadata, extracted once at upload time (NULL if the APK could not be parsed)
+    package_name: Mapped[str | None] = mapped_column(String(255), nullable=True, index=True)
+    version_code: Mapped[int | None] = mapped_column(BigInteger, nullable=True, index=True)
+    version_name: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    min_sdk: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    target_sdk: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    abis: Mapped[list[str]] = mapped_column(
+        ARRAY(String(32)), nullable=False, default=list, server_default="{}"
+    )
+    signing_cert_sha256: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+
     # Relationships
     version: Mapped["Version"] = relationship("Version", back_populates="apk_files")
     uploader: Mapped["User"] = relationship(
         "User", back_populates="uploaded_files", foreign_keys=[uploaded_by]
     )
     download_logs: Mapped[list["FileDownloadLog"]] = relationship(
-        "FileDownloadLog", back_populates="apk_file", cascade="all, delete-orphan"
+        "FileDownloadLog",
+        back_populates="apk_file",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     def __repr__(self) -> str:
         return f"<APKFile id={self.id} filename={self.filename}>"
+
+
+# The scrubber's "never verified, then least recently verified" scan.
+Index("ix_apk_files_verified_at", APKFile.verified_at.asc().nulls_first())
@@ -0,0 +1,57 @@
+"""
+DeletionTask model — tracks the background purge of a deleted project or version.
+"""
+
+import enum
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Enum, ForeignKey, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class DeletionTarget(str, enum.Enum):
+    PROJECT = "PROJECT"
+    VERSION = "VERSION"
+
+
+class DeletionStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
+class DeletionTask(Base):
+    __tablename__ = "deletion_tasks"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    # No FK on target_id: the target row disappears once the purge completes.
+    target_type: Mapped[DeletionTarget] = mapped_column(Enum(DeletionTarget), nullable=False)
+    target_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    target_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    status: Mapped[DeletionStatus] = mapped_column(
+        Enum(DeletionStatus), default=DeletionStatus.PENDING, nullable=False, index=True
+    )
+    total_files: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    files_deleted: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    versions_deleted: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    bytes_reclaimed: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    requested_by: Mapped[int | None] = mapped_column(
+        ForeignKey("users.id", ondelete="SET NULL"), nullable=True
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"<DeletionTask id={self.id} {self.target_type.value}={self.target_id} "
+            f"status={self.status.value}>"
+        )
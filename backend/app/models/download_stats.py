@@ -0,0 +1,41 @@
+"""
+Download statistics models — per-day and per-file-per-day sketches of the download log.
+"""
+
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import JSON, BigInteger, Date, ForeignKey, Integer, LargeBinary
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class DownloadDailyStats(Base):
+    """All downloads of one UTC day."""
+
+    __tablename__ = "download_daily_stats"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    downloads: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0", nullable=False)
+    unique_ips: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)  # HyperLogLog registers
+    top_files: Mapped[Optional[dict[str, int]]] = mapped_column(JSON, nullable=True)  # file id -> downloads
+
+    def __repr__(self) -> str:
+        return f"<DownloadDailyStats day={self.day} downloads={self.downloads}>"
+
+
+class FileDownloadDailyStats(Base):
+    """Downloads of one file on one UTC day."""
+
+    __tablename__ = "file_download_daily_stats"
+
+    file_id: Mapped[int] = mapped_column(
+        ForeignKey("apk_files.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    downloads: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    unique_ips: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)  # HyperLogLog registers
+
+    def __repr__(self) -> str:
+        return f"<FileDownloadDailyStats file_id={self.file_id} day={self.day} downloads={self.downloads}>"
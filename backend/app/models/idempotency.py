@@ -0,0 +1,37 @@
+"""
+IdempotencyKey model — a POST request identified by its Idempotency-Key and the response it produced.
+"""
+
+import enum
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import JSON, DateTime, Enum, Integer, LargeBinary, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class IdempotencyStatus(str, enum.Enum):
+    IN_PROGRESS = "IN_PROGRESS"
+    COMPLETED = "COMPLETED"
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    key: Mapped[str] = mapped_column(String(320), primary_key=True)  # "<user id>:<Idempotency-Key>"
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)  # SHA-256 of method, path, query, body
+    status: Mapped[IdempotencyStatus] = mapped_column(
+        Enum(IdempotencyStatus), default=IdempotencyStatus.IN_PROGRESS, nullable=False
+    )
+    response_status: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    response_headers: Mapped[Optional[list[Any]]] = mapped_column(JSON, nullable=True)
+    response_body: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    locked_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        return f"<IdempotencyKey key={self.key} status={self.status.value}>"
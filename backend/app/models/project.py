@@ -4,7 +4,7 @@ Project model — top-level grouping for APK versions.
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, String, Text, func
+from sqlalchemy import DDL, BigInteger, DateTime, Index, Integer, String, Text, event, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -12,6 +12,18 @@ from app.core.database import Base
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        # Trigram indexes for /search: prefix, substring and typo-tolerant matching.
+        Index(
+            "ix_projects_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_projects_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(128), unique=True, nullable=False, index=True)
@@ -19,10 +31,24 @@ class Project(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+    # Set when the project is scheduled for deletion; rows are purged in the background.
+    deleted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # Retention (see app/services/retention.py): a version is kept while it is among the
+    # newest `retention_keep_last` or younger than `retention_keep_days`. NULL = rule off.
+    retention_keep_last: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    retention_keep_days: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    # Storage quota (NULL = unlimited) and the bytes its file rows account for, kept
+    # up to date by every upload and delete (see app/services/quota.py).
+    storage_quota_bytes: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    storage_used_bytes: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0, server_default=text("0")
+    )
 
     # Relationships
     versions: Mapped[list["Version"]] = relationship(
-        "Version", back_populates="project", cascade="all, delete-orphan"
+        "Version", back_populates="project", cascade="all, delete-orphan", passive_deletes=True
     )
     authorized_users: Mapped[list["User"]] = relationship(
         "User", secondary="user_project_access", back_populates="projects"
@@ -30,3 +56,7 @@ class Project(Base):
 
     def __repr__(self) -> str:
         return f"<Project id={self.id} name={self.name}>"
+
+
+# The trigram operator classes above come from pg_trgm.
+event.listen(Project.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
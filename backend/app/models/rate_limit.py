@@ -0,0 +1,25 @@
+"""
+RateLimitBucket model — token-bucket state shared by all worker processes.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, Float, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+
+    # e.g. "api:user:42", "download:ip:10.0.0.7", "download-bytes:user:42"
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    tokens: Mapped[float] = mapped_column(Float, nullable=False)
+    allowed: Mapped[bool] = mapped_column(Boolean, nullable=False)  # outcome of the last take
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
+    )
+
+    def __repr__(self) -> str:
+        return f"<RateLimitBucket key={self.key} tokens={self.tokens:.1f}>"
@@ -0,0 +1,68 @@
+"""
+ReconcileRun model — one pass comparing stored files against the apk_files table.
+"""
+
+import enum
+from datetime import datetime
+
+from sqlalchemy import JSON, BigInteger, DateTime, Enum, ForeignKey, Integer, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class ReconcileMode(str, enum.Enum):
+    REPORT = "REPORT"  # only record findings
+    QUARANTINE = "QUARANTINE"  # move orphan files aside, keep rows
+    DELETE = "DELETE"  # delete orphan files and dangling rows
+
+
+class ReconcileStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
+class ReconcileRun(Base):
+    __tablename__ = "reconcile_runs"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    mode: Mapped[ReconcileMode] = mapped_column(Enum(ReconcileMode), nullable=False)
+    status: Mapped[ReconcileStatus] = mapped_column(
+        Enum(ReconcileStatus), default=ReconcileStatus.PENDING, nullable=False, index=True
+    )
+    # Work units ("<volume>:<fan-out dir>", or "legacy:") fixed at creation;
+    # `position` is the checkpoint, the number of units already reconciled.
+    units: Mapped[list[str]] = mapped_column(JSON, nullable=False)
+    position: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    files_scanned: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    rows_scanned: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    orphan_files: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    orphan_bytes: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    dangling_rows: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    duplicate_paths: Mapped[int] = mapped_column(Integer, default=0, nullable=False)  # shared by rows
+    files_quarantined: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    files_deleted: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    rows_deleted: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    findings: Mapped[list[dict]] = mapped_column(JSON, default=list, nullable=False)
+
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    requested_by: Mapped[int | None] = mapped_column(
+        ForeignKey("users.id", ondelete="SET NULL"), nullable=True
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    @property
+    def total_units(self) -> int:
+        return len(self.units)
+
+    def __repr__(self) -> str:
+        return f"<ReconcileRun id={self.id} mode={self.mode.value} status={self.status.value}>"
@@ -0,0 +1,35 @@
+"""
+ScrubRun model — one integrity scrubber pass, kept for progress and throughput reporting.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Integer, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class ScrubRun(Base):
+    __tablename__ = "scrub_runs"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    files_checked: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    bytes_read: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    mismatches: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    missing: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    errors: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    @property
+    def bytes_per_second(self) -> float:
+        if self.finished_at is None:
+            return 0.0
+        elapsed = (self.finished_at - self.started_at).total_seconds()
+        return self.bytes_read / elapsed if elapsed > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return f"<ScrubRun id={self.id} files={self.files_checked} mismatches={self.mismatches}>"
@@ -4,7 +4,7 @@ Version model — belongs to a Project, holds APK files.
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, UniqueConstraint, func
+from sqlalchemy import BigInteger, Boolean, DateTime, ForeignKey, Index, String, UniqueConstraint, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -14,22 +14,59 @@ class Version(Base):
     __tablename__ = "versions"
     __table_args__ = (
         UniqueConstraint("project_id", "version_string", name="uq_version_per_project"),
+        Index(
+            "ix_versions_version_string_trgm",
+            "version_string",
+            postgresql_using="gin",
+            postgresql_ops={"version_string": "gin_trgm_ops"},
+        ),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     version_string: Mapped[str] = mapped_column(String(64), nullable=False)
+    channel: Mapped[str] = mapped_column(
+        String(32), nullable=False, default="stable", server_default="stable"
+    )
     project_id: Mapped[int] = mapped_column(
         ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True
     )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+    # Set when the version is scheduled for deletion; rows are purged in the background.
+    deleted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Pinned versions are never removed by retention.
+    pinned: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, default=False, server_default=text("false")
+    )
+
+    # Normalized semantic-version sort key, see app.utils.semver (NULL until backfilled)
+    semver_major: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    semver_minor: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    semver_patch: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    semver_prerelease: Mapped[str | None] = mapped_column(
+        String(1024, collation="C"), nullable=True
+    )
 
     # Relationships
     project: Mapped["Project"] = relationship("Project", back_populates="versions")
     apk_files: Mapped[list["APKFile"]] = relationship(
-        "APKFile", back_populates="version", cascade="all, delete-orphan"
+        "APKFile", back_populates="version", cascade="all, delete-orphan", passive_deletes=True
     )
 
     def __repr__(self) -> str:
         return f"<Version id={self.id} version={self.version_string} project_id={self.project_id}>"
+
+
+# Column order/direction matches VersionRepository's NEWEST_FIRST, so "versions of a
+# project, newest first" (optionally LIMIT N) is a forward index scan with no sort.
+Index(
+    "ix_versions_project_semver",
+    Version.project_id,
+    Version.semver_major.desc().nulls_last(),
+    Version.semver_minor.desc().nulls_last(),
+    Version.semver_patch.desc().nulls_last(),
+    Version.semver_prerelease.desc().nulls_last(),
+    Version.id.desc(),
+    postgresql_where=text("deleted_at IS NULL"),
+)
@@ -2,28 +2,375 @@
 APKFile repository — database access for APK files.
 """
 
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Optional
 
-from app.models.apk_file import APKFile
+from sqlalchemy import and_, delete, exists, func, or_, select, tuple_, update
+from sqlalchemy.orm import Session, aliased
+
+from app.models.apk_file import APKFile, IntegrityStatus
+from app.models.version import Version
 from app.repositories.base import BaseRepository
+from app.schemas.apk_file import APKFileFilters
 
 
 class APKFileRepository(BaseRepository[APKFile]):
     def __init__(self, db: Session):
         super().__init__(APKFile, db)
 
-    def get_by_version(self, version_id: int) -> list[APKFile]:
+    def get(self, id: int) -> Optional[APKFile]:
+        return (
+            self.db.query(APKFile)
+            .join(Version, Version.id == APKFile.version_id)
+            .filter(APKFile.id == id, Version.deleted_at.is_(None))
+            .first()
+        )
+
+    def get_project_id(self, id: int) -> Optional[int]:
+        """The owning project, in one primary-key join."""
+        return self.db.execute(
+            select(Version.project_id)
+            .join(APKFile, APKFile.version_id == Version.id)
+            .where(APKFile.id == id, Version.deleted_at.is_(None))
+        ).scalar_one_or_none()
+
+    def get_by_version(
+        self, version_id: int, filters: Optional[APKFileFilters] = None
+    ) -> list[APKFile]:
+        query = self.db.query(APKFile).filter(APKFile.version_id == version_id)
+        return self._apply_filters(query, filters).order_by(APKFile.uploaded_at.desc()).all()
+
+    def get_by_filename(self, version_id: int, filename: str) -> Optional[APKFile]:
+        return (
+            self.db.query(APKFile)
+            .filter(APKFile.version_id == version_id, APKFile.filename == filename)
+            .first()
+        )
+
+    def get_by_versions(self, version_ids: list[int]) -> list[APKFile]:
+        if not version_ids:
+            return []
         return (
             self.db.query(APKFile)
-            .filter(APKFile.version_id == version_id)
+            .filter(APKFile.version_id.in_(version_ids))
+            .order_by(APKFile.uploaded_at.desc(), APKFile.id.desc())
+            .all()
+        )
+
+    def get_by_project(
+        self, project_id: int, filters: Optional[APKFileFilters] = None, limit: int = 100
+    ) -> list[APKFile]:
+        query = (
+            self.db.query(APKFile)
+            .join(Version, Version.id == APKFile.version_id)
+            .filter(Version.project_id == project_id, Version.deleted_at.is_(None))
+        )
+        return (
+            self._apply_filters(query, filters)
             .order_by(APKFile.uploaded_at.desc())
+            .limit(limit)
             .all()
         )
 
+    @staticmethod
+    def _apply_filters(query, filters: Optional[APKFileFilters]):
+        if filters is None:
+            return query
+        if filters.package_name is not None:
+            query = query.filter(APKFile.package_name == filters.package_name)
+        if filters.version_code is not None:
+            query = query.filter(APKFile.version_code == filters.version_code)
+        if filters.abi is not None:
+            query = query.filter(APKFile.abis.contains([filters.abi]))
+        if filters.signing_cert_sha256 is not None:
+            query = query.filter(
+                APKFile.signing_cert_sha256 == filters.signing_cert_sha256.lower()
+            )
+        return query
+
     def total_storage_bytes(self) -> int:
         result = self.db.query(func.sum(APKFile.file_size)).scalar()
         return result or 0
 
     def count_all(self) -> int:
         return self.db.query(APKFile).count()
+
+    def count_for_project(self, project_id: int) -> int:
+        return (
+            self.db.query(func.count(APKFile.id))
+            .join(Version, Version.id == APKFile.version_id)
+            .filter(Version.project_id == project_id)
+            .scalar()
+        )
+
+    def count_for_version(self, version_id: int) -> int:
+        return self.db.query(func.count(APKFile.id)).filter(APKFile.version_id == version_id).scalar()
+
+    def delete_batch_for_project(
+        self, project_id: int, limit: int
+    ) -> list[tuple[Optional[str], str, int]]:
+        """
+        Delete up to `limit` files of a project without loading them into the session.
+        Download logs go with them through the ON DELETE CASCADE foreign key.
+
+        Returns (volume_id, file_path, file_size) for each deleted row. Does not commit.
+        """
+        ids = (
+            select(APKFile.id)
+            .join(Version, Version.id == APKFile.version_id)
+            .where(Version.project_id == project_id)
+            .limit(limit)
+        )
+        return self._delete_returning(ids)
+
+    def delete_batch_for_version(
+        self, version_id: int, limit: int
+    ) -> list[tuple[Optional[str], str, int]]:
+        """Same as `delete_batch_for_project`, scoped to a single version."""
+        ids = select(APKFile.id).where(APKFile.version_id == version_id).limit(limit)
+        return self._delete_returning(ids)
+
+    def _delete_returning(self, ids) -> list[tuple[Optional[str], str, int]]:
+        stmt = (
+            delete(APKFile)
+            .where(APKFile.id.in_(ids.scalar_subquery()))
+            .returning(APKFile.volume_id, APKFile.file_path, APKFile.file_size)
+        )
+        result = self.db.execute(stmt, execution_options={"synchronize_session": False})
+        return [(row.volume_id, row.file_path, row.file_size) for row in result]
+
+    # ─── Volume rebalancing ───────────────────────────────────────────────
+
+    def get_on_volume(
+        self, volume_id: Optional[str], after_id: int, limit: int
+    ) -> list[APKFile]:
+        """Live files on a volume (None = legacy absolute paths), in id order from `after_id`."""
+        return (
+            self.db.query(APKFile)
+            .join(Version, Version.id == APKFile.version_id)
+            .filter(
+                APKFile.volume_id.is_(None) if volume_id is None else APKFile.volume_id == volume_id,
+                APKFile.id > after_id,
+                Version.deleted_at.is_(None),
+            )
+            .order_by(APKFile.id)
+            .limit(limit)
+            .all()
+        )
+
+    def move(
+        self,
+        from_volume: Optional[str],
+        from_path: str,
+        to_volume: str,
+        to_path: str,
+    ) -> bool:
+        """
+        Repoint every row sharing a stored file at its new location. False if
+        none points at the old one any more (deleted or moved meanwhile). Commits.
+        """
+        result = self.db.execute(
+            update(APKFile)
+            .where(
+                APKFile.volume_id.is_not_distinct_from(from_volume),
+                APKFile.file_path == from_path,
+            )
+            .values(volume_id=to_volume, file_path=to_path),
+            execution_options={"synchronize_session": False},
+        )
+        self.db.commit()
+        return result.rowcount > 0
+
+    # ─── Shared files ─────────────────────────────────────────────────────
+
+    def get_reusable(
+        self, sha256: str, size: int, project_ids: Optional[frozenset[int]] = None
+    ) -> Optional[APKFile]:
+        """
+        A row of `project_ids` (None for any project) whose stored file has
+        these exact bytes and is not known to be damaged. Locked FOR SHARE, so
+        a concurrent purge of that row waits for the caller's commit and then
+        sees the new reference.
+        """
+        query = self.db.query(APKFile)
+        if project_ids is not None:
+            query = query.join(Version, Version.id == APKFile.version_id).filter(
+                Version.project_id.in_(sorted(project_ids))
+            )
+        return (
+            query.filter(
+                APKFile.sha256 == sha256,
+                APKFile.file_size == size,
+                or_(
+                    APKFile.integrity_status.is_(None),
+                    APKFile.integrity_status == IntegrityStatus.OK,
+                ),
+            )
+            .order_by(APKFile.id)
+            .with_for_update(read=True, of=APKFile)
+            .first()
+        )
+
+    def referenced_locations(
+        self, locations: list[tuple[Optional[str], str]]
+    ) -> set[tuple[Optional[str], str]]:
+        """The (volume_id, file_path) pairs among `locations` that some row still points at."""
+        located = list({(v, p) for v, p in locations if v is not None})
+        legacy = list({p for v, p in locations if v is None})
+        conditions = []
+        if located:
+            conditions.append(tuple_(APKFile.volume_id, APKFile.file_path).in_(located))
+        if legacy:
+            conditions.append(and_(APKFile.volume_id.is_(None), APKFile.file_path.in_(legacy)))
+        if not conditions:
+            return set()
+        rows = self.db.query(APKFile.volume_id, APKFile.file_path).filter(or_(*conditions)).distinct()
+        return {(row.volume_id, row.file_path) for row in rows}
+
+    def reclaimable(self, version_ids: list[int]) -> tuple[int, int]:
+        """
+        Files in `version_ids` and the bytes deleting them would free. Stored
+        files also used by rows of other versions stay on disk and are not counted.
+        """
+        if not version_ids:
+            return 0, 0
+        other = aliased(APKFile)
+        shared = exists().where(
+            other.file_path == APKFile.file_path,
+            other.volume_id.is_not_distinct_from(APKFile.volume_id),
+            other.version_id.not_in(version_ids),
+        )
+        freed = (
+            select(func.max(APKFile.file_size).label("size"))
+            .where(APKFile.version_id.in_(version_ids), ~shared)
+            .group_by(APKFile.volume_id, APKFile.file_path)
+            .subquery()
+        )
+        files = self.db.execute(
+            select(func.count(APKFile.id)).where(APKFile.version_id.in_(version_ids))
+        ).scalar_one()
+        freed_bytes = self.db.execute(select(func.coalesce(func.sum(freed.c.size), 0))).scalar_one()
+        return files, int(freed_bytes)
+
+    # ─── Reconciliation ───────────────────────────────────────────────────
+
+    def scan_locations(
+        self, volume_id: Optional[str], prefix: Optional[str], after_id: int, limit: int
+    ):
+        """
+        Keyset page of (id, file_path, uploaded_at) for one volume, optionally
+        restricted to keys under `prefix/`. Includes files of versions pending
+        deletion: their blobs are still legitimately on disk.
+        """
+        query = self.db.query(APKFile.id, APKFile.file_path, APKFile.uploaded_at).filter(
+            APKFile.volume_id.is_(None) if volume_id is None else APKFile.volume_id == volume_id,
+            APKFile.id > after_id,
+        )
+        if prefix is not None:
+            query = query.filter(APKFile.file_path.like(f"{prefix}/%"))
+        return query.order_by(APKFile.id).limit(limit).all()
+
+    def delete_by_ids(self, ids: list[int]) -> dict[int, int]:
+        """Delete rows by id. Returns the bytes removed per affected project id. Does not commit."""
+        if not ids:
+            return {}
+        removed = {
+            row.project_id: int(row.size)
+            for row in self.db.query(Version.project_id, func.sum(APKFile.file_size).label("size"))
+            .join(APKFile, APKFile.version_id == Version.id)
+            .filter(APKFile.id.in_(ids))
+            .group_by(Version.project_id)
+        }
+        self.db.execute(
+            delete(APKFile).where(APKFile.id.in_(ids)),
+            execution_options={"synchronize_session": False},
+        )
+        return removed
+
+    # ─── Integrity ────────────────────────────────────────────────────────
+
+    def get_unhashed(self, limit: int):
+        """(id, volume_id, file_path) of files with no checksum that were never tried."""
+        return (
+            self.db.query(APKFile.id, APKFile.volume_id, APKFile.file_path)
+            .filter(APKFile.sha256.is_(None), APKFile.verified_at.is_(None))
+            .order_by(APKFile.id)
+            .limit(limit)
+            .all()
+        )
+
+    def get_due_for_scrub(self, verified_before: datetime, limit: int):
+        """(id, volume_id, file_path, sha256) of files never verified or verified before the cutoff."""
+        return (
+            self.db.query(APKFile.id, APKFile.volume_id, APKFile.file_path, APKFile.sha256)
+            .filter(
+                APKFile.sha256.is_not(None),
+                or_(APKFile.verified_at.is_(None), APKFile.verified_at < verified_before),
+            )
+            .order_by(APKFile.verified_at.asc().nulls_first())
+            .limit(limit)
+            .all()
+        )
+
+    def record_verification(
+        self,
+        file_id: int,
+        integrity_status: Optional[IntegrityStatus],
+        sha256: Optional[str] = None,
+    ) -> None:
+        """Stamp a verification result (status None = inconclusive). Does not commit."""
+        values = {"verified_at": func.now()}
+        if integrity_status is not None:
+            values["integrity_status"] = integrity_status
+        if sha256 is not None:
+            values["sha256"] = sha256
+        self.db.execute(
+            update(APKFile).where(APKFile.id == file_id).values(**values),
+            execution_options={"synchronize_session": False},
+        )
+
+    def integrity_counts(self, verified_before: datetime) -> dict[str, int]:
+        row = self.db.query(
+            func.count(APKFile.id),
+            func.count(APKFile.id).filter(APKFile.sha256.is_(None)),
+            func.count(APKFile.id).filter(
+                APKFile.sha256.is_not(None),
+                or_(APKFile.verified_at.is_(None), APKFile.verified_at < verified_before),
+            ),
+            func.count(APKFile.id).filter(APKFile.integrity_status == IntegrityStatus.MISMATCH),
+            func.count(APKFile.id).filter(APKFile.integrity_status == IntegrityStatus.MISSING),
+        ).one()
+        return dict(zip(("total", "unhashed", "due", "mismatched", "missing"), row))
+
+    def get_flagged(self, limit: int = 100) -> list[APKFile]:
+        return (
+            self.db.query(APKFile)
+            .filter(
+                APKFile.integrity_status.in_([IntegrityStatus.MISMATCH, IntegrityStatus.MISSING])
+            )
+            .order_by(APKFile.verified_at.desc())
+            .limit(limit)
+            .all()
+        )
+
+    def get_delta_base(self, target: APKFile, sha256: str) -> Optional[APKFile]:
+        """An earlier, intact file of the same project and package with the given checksum."""
+        query = (
+            self.db.query(APKFile)
+            .join(Version, Version.id == APKFile.version_id)
+            .filter(
+                Version.project_id == target.version.project_id,
+                Version.deleted_at.is_(None),
+                APKFile.sha256 == sha256,
+                APKFile.id != target.id,
+                or_(
+                    APKFile.integrity_status.is_(None),
+                    APKFile.integrity_status == IntegrityStatus.OK,
+                ),
+            )
+        )
+        if target.package_name:
+            query = query.filter(
+                or_(APKFile.package_name.is_(None), APKFile.package_name == target.package_name)
+            )
+        return query.order_by(APKFile.id.desc()).first()
@@ -30,6 +30,14 @@ class BaseRepository(Generic[ModelType]):
         self.db.refresh(obj)
         return obj
 
+    def create_many(self, objs: list[ModelType]) -> list[ModelType]:
+        """Insert several rows in one transaction."""
+        self.db.add_all(objs)
+        self.db.commit()
+        for obj in objs:
+            self.db.refresh(obj)
+        return objs
+
     def update(self, obj: ModelType) -> ModelType:
         self.db.commit()
         self.db.refresh(obj)
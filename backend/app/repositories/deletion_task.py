@@ -0,0 +1,32 @@
+"""
+DeletionTask repository — database access for background deletion tasks.
+"""
+
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.deletion_task import DeletionTask
+from app.repositories.base import BaseRepository
+
+
+class DeletionTaskRepository(BaseRepository[DeletionTask]):
+    def __init__(self, db: Session):
+        super().__init__(DeletionTask, db)
+
+    def get_recent(self, limit: int = 50) -> list[DeletionTask]:
+        return (
+            self.db.query(DeletionTask)
+            .order_by(DeletionTask.created_at.desc())
+            .limit(limit)
+            .all()
+        )
+
+    def get_for_update(self, task_id: int) -> Optional[DeletionTask]:
+        """Lock a task row for the current transaction while a batch is purged."""
+        return (
+            self.db.query(DeletionTask)
+            .filter(DeletionTask.id == task_id)
+            .with_for_update()
+            .first()
+        )
@@ -0,0 +1,81 @@
+"""
+Download statistics repository — locking and reading the per-day sketch rows.
+"""
+
+from datetime import date
+
+from sqlalchemy import Date, Row, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.apk_file import APKFile
+from app.models.download_stats import DownloadDailyStats, FileDownloadDailyStats
+from app.models.project import Project
+from app.models.version import Version
+
+
+class DownloadStatsRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def lock_day(self, day: date) -> DownloadDailyStats:
+        """The row for `day`, created if missing and locked until commit."""
+        self.db.execute(insert(DownloadDailyStats).values(day=day).on_conflict_do_nothing())
+        return self.db.execute(
+            select(DownloadDailyStats).where(DownloadDailyStats.day == day).with_for_update()
+        ).scalar_one()
+
+    def lock_file_days(self, day: date, file_ids: list[int]) -> list[FileDownloadDailyStats]:
+        """
+        The rows of `file_ids` for `day`, created if missing and locked until
+        commit in file id order. Files deleted in the meantime get no row.
+        """
+        self.db.execute(
+            insert(FileDownloadDailyStats)
+            .from_select(
+                ["file_id", "day"],
+                select(APKFile.id, literal(day, Date)).where(APKFile.id.in_(file_ids)),
+            )
+            .on_conflict_do_nothing()
+        )
+        return list(
+            self.db.execute(
+                select(FileDownloadDailyStats)
+                .where(FileDownloadDailyStats.day == day, FileDownloadDailyStats.file_id.in_(file_ids))
+                .order_by(FileDownloadDailyStats.file_id)
+                .with_for_update()
+            ).scalars()
+        )
+
+    def get_days(self, start: date) -> list[DownloadDailyStats]:
+        return list(
+            self.db.execute(
+                select(DownloadDailyStats).where(DownloadDailyStats.day >= start).order_by(DownloadDailyStats.day)
+            ).scalars()
+        )
+
+    def get_file_days(self, file_id: int, start: date) -> list[FileDownloadDailyStats]:
+        return list(
+            self.db.execute(
+                select(FileDownloadDailyStats)
+                .where(FileDownloadDailyStats.file_id == file_id, FileDownloadDailyStats.day >= start)
+                .order_by(FileDownloadDailyStats.day)
+            ).scalars()
+        )
+
+    def describe_files(self, file_ids: list[int]) -> dict[int, Row]:
+        """Names of the files, versions and projects behind `file_ids`, skipping deleted ones."""
+        rows = self.db.execute(
+            select(
+                APKFile.id,
+                APKFile.filename,
+                Version.id.label("version_id"),
+                Version.version_string,
+                Project.id.label("project_id"),
+                Project.name.label("project_name"),
+            )
+            .join(Version, Version.id == APKFile.version_id)
+            .join(Project, Project.id == Version.project_id)
+            .where(APKFile.id.in_(file_ids), Version.deleted_at.is_(None), Project.deleted_at.is_(None))
+        ).all()
+        return {row.id: row for row in rows}
@@ -0,0 +1,98 @@
+"""
+IdempotencyKey repository — claiming keys and recording their responses.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.idempotency import IdempotencyKey, IdempotencyStatus
+
+
+class IdempotencyRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def claim(self, key: str, fingerprint: str, ttl: int, lock_timeout: int) -> Optional[datetime]:
+        """
+        Take ownership of a key in one statement, so exactly one of several
+        concurrent requests wins. An expired record, or one whose owner has
+        held it past `lock_timeout` seconds (a crashed worker), is taken over.
+
+        Returns:
+            The claim's locked_at, which complete() and release() must be
+            given, or None if another request holds the key.
+        """
+        now = func.now()
+        stmt = (
+            insert(IdempotencyKey)
+            .values(
+                key=key,
+                fingerprint=fingerprint,
+                status=IdempotencyStatus.IN_PROGRESS,
+                locked_at=now,
+                expires_at=now + timedelta(seconds=ttl),
+            )
+            .on_conflict_do_update(
+                index_elements=[IdempotencyKey.key],
+                set_={
+                    "fingerprint": fingerprint,
+                    "status": IdempotencyStatus.IN_PROGRESS,
+                    "response_status": None,
+                    "response_headers": None,
+                    "response_body": None,
+                    "locked_at": now,
+                    "expires_at": now + timedelta(seconds=ttl),
+                },
+                where=or_(
+                    IdempotencyKey.expires_at < now,
+                    (IdempotencyKey.status == IdempotencyStatus.IN_PROGRESS)
+                    & (IdempotencyKey.locked_at < now - timedelta(seconds=lock_timeout)),
+                ),
+            )
+            .returning(IdempotencyKey.locked_at)
+        )
+        claimed = self.db.execute(stmt).scalar()
+        self.db.commit()
+        return claimed
+
+    def get(self, key: str) -> Optional[IdempotencyKey]:
+        return self.db.execute(select(IdempotencyKey).where(IdempotencyKey.key == key)).scalar_one_or_none()
+
+    # complete() and release() only touch the claim identified by `locked_at`:
+    # an owner that outlived lock_timeout may have been taken over meanwhile,
+    # and must not overwrite or delete its successor's record.
+
+    def complete(
+        self, key: str, locked_at: datetime, status_code: int, headers: list[list[str]], body: bytes
+    ) -> None:
+        self.db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key, IdempotencyKey.locked_at == locked_at)
+            .values(
+                status=IdempotencyStatus.COMPLETED,
+                response_status=status_code,
+                response_headers=headers,
+                response_body=body,
+            )
+        )
+        self.db.commit()
+
+    def release(self, key: str, locked_at: datetime) -> None:
+        """Forget a key whose request did not finish, so a retry runs it again."""
+        self.db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.key == key,
+                IdempotencyKey.locked_at == locked_at,
+                IdempotencyKey.status == IdempotencyStatus.IN_PROGRESS,
+            )
+        )
+        self.db.commit()
+
+    def prune(self, now: datetime) -> int:
+        result = self.db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < now))
+        self.db.commit()
+        return result.rowcount
@@ -0,0 +1,212 @@
+"""
+Job repository — database access for the background job queue.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from sqlalchemy import delete, func, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.job import Job, JobStatus
+from app.repositories.base import BaseRepository
+
+
+class JobRepository(BaseRepository[Job]):
+    def __init__(self, db: Session):
+        super().__init__(Job, db)
+
+    def enqueue(
+        self,
+        job_type: str,
+        payload: dict[str, Any],
+        *,
+        max_attempts: int,
+        unique_key: Optional[str] = None,
+        run_at: Optional[datetime] = None,
+    ) -> Optional[int]:
+        """
+        Insert a queued job. Does not commit, so callers can enqueue atomically
+        with their own writes.
+
+        Returns:
+            The new job id, or None if an active job with the same unique_key exists.
+        """
+        stmt = (
+            insert(Job)
+            .values(
+                job_type=job_type,
+                payload=payload,
+                unique_key=unique_key,
+                status=JobStatus.QUEUED,
+                attempts=0,
+                max_attempts=max_attempts,
+                run_at=run_at or datetime.now(timezone.utc),
+            )
+            .on_conflict_do_nothing(
+                index_elements=["unique_key"],
+                index_where=text("status IN ('QUEUED', 'RUNNING')"),
+            )
+            .returning(Job.id)
+        )
+        return self.db.execute(stmt).scalar()
+
+    def enqueue_if_idle(
+        self, job_type: str, payload: dict[str, Any], *, max_attempts: int, interval: float
+    ) -> Optional[int]:
+        """Enqueue unless a job of this type was created within the last `interval` seconds."""
+        since = datetime.now(timezone.utc) - timedelta(seconds=interval)
+        recent = self.db.execute(
+            select(Job.id).where(Job.job_type == job_type, Job.created_at > since).limit(1)
+        ).first()
+        if recent:
+            return None
+        return self.enqueue(
+            job_type, payload, max_attempts=max_attempts, unique_key=f"periodic:{job_type}"
+        )
+
+    def get_active_by_unique_key(self, unique_key: str) -> Optional[Job]:
+        return (
+            self.db.query(Job)
+            .filter(Job.unique_key == unique_key, Job.status.in_([JobStatus.QUEUED, JobStatus.RUNNING]))
+            .first()
+        )
+
+    def claim(self, job_types: list[str], worker_id: str) -> Optional[Job]:
+        """
+        Claim the next runnable job of one of `job_types` and mark it RUNNING.
+
+        SKIP LOCKED makes concurrent claimers (threads, uvicorn workers, nodes)
+        each take a different row instead of queueing on the same one.
+        Commits the claim.
+        """
+        job = (
+            self.db.query(Job)
+            .filter(
+                Job.status == JobStatus.QUEUED,
+                Job.run_at <= func.now(),
+                Job.job_type.in_(job_types),
+            )
+            .order_by(Job.run_at, Job.id)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if job is None:
+            self.db.rollback()
+            return None
+        job.status = JobStatus.RUNNING
+        job.attempts += 1
+        job.locked_by = worker_id
+        job.locked_at = datetime.now(timezone.utc)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def heartbeat(self, job_ids: list[int]) -> None:
+        if not job_ids:
+            return
+        self.db.execute(
+            update(Job)
+            .where(Job.id.in_(job_ids), Job.status == JobStatus.RUNNING)
+            .values(locked_at=datetime.now(timezone.utc))
+        )
+        self.db.commit()
+
+    def requeue_stale(self, lock_timeout: float) -> int:
+        """Return RUNNING jobs whose worker stopped heartbeating to the queue."""
+        threshold = datetime.now(timezone.utc) - timedelta(seconds=lock_timeout)
+        result = self.db.execute(
+            update(Job)
+            .where(Job.status == JobStatus.RUNNING, Job.locked_at < threshold)
+            .values(status=JobStatus.QUEUED, locked_by=None, locked_at=None, run_at=func.now())
+        )
+        self.db.commit()
+        return result.rowcount
+
+    # The mark_* methods only touch a job still held by `worker_id`: a job that
+    # was requeued as stale and claimed elsewhere belongs to the new holder.
+    # They return whether the job was still held.
+
+    def mark_succeeded(self, job_id: int, worker_id: str) -> bool:
+        result = self.db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.locked_by == worker_id)
+            .values(
+                status=JobStatus.SUCCEEDED,
+                locked_by=None,
+                locked_at=None,
+                finished_at=datetime.now(timezone.utc),
+            )
+        )
+        self.db.commit()
+        return result.rowcount > 0
+
+    def mark_retry(
+        self,
+        job_id: int,
+        worker_id: str,
+        run_at: datetime,
+        error: Optional[str],
+        count_attempt: bool = True,
+    ) -> bool:
+        """Put a job back in the queue; `count_attempt=False` refunds the claimed attempt."""
+        values: dict[str, Any] = {
+            "status": JobStatus.QUEUED,
+            "locked_by": None,
+            "locked_at": None,
+            "run_at": run_at,
+            "last_error": error,
+        }
+        if not count_attempt:
+            values["attempts"] = Job.attempts - 1
+        result = self.db.execute(
+            update(Job).where(Job.id == job_id, Job.locked_by == worker_id).values(**values)
+        )
+        self.db.commit()
+        return result.rowcount > 0
+
+    def mark_failed(self, job_id: int, worker_id: str, error: str) -> bool:
+        result = self.db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.locked_by == worker_id)
+            .values(
+                status=JobStatus.FAILED,
+                locked_by=None,
+                locked_at=None,
+                last_error=error,
+                finished_at=datetime.now(timezone.utc),
+            )
+        )
+        self.db.commit()
+        return result.rowcount > 0
+
+    def counts_by_type(self) -> list[tuple[str, JobStatus, int]]:
+        return (
+            self.db.query(Job.job_type, Job.status, func.count(Job.id))
+            .group_by(Job.job_type, Job.status)
+            .all()
+        )
+
+    def get_recent_failures(self, limit: int = 20) -> list[Job]:
+        return (
+            self.db.query(Job)
+            .filter(Job.status == JobStatus.FAILED)
+            .order_by(Job.finished_at.desc())
+            .limit(limit)
+            .all()
+        )
+
+    def delete_finished_before(self, threshold: datetime, limit: int) -> int:
+        """Delete up to `limit` finished jobs older than `threshold`. Commits."""
+        ids = (
+            select(Job.id)
+            .where(
+                Job.status.in_([JobStatus.SUCCEEDED, JobStatus.FAILED]),
+                Job.finished_at < threshold,
+            )
+            .limit(limit)
+        )
+        result = self.db.execute(delete(Job).where(Job.id.in_(ids.scalar_subquery())))
+        self.db.commit()
+        return result.rowcount
@@ -4,9 +4,10 @@ Project repository — database access for projects.
 
 from typing import Optional
 
-from sqlalchemy import func
+from sqlalchemy import and_, delete, func, or_, select, update
 from sqlalchemy.orm import Session
 
+from app.models.apk_file import APKFile
 from app.models.project import Project
 from app.models.version import Version
 from app.repositories.base import BaseRepository
@@ -16,13 +17,38 @@ class ProjectRepository(BaseRepository[Project]):
     def __init__(self, db: Session):
         super().__init__(Project, db)
 
+    def get(self, id: int) -> Optional[Project]:
+        return (
+            self.db.query(Project)
+            .filter(Project.id == id, Project.deleted_at.is_(None))
+            .first()
+        )
+
+    def count(self) -> int:
+        return self.db.query(Project).filter(Project.deleted_at.is_(None)).count()
+
     def get_by_name(self, name: str) -> Optional[Project]:
+        # Includes projects pending deletion: their rows still hold the unique name.
         return self.db.query(Project).filter(Project.name == name).first()
 
+    def get_with_retention(self) -> list[Project]:
+        return (
+            self.db.query(Project)
+            .filter(
+                Project.deleted_at.is_(None),
+                or_(Project.retention_keep_last.is_not(None), Project.retention_keep_days.is_not(None)),
+            )
+            .order_by(Project.id)
+            .all()
+        )
+
     def get_all_with_version_count(self) -> list[tuple[Project, int]]:
         return (
             self.db.query(Project, func.count(Version.id).label("version_count"))
-            .outerjoin(Version, Version.project_id == Project.id)
+            .outerjoin(
+                Version, and_(Version.project_id == Project.id, Version.deleted_at.is_(None))
+            )
+            .filter(Project.deleted_at.is_(None))
             .group_by(Project.id)
             .order_by(Project.name)
             .all()
@@ -33,9 +59,70 @@ class ProjectRepository(BaseRepository[Project]):
         return (
             self.db.query(Project, func.count(Version.id).label("version_count"))
             .join(user_project_access, user_project_access.c.project_id == Project.id)
-            .filter(user_project_access.c.user_id == user_id)
-            .outerjoin(Version, Version.project_id == Project.id)
+            .filter(user_project_access.c.user_id == user_id, Project.deleted_at.is_(None))
+            .outerjoin(
+                Version, and_(Version.project_id == Project.id, Version.deleted_at.is_(None))
+            )
             .group_by(Project.id)
             .order_by(Project.name)
             .all()
         )
+
+    # ─── Storage usage ────────────────────────────────────────────────────
+
+    def reserve_bytes(self, project_id: int, size: int) -> bool:
+        """
+        Add `size` to the project's usage if that keeps it within its quota, in
+        one statement so concurrent uploads cannot overshoot. Releasing
+        (size <= 0) always succeeds. Commits.
+        """
+        stmt = update(Project).where(Project.id == project_id)
+        if size > 0:
+            stmt = stmt.where(
+                or_(
+                    Project.storage_quota_bytes.is_(None),
+                    Project.storage_used_bytes + size <= Project.storage_quota_bytes,
+                )
+            )
+        result = self.db.execute(stmt.values(storage_used_bytes=Project.storage_used_bytes + size))
+        self.db.commit()
+        return result.rowcount == 1
+
+    def add_usage(self, project_id: int, delta: int) -> None:
+        """Adjust usage inside the caller's transaction, e.g. next to the rows it deletes. Does not commit."""
+        self.db.execute(
+            update(Project)
+            .where(Project.id == project_id)
+            .values(storage_used_bytes=Project.storage_used_bytes + delta)
+        )
+
+    def get_usage(self, project_ids: Optional[frozenset[int]] = None) -> list[Project]:
+        query = self.db.query(Project).filter(Project.deleted_at.is_(None))
+        if project_ids is not None:
+            query = query.filter(Project.id.in_(sorted(project_ids)))
+        return query.order_by(Project.storage_used_bytes.desc(), Project.id).all()
+
+    def recount_usage(self) -> int:
+        """Recompute every project's usage from its file rows; corrects drift left by crashed uploads."""
+        total = (
+            select(func.coalesce(func.sum(APKFile.file_size), 0))
+            .join(Version, Version.id == APKFile.version_id)
+            .where(Version.project_id == Project.id)
+            .correlate(Project)
+            .scalar_subquery()
+        )
+        result = self.db.execute(
+            update(Project)
+            .where(Project.storage_used_bytes != total)
+            .values(storage_used_bytes=total),
+            execution_options={"synchronize_session": False},
+        )
+        self.db.commit()
+        return result.rowcount
+
+    def hard_delete(self, project_id: int) -> None:
+        """Delete the project row itself, bypassing ORM relationship loading. Does not commit."""
+        self.db.execute(
+            delete(Project).where(Project.id == project_id),
+            execution_options={"synchronize_session": False},
+        )
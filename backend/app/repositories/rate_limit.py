@@ -0,0 +1,47 @@
+"""
+RateLimitBucket repository — atomic token-bucket updates in Postgres.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import case, delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.rate_limit import RateLimitBucket
+
+
+class RateLimitRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def take(self, key: str, amount: float, rate: float, burst: float) -> tuple[float, bool]:
+        """
+        Refill a bucket for the time since its last update and take `amount`
+        tokens if it holds that many, in one statement so concurrent workers
+        never overdraw it. Returns (tokens left, whether they were taken).
+        """
+        elapsed = func.extract("epoch", func.now() - RateLimitBucket.updated_at)
+        refilled = func.least(burst, RateLimitBucket.tokens + elapsed * rate)
+        stmt = (
+            insert(RateLimitBucket)
+            .values(key=key, tokens=burst - amount, allowed=amount <= burst, updated_at=func.now())
+            .on_conflict_do_update(
+                index_elements=[RateLimitBucket.key],
+                set_={
+                    "tokens": case((refilled >= amount, refilled - amount), else_=refilled),
+                    "allowed": refilled >= amount,
+                    "updated_at": func.now(),
+                },
+            )
+            .returning(RateLimitBucket.tokens, RateLimitBucket.allowed)
+        )
+        tokens, allowed = self.db.execute(stmt).one()
+        self.db.commit()
+        return tokens, allowed
+
+    def prune(self, idle_before: datetime) -> int:
+        """Drop buckets untouched since `idle_before`; they would have refilled anyway."""
+        result = self.db.execute(delete(RateLimitBucket).where(RateLimitBucket.updated_at < idle_before))
+        self.db.commit()
+        return result.rowcount
@@ -0,0 +1,39 @@
+"""
+ReconcileRun repository — database access for storage reconciliation runs.
+"""
+
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.reconcile_run import ReconcileRun, ReconcileStatus
+from app.repositories.base import BaseRepository
+
+
+class ReconcileRunRepository(BaseRepository[ReconcileRun]):
+    def __init__(self, db: Session):
+        super().__init__(ReconcileRun, db)
+
+    def get_recent(self, limit: int = 50) -> list[ReconcileRun]:
+        return (
+            self.db.query(ReconcileRun)
+            .order_by(ReconcileRun.created_at.desc())
+            .limit(limit)
+            .all()
+        )
+
+    def get_active(self) -> Optional[ReconcileRun]:
+        return (
+            self.db.query(ReconcileRun)
+            .filter(ReconcileRun.status.in_([ReconcileStatus.PENDING, ReconcileStatus.RUNNING]))
+            .first()
+        )
+
+    def get_for_update(self, run_id: int) -> Optional[ReconcileRun]:
+        """Lock a run row for the current transaction while a unit is reconciled."""
+        return (
+            self.db.query(ReconcileRun)
+            .filter(ReconcileRun.id == run_id)
+            .with_for_update()
+            .first()
+        )
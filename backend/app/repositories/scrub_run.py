@@ -0,0 +1,21 @@
+"""
+ScrubRun repository — database access for integrity scrubber passes.
+"""
+
+from sqlalchemy.orm import Session
+
+from app.models.scrub_run import ScrubRun
+from app.repositories.base import BaseRepository
+
+
+class ScrubRunRepository(BaseRepository[ScrubRun]):
+    def __init__(self, db: Session):
+        super().__init__(ScrubRun, db)
+
+    def get_recent(self, limit: int = 20) -> list[ScrubRun]:
+        return (
+            self.db.query(ScrubRun)
+            .order_by(ScrubRun.started_at.desc())
+            .limit(limit)
+            .all()
+        )
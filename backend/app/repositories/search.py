@@ -0,0 +1,122 @@
+"""
+Search repository — ranked trigram matching over projects, versions and files.
+
+Every predicate used here (`ILIKE 'q%'`, `col % q`, `q <% col`) is served by
+the pg_trgm GIN indexes on the searched columns, so the cost follows the
+number of candidates rather than the size of the tables.
+"""
+
+from typing import Optional
+
+from sqlalchemy import Row, case, func, literal, null, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.apk_file import APKFile
+from app.models.project import Project
+from app.models.version import Version
+
+# pg_trgm's `%` and `<%` operators. SQLAlchemy does not escape custom operators
+# for pg8000, whose "format" paramstyle needs literal percent signs doubled.
+SIMILAR = "%%"
+WORD_SIMILAR = "<%%"
+
+
+def _like_prefix(query: str) -> str:
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%"
+
+
+def _score(column, query: str):
+    """Trigram similarity of the whole value or its best-matching word; prefix matches rank first."""
+    return (
+        func.greatest(func.similarity(column, query), func.word_similarity(query, column))
+        + case((column.ilike(_like_prefix(query)), 1.0), else_=0.0)
+    )
+
+
+def _matches(column, query: str):
+    return or_(
+        column.ilike(_like_prefix(query)),
+        column.op(SIMILAR)(query),
+        literal(query).op(WORD_SIMILAR)(column),
+    )
+
+
+class SearchRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def search_projects(self, query: str, project_ids: Optional[frozenset[int]], limit: int) -> list[Row]:
+        score = func.greatest(
+            _score(Project.name, query),
+            func.word_similarity(query, func.coalesce(Project.description, "")) * 0.5,
+        ).label("score")
+        stmt = (
+            select(
+                literal("project").label("kind"),
+                Project.id.label("id"),
+                Project.id.label("project_id"),
+                Project.name.label("project_name"),
+                null().label("version_id"),
+                null().label("version_string"),
+                null().label("filename"),
+                score,
+            )
+            .where(
+                Project.deleted_at.is_(None),
+                or_(_matches(Project.name, query), literal(query).op(WORD_SIMILAR)(Project.description)),
+            )
+        )
+        return self._top(stmt, score, Project.id, project_ids, limit)
+
+    def search_versions(self, query: str, project_ids: Optional[frozenset[int]], limit: int) -> list[Row]:
+        score = _score(Version.version_string, query).label("score")
+        stmt = (
+            select(
+                literal("version").label("kind"),
+                Version.id.label("id"),
+                Project.id.label("project_id"),
+                Project.name.label("project_name"),
+                Version.id.label("version_id"),
+                Version.version_string,
+                null().label("filename"),
+                score,
+            )
+            .join(Project, Project.id == Version.project_id)
+            .where(
+                Version.deleted_at.is_(None),
+                Project.deleted_at.is_(None),
+                _matches(Version.version_string, query),
+            )
+        )
+        return self._top(stmt, score, Version.id, project_ids, limit)
+
+    def search_files(self, query: str, project_ids: Optional[frozenset[int]], limit: int) -> list[Row]:
+        score = _score(APKFile.filename, query).label("score")
+        stmt = (
+            select(
+                literal("file").label("kind"),
+                APKFile.id.label("id"),
+                Project.id.label("project_id"),
+                Project.name.label("project_name"),
+                Version.id.label("version_id"),
+                Version.version_string,
+                APKFile.filename,
+                score,
+            )
+            .join(Version, Version.id == APKFile.version_id)
+            .join(Project, Project.id == Version.project_id)
+            .where(
+                Version.deleted_at.is_(None),
+                Project.deleted_at.is_(None),
+                _matches(APKFile.filename, query),
+            )
+        )
+        return self._top(stmt, score, APKFile.id, project_ids, limit)
+
+    def _top(self, stmt, score, id_column, project_ids: Optional[frozenset[int]], limit: int) -> list[Row]:
+        """The `limit` best matches, optionally restricted to `project_ids` (None means all)."""
+        if project_ids is not None:
+            stmt = stmt.where(Project.id.in_(sorted(project_ids)))
+        stmt = stmt.order_by(score.desc(), id_column).limit(limit)
+        return list(self.db.execute(stmt).all())
@@ -4,9 +4,10 @@ User repository — database access for users.
 
 from typing import Optional
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.models.user import User
+from app.models.user import User, user_project_access
 from app.repositories.base import BaseRepository
 
 
@@ -19,3 +20,10 @@ class UserRepository(BaseRepository[User]):
 
     def get_by_email(self, email: str) -> Optional[User]:
         return self.db.query(User).filter(User.email == email).first()
+
+    def get_project_ids(self, user_id: int) -> frozenset[int]:
+        # Served by the (user_id, project_id) primary key.
+        rows = self.db.execute(
+            select(user_project_access.c.project_id).where(user_project_access.c.user_id == user_id)
+        ).scalars()
+        return frozenset(rows)
@@ -2,31 +2,59 @@
 Version repository — database access for versions.
 """
 
+from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session, contains_eager
 
 from app.models.apk_file import APKFile
+from app.models.project import Project
 from app.models.version import Version
 from app.repositories.base import BaseRepository
 
+# Ordering that defines "newest" for listings and the latest-build index.
+# Matches the ix_versions_project_semver index column for column.
+NEWEST_FIRST = (
+    Version.semver_major.desc().nulls_last(),
+    Version.semver_minor.desc().nulls_last(),
+    Version.semver_patch.desc().nulls_last(),
+    Version.semver_prerelease.desc().nulls_last(),
+    Version.id.desc(),
+)
+
 
 class VersionRepository(BaseRepository[Version]):
     def __init__(self, db: Session):
         super().__init__(Version, db)
 
+    def get(self, id: int) -> Optional[Version]:
+        return (
+            self.db.query(Version)
+            .filter(Version.id == id, Version.deleted_at.is_(None))
+            .first()
+        )
+
+    def get_project_id(self, id: int) -> Optional[int]:
+        return self.db.execute(
+            select(Version.project_id).where(Version.id == id, Version.deleted_at.is_(None))
+        ).scalar_one_or_none()
+
+    def count(self) -> int:
+        return self.db.query(Version).filter(Version.deleted_at.is_(None)).count()
+
     def get_by_project(self, project_id: int) -> list[Version]:
         return (
             self.db.query(Version)
-            .filter(Version.project_id == project_id)
-            .order_by(Version.created_at.desc())
+            .filter(Version.project_id == project_id, Version.deleted_at.is_(None))
+            .order_by(*NEWEST_FIRST)
             .all()
         )
 
     def get_by_project_and_string(
         self, project_id: int, version_string: str
     ) -> Optional[Version]:
+        # Includes versions pending deletion: their rows still hold the unique key.
         return (
             self.db.query(Version)
             .filter(
@@ -36,12 +64,86 @@ class VersionRepository(BaseRepository[Version]):
             .first()
         )
 
-    def get_with_file_counts(self, project_id: int) -> list[tuple[Version, int]]:
+    def get_with_file_counts(
+        self, project_id: int, limit: Optional[int] = None
+    ) -> list[tuple[Version, int]]:
+        """
+        Versions newest-first with their file counts. The count is a correlated
+        subquery rather than a GROUP BY so the ordering (and LIMIT) comes straight
+        from the semver index.
+        """
+        file_count = (
+            select(func.count(APKFile.id))
+            .where(APKFile.version_id == Version.id)
+            .correlate(Version)
+            .scalar_subquery()
+        )
+        query = (
+            self.db.query(Version, file_count.label("file_count"))
+            .filter(Version.project_id == project_id, Version.deleted_at.is_(None))
+            .order_by(*NEWEST_FIRST)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def get_missing_sort_keys(self, limit: int) -> list[Version]:
+        return (
+            self.db.query(Version)
+            .filter(Version.semver_major.is_(None))
+            .order_by(Version.id)
+            .limit(limit)
+            .all()
+        )
+
+    def get_latest_with_files(self, project_id: Optional[int] = None) -> list[Version]:
+        """
+        Newest version that has at least one file, per (project, channel).
+
+        Uses DISTINCT ON so the whole index is rebuilt with a single query.
+        """
+        has_files = select(APKFile.id).where(APKFile.version_id == Version.id).exists()
+        query = (
+            self.db.query(Version)
+            .join(Project, Project.id == Version.project_id)
+            .options(contains_eager(Version.project))
+            .filter(Version.deleted_at.is_(None), Project.deleted_at.is_(None), has_files)
+        )
+        if project_id is not None:
+            query = query.filter(Version.project_id == project_id)
         return (
-            self.db.query(Version, func.count(APKFile.id).label("file_count"))
-            .outerjoin(APKFile, APKFile.version_id == Version.id)
-            .filter(Version.project_id == project_id)
-            .group_by(Version.id)
-            .order_by(Version.created_at.desc())
+            query.distinct(Version.project_id, Version.channel)
+            .order_by(Version.project_id, Version.channel, *NEWEST_FIRST)
             .all()
         )
+
+    def mark_deleted_for_project(self, project_id: int) -> int:
+        """Hide every version of a project in one statement. Does not commit."""
+        result = self.db.execute(
+            update(Version)
+            .where(Version.project_id == project_id, Version.deleted_at.is_(None))
+            .values(deleted_at=datetime.now(timezone.utc)),
+            execution_options={"synchronize_session": False},
+        )
+        return result.rowcount
+
+    def delete_batch_for_project(self, project_id: int, limit: int) -> int:
+        """
+        Delete up to `limit` versions of a project. Remaining files cascade in the DB.
+
+        Returns the number of deleted rows. Does not commit.
+        """
+        ids = select(Version.id).where(Version.project_id == project_id).limit(limit)
+        result = self.db.execute(
+            delete(Version).where(Version.id.in_(ids.scalar_subquery())),
+            execution_options={"synchronize_session": False},
+        )
+        return result.rowcount
+
+    def hard_delete(self, version_id: int) -> int:
+        """Delete the version row itself, bypassing ORM relationship loading. Does not commit."""
+        result = self.db.execute(
+            delete(Version).where(Version.id == version_id),
+            execution_options={"synchronize_session": False},
+        )
+        return result.rowcount
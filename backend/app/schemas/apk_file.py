@@ -3,9 +3,11 @@ APK File Pydantic schemas.
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.models.apk_file import IntegrityStatus
 
 
 class APKFileRead(BaseModel):
@@ -20,5 +22,50 @@ class APKFileRead(BaseModel):
 
 
 class APKFileDetail(APKFileRead):
-    """Extended read with uploader username."""
+    """Extended read with uploader username and manifest metadata."""
     uploader_name: Optional[str] = None
+    package_name: Optional[str] = None
+    version_code: Optional[int] = None
+    version_name: Optional[str] = None
+    min_sdk: Optional[int] = None
+    target_sdk: Optional[int] = None
+    abis: list[str] = []
+    signing_cert_sha256: Optional[str] = None
+    sha256: Optional[str] = None
+    integrity_status: Optional[IntegrityStatus] = None
+    verified_at: Optional[datetime] = None
+
+
+class APKFileFilters(BaseModel):
+    """Optional query filters for file listings, all served by indexed columns."""
+    package_name: Optional[str] = None
+    version_code: Optional[int] = None
+    abi: Optional[str] = None
+    signing_cert_sha256: Optional[str] = None
+
+
+class BatchUploadItem(BaseModel):
+    """Outcome of one file of a batch upload."""
+    filename: Optional[str]
+    status: Literal["created", "failed"]
+    file: Optional[APKFileRead] = None
+    error: Optional[str] = None
+
+
+class BatchUploadResult(BaseModel):
+    created: int
+    failed: int
+    items: list[BatchUploadItem]
+
+
+class UploadCheckRequest(BaseModel):
+    """Announce an upload by content so bytes the server already has are not sent again."""
+    filename: str
+    sha256: str = Field(pattern="^[0-9a-fA-F]{64}$")
+    size: int = Field(gt=0)
+
+
+class UploadCheckResult(BaseModel):
+    # created: the file was added by reference; upload_required: send it to /upload
+    status: Literal["created", "upload_required"]
+    file: Optional[APKFileRead] = None
@@ -3,6 +3,8 @@ Dashboard statistics schema.
 """
 
 from datetime import datetime
+from typing import Optional
+
 from pydantic import BaseModel
 
 
@@ -17,6 +19,13 @@ class DashboardDownloadTrend(BaseModel):
     count: int
 
 
+class DashboardProjectUsage(BaseModel):
+    project_id: int
+    name: str
+    used_bytes: int
+    quota_bytes: Optional[int]
+
+
 class DashboardStats(BaseModel):
     total_projects: int
     total_versions: int
@@ -25,3 +34,28 @@ class DashboardStats(BaseModel):
     total_storage_mb: float
     recent_downloads: list[DashboardRecentDownload]
     download_trends: list[DashboardDownloadTrend]
+    project_usage: list[DashboardProjectUsage] = []  # largest first, from the usage counters
+
+
+class DashboardDailyDownloads(BaseModel):
+    date: str
+    downloads: int
+    unique_ips: int  # HyperLogLog estimate
+
+
+class DashboardDownloadAnalytics(BaseModel):
+    file_id: Optional[int] = None  # None for all files
+    days: int
+    downloads: int
+    unique_ips: int  # distinct over the whole range, not the sum of the days
+    daily: list[DashboardDailyDownloads]
+
+
+class DashboardTopFile(BaseModel):
+    file_id: int
+    filename: str
+    project_id: int
+    project_name: str
+    version_id: int
+    version_string: str
+    downloads: int
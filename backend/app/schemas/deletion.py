@@ -0,0 +1,28 @@
+"""
+Deletion task Pydantic schemas.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.models.deletion_task import DeletionStatus, DeletionTarget
+
+
+class DeletionTaskRead(BaseModel):
+    id: int
+    target_type: DeletionTarget
+    target_id: int
+    target_name: str
+    status: DeletionStatus
+    total_files: int
+    files_deleted: int
+    versions_deleted: int
+    bytes_reclaimed: int
+    error: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime]
+
+    model_config = {"from_attributes": True}
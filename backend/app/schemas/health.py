@@ -0,0 +1,39 @@
+"""
+Health and readiness probe schemas.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class DatabaseHealth(BaseModel):
+    ok: bool
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+
+
+class PoolHealth(BaseModel):
+    size: int
+    checked_out: int
+    overflow: int
+    max_overflow: int
+    saturation: float  # checked out / (size + max_overflow); requests wait for a connection at 1.0
+
+
+class VolumeHealth(BaseModel):
+    volume_id: str
+    writable: bool
+    total_bytes: Optional[int] = None  # None for object stores
+    free_bytes: Optional[int] = None
+    has_space: bool  # free space above STORAGE_MIN_FREE_BYTES
+    error: Optional[str] = None
+
+
+class ReadinessReport(BaseModel):
+    ready: bool  # database reachable and at least one volume writable with space
+    checked_at: datetime
+    database: DatabaseHealth
+    pool: PoolHealth
+    volumes: list[VolumeHealth]
@@ -0,0 +1,35 @@
+"""
+Integrity scrubber Pydantic schemas.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.schemas.apk_file import APKFileDetail
+
+
+class ScrubRunRead(BaseModel):
+    id: int
+    started_at: datetime
+    finished_at: Optional[datetime]
+    files_checked: int
+    bytes_read: int
+    mismatches: int
+    missing: int
+    errors: int
+    bytes_per_second: float
+
+    model_config = {"from_attributes": True}
+
+
+class IntegrityStatusRead(BaseModel):
+    total_files: int
+    unhashed: int  # no checksum yet, waiting for the backfill
+    due: int  # not verified within SCRUB_VERIFY_EVERY_DAYS
+    mismatched: int
+    missing: int
+    max_bytes_per_second: int
+    recent_runs: list[ScrubRunRead]
+    flagged_files: list[APKFileDetail]
@@ -0,0 +1,42 @@
+"""
+Background job Pydantic schemas.
+"""
+
+from datetime import datetime
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+from app.models.job import JobStatus
+
+
+class JobRead(BaseModel):
+    id: int
+    job_type: str
+    payload: dict[str, Any]
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    locked_by: Optional[str]
+    last_error: Optional[str]
+    created_at: datetime
+    finished_at: Optional[datetime]
+
+    model_config = {"from_attributes": True}
+
+
+class JobTypeStatus(BaseModel):
+    job_type: str
+    concurrency: int
+    running_here: int = 0
+    queued: int = 0
+    running: int = 0
+    succeeded: int = 0
+    failed: int = 0
+
+
+class JobQueueStatus(BaseModel):
+    worker_id: str
+    job_types: list[JobTypeStatus]
+    recent_failures: list[JobRead]
@@ -0,0 +1,20 @@
+"""
+Latest-build / update-check Pydantic schemas.
+"""
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class LatestBuildRead(BaseModel):
+    """Compact payload for device polling."""
+    project: str
+    channel: str
+    version: str
+    version_id: int
+    file_id: int
+    filename: str
+    file_size: int
+    uploaded_at: datetime
+    download_url: str
@@ -5,7 +5,7 @@ Project Pydantic schemas.
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ProjectCreate(BaseModel):
@@ -18,11 +18,19 @@ class ProjectUpdate(BaseModel):
     description: Optional[str] = None
 
 
+class ProjectQuota(BaseModel):
+    quota_bytes: Optional[int] = Field(None, ge=0)  # None = unlimited
+
+
 class ProjectRead(BaseModel):
     id: int
     name: str
     description: Optional[str]
     created_at: datetime
+    retention_keep_last: Optional[int] = None
+    retention_keep_days: Optional[int] = None
+    storage_quota_bytes: Optional[int] = None
+    storage_used_bytes: int = 0
     version_count: int = 0
 
     model_config = {"from_attributes": True}
@@ -0,0 +1,38 @@
+"""
+Storage reconciliation Pydantic schemas.
+"""
+
+from datetime import datetime
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+from app.models.reconcile_run import ReconcileMode, ReconcileStatus
+
+
+class ReconcileRequest(BaseModel):
+    mode: ReconcileMode = ReconcileMode.REPORT
+
+
+class ReconcileRunRead(BaseModel):
+    id: int
+    mode: ReconcileMode
+    status: ReconcileStatus
+    position: int
+    total_units: int
+    files_scanned: int
+    rows_scanned: int
+    orphan_files: int
+    orphan_bytes: int
+    dangling_rows: int
+    duplicate_paths: int
+    files_quarantined: int
+    files_deleted: int
+    rows_deleted: int
+    findings: list[dict[str, Any]]
+    error: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime]
+
+    model_config = {"from_attributes": True}
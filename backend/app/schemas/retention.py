@@ -0,0 +1,32 @@
+"""
+Retention Pydantic schemas.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class RetentionPolicy(BaseModel):
+    """Both rules unset turns retention off for the project."""
+    keep_last: Optional[int] = Field(None, ge=1)  # newest N versions
+    keep_days: Optional[int] = Field(None, ge=1)  # versions created within D days
+
+
+class RetentionCandidate(BaseModel):
+    id: int
+    version_string: str
+    channel: str
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class RetentionReport(BaseModel):
+    """What the next sweep would delete for a project."""
+    project_id: int
+    policy: RetentionPolicy
+    versions: list[RetentionCandidate]
+    files: int
+    bytes_reclaimable: int  # stored bytes freed; files shared with kept versions are excluded
@@ -0,0 +1,22 @@
+"""
+Search Pydantic schemas.
+"""
+
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+SearchKind = Literal["project", "version", "file"]
+
+
+class SearchHit(BaseModel):
+    kind: SearchKind
+    id: int
+    project_id: int
+    project_name: str
+    version_id: Optional[int] = None
+    version_string: Optional[str] = None
+    filename: Optional[str] = None
+    score: float  # trigram similarity, plus 1 for prefix matches
+
+    model_config = {"from_attributes": True}
@@ -10,13 +10,20 @@ from pydantic import BaseModel
 
 class VersionCreate(BaseModel):
     version_string: str
+    channel: str = "stable"
+
+
+class VersionPin(BaseModel):
+    pinned: bool
 
 
 class VersionRead(BaseModel):
     id: int
     version_string: str
+    channel: str
     project_id: int
     created_at: datetime
+    pinned: bool = False
     file_count: int = 0
 
     model_config = {"from_attributes": True}
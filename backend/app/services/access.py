@@ -0,0 +1,114 @@
+"""
+Project access control: which projects a user may see, answered from memory.
+
+Each user's allowed project ids are loaded once into a frozenset and kept for
+ACL_CACHE_TTL seconds. assign_user_projects drops the entry in every worker
+through the invalidation bus. The TTL only bounds staleness when that message
+is lost. A load that overlaps an invalidation of the same user is returned
+but not cached, since it may have read the old rows.
+Version and file ids are mapped to their project in bounded LRU maps. The
+owning project of a version or file never changes, so those entries need no
+invalidation. Admins can see every project.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.invalidation import invalidation
+from app.models.user import User, UserRole
+from app.repositories.apk_file import APKFileRepository
+from app.repositories.user import UserRepository
+from app.repositories.version import VersionRepository
+
+settings = get_settings()
+
+
+class _OwnerMap:
+    """Bounded LRU map of object id → project id."""
+
+    def __init__(self, max_size: int):
+        self._items: OrderedDict[int, int] = OrderedDict()
+        self._max_size = max_size
+        self._lock = threading.Lock()
+
+    def get(self, key: int, load: Callable[[int], Optional[int]]) -> Optional[int]:
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+        value = load(key)
+        if value is not None:
+            with self._lock:
+                self._items[key] = value
+                if len(self._items) > self._max_size:
+                    self._items.popitem(last=False)
+        return value
+
+
+class ProjectAccessCache:
+    def __init__(self):
+        self._acls: dict[int, tuple[frozenset[int], float]] = {}  # user id -> (project ids, loaded at)
+        self._generations: dict[int, int] = {}  # user id -> invalidations so far
+        self._epoch = 0  # full flushes so far
+        self._lock = threading.Lock()
+        self._version_projects = _OwnerMap(settings.ACL_OWNER_CACHE_SIZE)
+        self._file_projects = _OwnerMap(settings.ACL_OWNER_CACHE_SIZE)
+
+    def allowed_projects(self, db: Session, user_id: int) -> frozenset[int]:
+        now = time.monotonic()
+        entry = self._acls.get(user_id)
+        if entry is not None and now - entry[1] < settings.ACL_CACHE_TTL:
+            return entry[0]
+        with self._lock:
+            generation = (self._epoch, self._generations.get(user_id, 0))
+        project_ids = UserRepository(db).get_project_ids(user_id)
+        with self._lock:
+            if generation == (self._epoch, self._generations.get(user_id, 0)):
+                self._acls[user_id] = (project_ids, now)
+        return project_ids
+
+    def invalidate_user(self, user_id: int) -> None:
+        self._drop_user(user_id)
+        invalidation.publish(INVALIDATION_KIND, user_id)
+
+    def _drop_user(self, user_id: int) -> None:
+        with self._lock:
+            self._acls.pop(user_id, None)
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def _drop_all(self) -> None:
+        with self._lock:
+            self._acls = {}
+            self._epoch += 1
+
+    def project_of_version(self, db: Session, version_id: int) -> Optional[int]:
+        return self._version_projects.get(version_id, VersionRepository(db).get_project_id)
+
+    def project_of_file(self, db: Session, file_id: int) -> Optional[int]:
+        return self._file_projects.get(file_id, APKFileRepository(db).get_project_id)
+
+    def authorize(self, db: Session, user: User, project_id: Optional[int]) -> None:
+        """
+        Raises:
+            HTTPException 403 if `user` may not see `project_id`. Unknown objects
+            (None) pass, so the route answers with its usual 404.
+        """
+        if project_id is None or user.role == UserRole.ADMIN:
+            return
+        if project_id not in self.allowed_projects(db, user.id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You do not have access to this project",
+            )
+
+
+INVALIDATION_KIND = "acl_user"
+
+project_access = ProjectAccessCache()
+invalidation.register(INVALIDATION_KIND, project_access._drop_user, project_access._drop_all)
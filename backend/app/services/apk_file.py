@@ -2,28 +2,65 @@
 APK file service: upload, list, download, delete.
 """
 
+import asyncio
+import io
+import os
+import tarfile
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
 
-from fastapi import HTTPException, UploadFile, status
-from fastapi.responses import FileResponse
+from fastapi import HTTPException, Request, UploadFile, status
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.models.apk_file import APKFile
-from app.models.user import User
+from app.core.events import event_bus
+from app.core.executors import Workload, iterate_in, run_in
+from app.models.apk_file import APKFile, IntegrityStatus
+from app.models.user import User, UserRole
+from app.models.version import Version
 from app.repositories.apk_file import APKFileRepository
+from app.repositories.project import ProjectRepository
 from app.repositories.version import VersionRepository
-from app.schemas.apk_file import APKFileDetail, APKFileRead
+from app.schemas.apk_file import (
+    APKFileDetail,
+    APKFileFilters,
+    APKFileRead,
+    BatchUploadItem,
+    BatchUploadResult,
+    UploadCheckRequest,
+    UploadCheckResult,
+)
+from app.services.access import project_access
+from app.services.delta import PATCH_MEDIA_TYPE, DeltaService
+from app.services.latest_build import latest_build_index
+from app.services.quota import release_project_bytes, reserve_project_bytes
+from app.core.config import get_settings
 from app.services.storage import StorageService
-from app.utils.file_handler import delete_file
+from app.storage import CHUNK_SIZE
+from app.utils.apk_parser import APKMetadata, APKParseError, parse_apk_metadata
+from app.utils.file_handler import ALLOWED_EXTENSION, sanitize_filename
 from app.utils.logger import get_logger
+from app.utils.tar_upload import FileSection, TarTooLarge, list_members, spool_stream
 
+settings = get_settings()
 logger = get_logger(__name__)
 
+APK_MEDIA_TYPE = "application/vnd.android.package-archive"
+TAR_MEDIA_TYPE = "application/x-tar"
+
+
+def _read_file(path: Path) -> Iterator[bytes]:
+    with open(path, "rb") as fp:
+        while chunk := fp.read(CHUNK_SIZE):
+            yield chunk
+
 
 class APKFileService:
     def __init__(self, db: Session):
         self.repo = APKFileRepository(db)
         self.version_repo = VersionRepository(db)
+        self.project_repo = ProjectRepository(db)
         self.storage = StorageService()
 
     def _get_version_or_404(self, version_id: int):
@@ -33,29 +70,292 @@ class APKFileService:
         return version
 
     async def upload_apk(
-        self, version_id: int, file: UploadFile, current_user: User
+        self,
+        version_id: int,
+        file: UploadFile,
+        current_user: User,
+        volume_id: Optional[str] = None,
     ) -> APKFileRead:
         version = self._get_version_or_404(version_id)
-        project = version.project
+        if file.filename and self.repo.get_by_filename(version_id, sanitize_filename(file.filename)):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"File '{file.filename}' already exists in this version",
+            )
 
-        dest_path, file_size = await self.storage.save_apk(
-            file, project.name, version.version_string
+        apk = await self._store_file(
+            version.project.name, version.version_string, version, file, current_user, volume_id
         )
+        try:
+            apk = self.repo.create(apk)
+        except Exception:
+            self.repo.db.rollback()
+            release_project_bytes(version.project_id, apk.file_size)
+            self.storage.delete(apk.volume_id, apk.file_path)
+            raise
+        latest_build_index.refresh_project(self.repo.db, version.project_id)
+        self._publish_uploaded(apk, version.project_id)
+        logger.info(f"Uploaded APK id={apk.id} by user_id={current_user.id}")
+        return APKFileRead.model_validate(apk)
+
+    def check_upload(
+        self, version_id: int, payload: UploadCheckRequest, current_user: User
+    ) -> UploadCheckResult:
+        """
+        Add a file to a version by reference when identical bytes are already
+        stored in a project the caller can read (same SHA-256 and size, not
+        known to be damaged); otherwise ask the client to upload it.
+
+        Raises:
+            HTTPException 400 for a non-APK name, 413 above MAX_UPLOAD_SIZE,
+            409 if the version already has a file with that name.
+        """
+        version = self._get_version_or_404(version_id)
+        if not payload.filename.lower().endswith(ALLOWED_EXTENSION):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only .apk files are allowed")
+        if payload.size > settings.MAX_UPLOAD_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File exceeds maximum upload size of {settings.MAX_UPLOAD_SIZE // (1024*1024)} MB",
+            )
+        filename = sanitize_filename(payload.filename)
+        if self.repo.get_by_filename(version_id, filename):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"File '{payload.filename}' already exists in this version",
+            )
+
+        # Only bytes the caller could download anyway: a checksum is not proof of having the file.
+        project_ids = None
+        if current_user.role != UserRole.ADMIN:
+            allowed = project_access.allowed_projects(self.repo.db, current_user.id)
+            project_ids = allowed | {version.project_id}
+        source = self.repo.get_reusable(payload.sha256.lower(), payload.size, project_ids)
+        backend = self.storage.backend_for(source.volume_id) if source else None
+        stat = backend.stat(source.file_path) if backend else None
+        if stat is None or stat.size != payload.size:
+            self.repo.db.rollback()  # release the row lock
+            return UploadCheckResult(status="upload_required")
+        # A reference costs the project as much as an upload would.
+        reserve_project_bytes(version.project_id, source.file_size)
 
         apk = APKFile(
-            filename=dest_path.name,
-            file_size=file_size,
-            file_path=str(dest_path),
+            filename=filename,
+            file_size=source.file_size,
+            file_path=source.file_path,
+            volume_id=source.volume_id,
+            sha256=source.sha256,
+            integrity_status=source.integrity_status,
+            verified_at=source.verified_at,
             version_id=version_id,
             uploaded_by=current_user.id,
+            **{name: getattr(source, name) for name in APKMetadata().as_dict()},
         )
-        apk = self.repo.create(apk)
-        logger.info(f"Uploaded APK id={apk.id} by user_id={current_user.id}")
-        return APKFileRead.model_validate(apk)
+        try:
+            apk = self.repo.create(apk)
+        except Exception:
+            self.repo.db.rollback()
+            release_project_bytes(version.project_id, apk.file_size)
+            raise
+        latest_build_index.refresh_project(self.repo.db, version.project_id)
+        self._publish_uploaded(apk, version.project_id)
+        logger.info(
+            f"Added APK id={apk.id} by reference to file id={source.id} for user_id={current_user.id}"
+        )
+        return UploadCheckResult(status="created", file=APKFileRead.model_validate(apk))
+
+    async def upload_batch(
+        self,
+        version_id: int,
+        request: Request,
+        current_user: User,
+        volume_id: Optional[str] = None,
+    ) -> BatchUploadResult:
+        """
+        Upload several APKs from one request: a multipart form with any number
+        of file fields, or an uncompressed tar (Content-Type application/x-tar).
+
+        Files are stored concurrently (UPLOAD_BATCH_CONCURRENCY at a time) and
+        their rows created in one transaction. A file that fails is reported
+        in its item and does not fail the others.
+
+        Raises:
+            HTTPException 400 for an unreadable body, 413 if it exceeds
+            UPLOAD_BATCH_MAX_SIZE, 415 for other content types.
+        """
+        version = self._get_version_or_404(version_id)
+        project_name, version_string = version.project.name, version.version_string
+        content_type = request.headers.get("content-type", "")
+
+        tar_path: Optional[str] = None
+        files: list[UploadFile] = []
+        try:
+            if content_type.startswith("multipart/form-data"):
+                form = await request.form(max_files=settings.UPLOAD_BATCH_MAX_FILES)
+                files = [v for _, v in form.multi_items() if isinstance(v, UploadFile)]
+            elif content_type.startswith(TAR_MEDIA_TYPE):
+                tar_path, files = await self._open_tar(request)
+            else:
+                raise HTTPException(
+                    status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                    detail=f"Send multipart/form-data or {TAR_MEDIA_TYPE}",
+                )
+            if not files:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No files in request")
+            if len(files) > settings.UPLOAD_BATCH_MAX_FILES:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"At most {settings.UPLOAD_BATCH_MAX_FILES} files per batch",
+                )
+
+            items: list[Optional[BatchUploadItem]] = [None] * len(files)
+            existing = {f.filename for f in self.repo.get_by_version(version_id)}
+            pending: list[int] = []
+            for i, file in enumerate(files):
+                name = sanitize_filename(file.filename) if file.filename else None
+                if name and name in existing:
+                    items[i] = BatchUploadItem(
+                        filename=file.filename, status="failed", error="File already exists in this version"
+                    )
+                    continue
+                existing.add(name)
+                pending.append(i)
+
+            semaphore = asyncio.Semaphore(settings.UPLOAD_BATCH_CONCURRENCY)
+
+            async def store(i: int) -> APKFile | HTTPException:
+                async with semaphore:
+                    try:
+                        return await self._store_file(
+                            project_name, version_string, version, files[i], current_user, volume_id
+                        )
+                    except HTTPException as e:
+                        return e
+                    except Exception as e:
+                        # _store_file has already undone its own blob and quota.
+                        logger.error(f"Batch upload of {files[i].filename} failed: {e}")
+                        return HTTPException(
+                            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to store file"
+                        )
 
-    def list_files(self, version_id: int) -> list[APKFileDetail]:
+            results = await asyncio.gather(*(store(i) for i in pending))
+        finally:
+            for file in files:
+                await file.close()
+            if tar_path:
+                os.unlink(tar_path)
+
+        created = [(i, r) for i, r in zip(pending, results) if isinstance(r, APKFile)]
+        for i, result in zip(pending, results):
+            if isinstance(result, HTTPException):
+                items[i] = BatchUploadItem(filename=files[i].filename, status="failed", error=result.detail)
+        if created:
+            try:
+                self.repo.create_many([apk for _, apk in created])
+            except Exception:
+                self.repo.db.rollback()
+                release_project_bytes(version.project_id, sum(apk.file_size for _, apk in created))
+                for _, apk in created:
+                    self.storage.delete(apk.volume_id, apk.file_path)
+                raise
+            latest_build_index.refresh_project(self.repo.db, version.project_id)
+        for i, apk in created:
+            self._publish_uploaded(apk, version.project_id)
+            items[i] = BatchUploadItem(
+                filename=files[i].filename, status="created", file=APKFileRead.model_validate(apk)
+            )
+
+        logger.info(
+            f"Batch upload to version id={version_id} by user_id={current_user.id}: "
+            f"{len(created)} created, {len(files) - len(created)} failed"
+        )
+        return BatchUploadResult(created=len(created), failed=len(files) - len(created), items=items)
+
+    async def _open_tar(self, request: Request) -> tuple[str, list[UploadFile]]:
+        """Spool a tar body and expose each member as an UploadFile with its own handle."""
+        try:
+            path = await spool_stream(request.stream(), settings.UPLOAD_BATCH_MAX_SIZE)
+        except TarTooLarge:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Batch exceeds maximum size of {settings.UPLOAD_BATCH_MAX_SIZE // (1024*1024)} MB",
+            )
+        try:
+            members = await run_in(Workload.UPLOAD, list_members, path)
+        except tarfile.TarError as e:
+            os.unlink(path)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid tar archive: {e}")
+        files = [
+            UploadFile(
+                file=io.BufferedReader(FileSection(path, m.offset, m.size)),
+                size=m.size,
+                filename=m.filename,
+            )
+            for m in members[: settings.UPLOAD_BATCH_MAX_FILES + 1]
+        ]
+        return path, files
+
+    async def _store_file(
+        self,
+        project_name: str,
+        version_string: str,
+        version: Version,
+        file: UploadFile,
+        current_user: User,
+        volume_id: Optional[str],
+    ) -> APKFile:
+        """
+        Store an upload and build its (unsaved) row. Uses no shared database
+        session (quota reservations run in their own), so it can run concurrently.
+        """
+        stored = await self.storage.save_apk(
+            file, version.project_id, project_name, version.id, version_string, volume_id
+        )
+        try:
+            metadata = await run_in(
+                Workload.UPLOAD, self._extract_metadata, file.file, file.filename
+            )
+        except Exception:
+            await run_in(Workload.UPLOAD, release_project_bytes, version.project_id, stored.size)
+            await run_in(Workload.UPLOAD, self.storage.delete, stored.volume_id, stored.file_path)
+            raise
+        return APKFile(
+            filename=sanitize_filename(file.filename),
+            file_size=stored.size,
+            file_path=stored.file_path,
+            volume_id=stored.volume_id,
+            sha256=stored.sha256,
+            integrity_status=IntegrityStatus.OK,
+            verified_at=datetime.now(timezone.utc),
+            version_id=version.id,
+            uploaded_by=current_user.id,
+            **metadata.as_dict(),
+        )
+
+    @staticmethod
+    def _extract_metadata(source: BinaryIO, filename: str) -> APKMetadata:
+        """Parse manifest metadata; an unparseable APK is still stored, just unindexed."""
+        try:
+            return parse_apk_metadata(source)
+        except (APKParseError, OSError) as e:
+            logger.warning(f"Could not extract APK metadata from {filename}: {e}")
+            return APKMetadata()
+
+    def list_files(
+        self, version_id: int, filters: Optional[APKFileFilters] = None
+    ) -> list[APKFileDetail]:
         self._get_version_or_404(version_id)
-        files = self.repo.get_by_version(version_id)
+        return self._to_details(self.repo.get_by_version(version_id, filters))
+
+    def list_project_files(
+        self, project_id: int, filters: Optional[APKFileFilters] = None, limit: int = 100
+    ) -> list[APKFileDetail]:
+        if not self.project_repo.get(project_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+        return self._to_details(self.repo.get_by_project(project_id, filters, limit))
+
+    @staticmethod
+    def _to_details(files: list[APKFile]) -> list[APKFileDetail]:
         result = []
         for f in files:
             detail = APKFileDetail.model_validate(f)
@@ -64,26 +364,106 @@ class APKFileService:
             result.append(detail)
         return result
 
-    def download_file(self, file_id: int) -> FileResponse:
+    def download_file(
+        self, file_id: int, from_sha256: Optional[str] = None, client_ip: Optional[str] = None
+    ) -> Response:
+        """
+        Serve a file from its volume: object stores redirect to a presigned URL,
+        local volumes stream from disk.
+
+        A client that declares the SHA-256 of an APK of the same project it
+        already has gets a patch from that APK instead, when one is worth it.
+        """
         apk = self.repo.get(file_id)
         if not apk:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
-        path = Path(apk.file_path)
-        if not path.exists():
+        if client_ip is not None:
+            event_bus.publish(
+                "download",
+                project_access.project_of_file(self.repo.db, file_id),
+                {
+                    "file_id": file_id,
+                    "filename": apk.filename,
+                    "ip_address": client_ip,
+                    "downloaded_at": datetime.now(timezone.utc).isoformat(),
+                },
+            )
+        if from_sha256 and settings.DELTA_ENABLED:
+            patch = self._delta_response(apk, from_sha256.lower())
+            if patch is not None:
+                return patch
+        backend = self.storage.backend_for(apk.volume_id)
+        stat = backend.stat(apk.file_path) if backend is not None else None
+        if stat is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="File not found on storage",
             )
-        return FileResponse(
-            path=str(path),
-            filename=apk.filename,
-            media_type="application/vnd.android.package-archive",
+        url = backend.presigned_url(apk.file_path, apk.filename, settings.S3_PRESIGN_EXPIRY)
+        if url:
+            return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+        return self._stream(backend.get(apk.file_path), stat.size, apk.filename, APK_MEDIA_TYPE)
+
+    @staticmethod
+    def _stream(
+        chunks: Iterator[bytes],
+        size: int,
+        filename: str,
+        media_type: str,
+        headers: Optional[dict[str, str]] = None,
+    ) -> StreamingResponse:
+        """Stream file contents, reading on the download pool rather than the shared threadpool."""
+        return StreamingResponse(
+            iterate_in(Workload.DOWNLOAD, chunks),
+            media_type=media_type,
+            headers={
+                "Content-Length": str(size),
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                **(headers or {}),
+            },
+        )
+
+    def _delta_response(self, apk: APKFile, from_sha256: str) -> Optional[Response]:
+        base = self.repo.get_delta_base(apk, from_sha256)
+        if base is None:
+            return None
+        path = DeltaService().get_patch(base, apk)
+        if path is None:
+            return None
+        logger.info(f"Serving patch from file id={base.id} to id={apk.id}")
+        return self._stream(
+            _read_file(path),
+            path.stat().st_size,
+            f"{apk.filename}.delta",
+            PATCH_MEDIA_TYPE,
+            {"X-Delta-Base-SHA256": base.sha256, "X-Delta-Target-SHA256": apk.sha256},
         )
 
     def delete_file(self, file_id: int) -> None:
         apk = self.repo.get(file_id)
         if not apk:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
-        delete_file(apk.file_path)
+        project_id = apk.version.project_id
+        location = (apk.volume_id, apk.file_path)
+        self.project_repo.add_usage(project_id, -apk.file_size)
         self.repo.delete(apk)
+        # The stored file may be shared with other rows (deduplicated uploads).
+        if not self.repo.referenced_locations([location]):
+            self.storage.delete(*location)
+        latest_build_index.refresh_project(self.repo.db, project_id)
+        event_bus.publish(
+            "file_deleted",
+            project_id,
+            {"file_id": file_id, "version_id": apk.version_id},
+            {"total_files": -1, "total_storage_bytes": -apk.file_size},
+        )
         logger.info(f"Deleted APK id={file_id}")
+
+    @staticmethod
+    def _publish_uploaded(apk: APKFile, project_id: int) -> None:
+        event_bus.publish(
+            "file_uploaded",
+            project_id,
+            {"file_id": apk.id, "version_id": apk.version_id, "filename": apk.filename, "size": apk.file_size},
+            {"total_files": 1, "total_storage_bytes": apk.file_size},
+        )
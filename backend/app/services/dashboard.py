@@ -2,13 +2,29 @@
 Dashboard service: aggregate statistics.
 """
 
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
 from sqlalchemy.orm import Session
 
 from app.repositories.apk_file import APKFileRepository
 from app.repositories.download_log import DownloadLogRepository
+from app.repositories.download_stats import DownloadStatsRepository
 from app.repositories.project import ProjectRepository
 from app.repositories.version import VersionRepository
-from app.schemas.dashboard import DashboardDownloadTrend, DashboardRecentDownload, DashboardStats
+from app.models.user import User, UserRole
+from app.schemas.dashboard import (
+    DashboardDailyDownloads,
+    DashboardDownloadAnalytics,
+    DashboardDownloadTrend,
+    DashboardProjectUsage,
+    DashboardRecentDownload,
+    DashboardStats,
+    DashboardTopFile,
+)
+from app.services.access import project_access
+from app.services.download_analytics import DAY_PRECISION, FILE_PRECISION
+from app.utils.sketches import HyperLogLog, merge_counts
 
 
 class DashboardService:
@@ -17,8 +33,9 @@ class DashboardService:
         self.version_repo = VersionRepository(db)
         self.file_repo = APKFileRepository(db)
         self.log_repo = DownloadLogRepository(db)
+        self.stats_repo = DownloadStatsRepository(db)
 
-    def get_stats(self) -> DashboardStats:
+    def get_stats(self, current_user: User) -> DashboardStats:
         total_projects = self.project_repo.count()
         total_versions = self.version_repo.count()
         total_files = self.file_repo.count_all()
@@ -39,6 +56,19 @@ class DashboardService:
             for date_str, count in trend_rows
         ]
 
+        allowed = None
+        if current_user.role != UserRole.ADMIN:
+            allowed = project_access.allowed_projects(self.project_repo.db, current_user.id)
+        project_usage = [
+            DashboardProjectUsage(
+                project_id=p.id,
+                name=p.name,
+                used_bytes=p.storage_used_bytes,
+                quota_bytes=p.storage_quota_bytes,
+            )
+            for p in self.project_repo.get_usage(allowed)
+        ]
+
         return DashboardStats(
             total_projects=total_projects,
             total_versions=total_versions,
@@ -47,4 +77,73 @@ class DashboardService:
             total_storage_mb=round(total_storage_bytes / (1024 * 1024), 2),
             recent_downloads=recent_downloads,
             download_trends=download_trends,
+            project_usage=project_usage,
         )
+
+    # Analytics read one pre-aggregated row per day, whatever the download volume.
+
+    def get_download_analytics(self, days: int, file_id: Optional[int] = None) -> DashboardDownloadAnalytics:
+        start = self._range_start(days)
+        if file_id is None:
+            rows, precision = self.stats_repo.get_days(start), DAY_PRECISION
+        else:
+            rows, precision = self.stats_repo.get_file_days(file_id, start), FILE_PRECISION
+
+        total_ips = HyperLogLog(precision)
+        daily = []
+        for row in rows:
+            ips = HyperLogLog.from_bytes(row.unique_ips, precision)
+            total_ips.merge(ips)
+            daily.append(
+                DashboardDailyDownloads(date=str(row.day), downloads=row.downloads, unique_ips=ips.count())
+            )
+        return DashboardDownloadAnalytics(
+            file_id=file_id,
+            days=days,
+            downloads=sum(row.downloads for row in rows),
+            unique_ips=total_ips.count(),
+            daily=daily,
+        )
+
+    def get_top_files(self, current_user: User, days: int, limit: int) -> list[DashboardTopFile]:
+        """
+        Most downloaded files over the range, from each day's top list. A file
+        outside some day's list is missing that day's downloads, so counts
+        past ANALYTICS_TOP_CAPACITY files are lower bounds.
+        """
+        merged = merge_counts(
+            {int(file_id): count for file_id, count in (row.top_files or {}).items()}
+            for row in self.stats_repo.get_days(self._range_start(days))
+        )
+        ranked = sorted(merged, key=lambda file_id: (-merged[file_id], file_id))
+
+        allowed = None
+        if current_user.role != UserRole.ADMIN:
+            allowed = project_access.allowed_projects(self.project_repo.db, current_user.id)
+        top: list[DashboardTopFile] = []
+        # Deleted and inaccessible files are skipped, so look past the first `limit`.
+        for offset in range(0, len(ranked), limit * 4):
+            chunk = ranked[offset : offset + limit * 4]
+            described = self.stats_repo.describe_files(chunk)
+            for file_id in chunk:
+                row = described.get(file_id)
+                if row is None or (allowed is not None and row.project_id not in allowed):
+                    continue
+                top.append(
+                    DashboardTopFile(
+                        file_id=file_id,
+                        filename=row.filename,
+                        project_id=row.project_id,
+                        project_name=row.project_name,
+                        version_id=row.version_id,
+                        version_string=row.version_string,
+                        downloads=merged[file_id],
+                    )
+                )
+                if len(top) == limit:
+                    return top
+        return top
+
+    @staticmethod
+    def _range_start(days: int) -> date:
+        return datetime.now(timezone.utc).date() - timedelta(days=days - 1)
@@ -0,0 +1,190 @@
+"""
+Deletion service: schedule project/version deletions and purge them in bounded batches.
+"""
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.events import event_bus
+from app.models.deletion_task import DeletionStatus, DeletionTarget, DeletionTask
+from app.models.project import Project
+from app.models.version import Version
+from app.repositories.apk_file import APKFileRepository
+from app.repositories.deletion_task import DeletionTaskRepository
+from app.repositories.project import ProjectRepository
+from app.repositories.version import VersionRepository
+from app.schemas.deletion import DeletionTaskRead
+from app.services.jobs import JobService
+from app.services.latest_build import latest_build_index
+from app.services.storage import StorageService
+from app.utils.logger import get_logger
+from app.workers.runner import wake_job_runner
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+
+class DeletionService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.repo = DeletionTaskRepository(db)
+        self.project_repo = ProjectRepository(db)
+        self.version_repo = VersionRepository(db)
+        self.file_repo = APKFileRepository(db)
+        self.jobs = JobService(db)
+        self.storage = StorageService()
+
+    # ─── Scheduling ───────────────────────────────────────────────────────
+
+    def schedule_project(self, project: Project, requested_by: Optional[int]) -> DeletionTaskRead:
+        """Hide a project and its versions immediately and queue the purge."""
+        project.deleted_at = datetime.now(timezone.utc)
+        hidden_versions = self.version_repo.mark_deleted_for_project(project.id)
+        task = DeletionTask(
+            target_type=DeletionTarget.PROJECT,
+            target_id=project.id,
+            target_name=project.name,
+            total_files=self.file_repo.count_for_project(project.id),
+            requested_by=requested_by,
+        )
+        task = self._enqueue(task)
+        latest_build_index.remove_project(project.id)
+        event_bus.publish(
+            "project_deleted",
+            project.id,
+            {"project_id": project.id},
+            {"total_projects": -1, "total_versions": -hidden_versions},
+        )
+        logger.info(f"Scheduled deletion of project id={project.id} (task id={task.id})")
+        return DeletionTaskRead.model_validate(task)
+
+    def schedule_version(self, version: Version, requested_by: Optional[int]) -> DeletionTaskRead:
+        """Hide a version immediately and queue the purge."""
+        version.deleted_at = datetime.now(timezone.utc)
+        task = DeletionTask(
+            target_type=DeletionTarget.VERSION,
+            target_id=version.id,
+            target_name=f"{version.project.name}/{version.version_string}",
+            total_files=self.file_repo.count_for_version(version.id),
+            requested_by=requested_by,
+        )
+        task = self._enqueue(task)
+        latest_build_index.refresh_project(self.db, version.project_id)
+        event_bus.publish(
+            "version_deleted", version.project_id, {"version_id": version.id}, {"total_versions": -1}
+        )
+        logger.info(f"Scheduled deletion of version id={version.id} (task id={task.id})")
+        return DeletionTaskRead.model_validate(task)
+
+    def _enqueue(self, task: DeletionTask) -> DeletionTask:
+        """Persist the task and its purge job in the same transaction as the soft delete."""
+        self.db.add(task)
+        self.db.flush()
+        self.jobs.enqueue(
+            "purge_deletion",
+            {"task_id": task.id},
+            unique_key=f"deletion:{task.id}",
+            commit=False,
+        )
+        self.db.commit()
+        self.db.refresh(task)
+        wake_job_runner()
+        return task
+
+    # ─── Progress ─────────────────────────────────────────────────────────
+
+    def get_task(self, task_id: int) -> DeletionTaskRead:
+        task = self.repo.get(task_id)
+        if not task:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Deletion task not found")
+        return DeletionTaskRead.model_validate(task)
+
+    def list_tasks(self, limit: int = 50) -> list[DeletionTaskRead]:
+        return [DeletionTaskRead.model_validate(t) for t in self.repo.get_recent(limit)]
+
+    # ─── Purge ────────────────────────────────────────────────────────────
+
+    def process_batch(self, task_id: int) -> bool:
+        """
+        Purge one batch of a deletion task.
+
+        Each batch is its own short transaction; files are unlinked from disk
+        only after the rows are committed, so a crash can leave an orphan file
+        but never a row pointing at a missing file.
+
+        Returns:
+            True once the task is finished (or no longer exists).
+        """
+        task = self.repo.get_for_update(task_id)
+        if task is None or task.status in (DeletionStatus.COMPLETED, DeletionStatus.FAILED):
+            self.db.rollback()
+            return True
+
+        removed = self._purge_batch(task)
+        done = task.status == DeletionStatus.COMPLETED
+        self.db.commit()
+        if removed:
+            event_bus.publish(
+                "counters",
+                None,
+                counters={
+                    "total_files": -len(removed),
+                    "total_storage_bytes": -sum(size for _, _, size in removed),
+                },
+            )
+
+        # Files can be shared by rows of other versions (deduplicated uploads); keep those.
+        locations = [(volume_id, file_path) for volume_id, file_path, _ in removed]
+        shared = self.file_repo.referenced_locations(locations)
+        for location in set(locations) - shared:
+            self.storage.delete(*location)
+        return done
+
+    def record_failure(self, task_id: int, error: str, final: bool) -> None:
+        """Store the last error; a final failure also marks the task FAILED."""
+        self.db.rollback()
+        task = self.repo.get(task_id)
+        if task:
+            task.error = error
+            if final:
+                task.status = DeletionStatus.FAILED
+                task.finished_at = datetime.now(timezone.utc)
+            self.repo.update(task)
+
+    def _purge_batch(self, task: DeletionTask) -> list[tuple[Optional[str], str, int]]:
+        limit = settings.DELETION_BATCH_SIZE
+        task.status = DeletionStatus.RUNNING
+
+        if task.target_type == DeletionTarget.PROJECT:
+            removed = self.file_repo.delete_batch_for_project(task.target_id, limit)
+            if not removed:
+                deleted_versions = self.version_repo.delete_batch_for_project(task.target_id, limit)
+                task.versions_deleted += deleted_versions
+                if deleted_versions == 0:
+                    self.project_repo.hard_delete(task.target_id)
+                    self._mark_completed(task)
+        else:
+            removed = self.file_repo.delete_batch_for_version(task.target_id, limit)
+            if removed:
+                # Project purges need no accounting: the counter goes with the project row.
+                version = self.db.get(Version, task.target_id)
+                self.project_repo.add_usage(version.project_id, -sum(size for _, _, size in removed))
+            else:
+                task.versions_deleted += self.version_repo.hard_delete(task.target_id)
+                self._mark_completed(task)
+
+        task.files_deleted += len(removed)
+        task.bytes_reclaimed += sum(size for _, _, size in removed)
+        return removed
+
+    def _mark_completed(self, task: DeletionTask) -> None:
+        task.status = DeletionStatus.COMPLETED
+        task.finished_at = datetime.now(timezone.utc)
+        logger.info(
+            f"Deletion task id={task.id} completed: {task.files_deleted} files, "
+            f"{task.bytes_reclaimed} bytes reclaimed"
+        )
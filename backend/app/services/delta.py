@@ -0,0 +1,203 @@
+"""
+Delta service: binary patches between releases of the same project.
+
+A client that already has an APK of the project declares its SHA-256 when
+downloading a newer file; it then receives a patch (see app.utils.apk_delta)
+instead of the full APK. Patches are built lazily on the first request for a
+(base, target) pair, in a process pool so diffing never holds the GIL of the
+serving process, and kept in DELTA_CACHE_PATH keyed by both checksums. The
+cache evicts the least recently served patches once it outgrows
+DELTA_CACHE_MAX_BYTES. Pairs whose patch is not worth serving are remembered
+with an empty marker so they are not diffed again.
+"""
+
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from app.core.config import get_settings
+from app.models.apk_file import APKFile
+from app.services.storage import StorageService
+from app.utils.apk_delta import build_delta
+from app.utils.logger import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+PATCH_MEDIA_TYPE = "application/x-apk-delta"
+PATCH_SUFFIX = ".patch"
+NO_PATCH_SUFFIX = ".none"
+MARKER_COST = 4096  # an empty marker still occupies a disk block
+
+
+class _Source(NamedTuple):
+    """The columns a build needs, detached from the request's session."""
+
+    id: int
+    volume_id: Optional[str]
+    file_path: str
+    file_size: int
+
+    @classmethod
+    def of(cls, apk: APKFile) -> "_Source":
+        return cls(apk.id, apk.volume_id, apk.file_path, apk.file_size)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+_inflight: dict[str, Future] = {}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _lock:
+        if _pool is None:
+            # spawn, not fork: the serving process runs threads and holds DB connections.
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.DELTA_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_delta_pool() -> None:
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+class DeltaService:
+    def __init__(self):
+        self.storage = StorageService()
+        self.cache_dir = Path(settings.DELTA_CACHE_PATH)
+
+    def get_patch(self, base: APKFile, target: APKFile) -> Optional[Path]:
+        """
+        Path of the cached patch from `base` to `target`, building it if needed.
+
+        Returns None when no patch should be served: it is too large to be
+        worth it, could not be built, or is still being built after
+        DELTA_WAIT_SECONDS (the build carries on and serves later requests).
+        """
+        if not base.sha256 or not target.sha256:
+            return None
+        name = f"{base.sha256}-{target.sha256}"
+        patch = self.cache_dir / f"{name}{PATCH_SUFFIX}"
+        if self._touch(patch):
+            return patch
+        if (self.cache_dir / f"{name}{NO_PATCH_SUFFIX}").exists():
+            return None
+
+        with _lock:
+            future = _inflight.get(name)
+            if future is None:
+                future = Future()
+                _inflight[name] = future
+                args = (name, _Source.of(base), _Source.of(target), future)
+                threading.Thread(target=self._build, args=args, daemon=True).start()
+        try:
+            return future.result(timeout=settings.DELTA_WAIT_SECONDS)
+        except FutureTimeout:
+            logger.info(f"Patch {name} is still being built; serving the full APK")
+            return None
+
+    # ─── Building ─────────────────────────────────────────────────────────
+
+    def _build(self, name: str, base: _Source, target: _Source, future: Future) -> None:
+        result: Optional[Path] = None
+        try:
+            result = self._build_patch(name, base, target)
+        except Exception as e:
+            logger.error(f"Failed to build patch from file id={base.id} to id={target.id}: {e}")
+        finally:
+            with _lock:
+                _inflight.pop(name, None)
+            future.set_result(result)
+
+    def _build_patch(self, name: str, base: _Source, target: _Source) -> Optional[Path]:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_dir / f".{name}.{uuid.uuid4().hex}.tmp"
+        sources: list[Path] = []
+        try:
+            old_path = self._local_copy(base, sources)
+            new_path = self._local_copy(target, sources)
+            try:
+                size = _get_pool().submit(build_delta, old_path, new_path, tmp).result()
+            except BrokenProcessPool:
+                shutdown_delta_pool()  # a worker died; start a fresh pool next time
+                raise
+            if size > target.file_size * settings.DELTA_MAX_RATIO:
+                logger.info(
+                    f"Patch from file id={base.id} to id={target.id} is {size} bytes "
+                    f"for a {target.file_size}-byte APK; not serving it"
+                )
+                (self.cache_dir / f"{name}{NO_PATCH_SUFFIX}").touch()
+                return None
+            patch = self.cache_dir / f"{name}{PATCH_SUFFIX}"
+            os.replace(tmp, patch)
+            logger.info(f"Built patch from file id={base.id} to id={target.id}: {size} bytes")
+        finally:
+            tmp.unlink(missing_ok=True)
+            for path in sources:
+                path.unlink(missing_ok=True)
+        self._evict()
+        return patch
+
+    def _local_copy(self, apk: _Source, temporary: list[Path]) -> Path:
+        """A local path to the file's bytes, downloading it first from object stores."""
+        backend = self.storage.backend_for(apk.volume_id)
+        if backend is None:
+            raise FileNotFoundError(f"Storage volume '{apk.volume_id}' is not configured")
+        path = backend.local_path(apk.file_path)
+        if path is not None:
+            return path
+        path = self.cache_dir / f".src.{uuid.uuid4().hex}"
+        temporary.append(path)
+        with open(path, "wb") as fp:
+            for chunk in backend.get(apk.file_path):
+                fp.write(chunk)
+        return path
+
+    # ─── Cache ────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _touch(path: Path) -> bool:
+        """Mark a cached patch as recently served; False if it is not cached."""
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _evict(self) -> None:
+        """Delete least recently served entries until the cache fits DELTA_CACHE_MAX_BYTES."""
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.startswith(".") or not entry.is_file():
+                    continue
+                st = entry.stat()
+                cost = st.st_size if entry.name.endswith(PATCH_SUFFIX) else MARKER_COST
+                entries.append((st.st_mtime, cost, entry.path))
+                total += cost
+        if total <= settings.DELTA_CACHE_MAX_BYTES:
+            return
+        entries.sort()
+        for _, cost, path in entries:
+            if total <= settings.DELTA_CACHE_MAX_BYTES:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= cost
+        logger.info(f"Delta cache trimmed to {total} bytes")
@@ -0,0 +1,136 @@
+"""
+Readiness probing for orchestrators.
+
+Probes run at most once per READINESS_CACHE_SECONDS per worker, whatever the
+check rate. Between runs, /readyz answers from the last report without I/O,
+and concurrent checks of a stale report wait for a single probe.
+
+The database is probed on its own short-lived connection with a timeout, so
+an exhausted pool shows up as saturation rather than as a hanging check.
+"""
+
+import asyncio
+import os
+import socket
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from app.core.config import get_settings
+from app.core.database import engine
+from app.schemas.health import DatabaseHealth, PoolHealth, ReadinessReport, VolumeHealth
+from app.services.storage import StorageVolume, get_volumes
+from app.utils.logger import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+PROBE_KEY = f".readyz/{socket.gethostname()}-{os.getpid()}"  # dot directories are never reconciled
+
+_probe_engine = create_engine(
+    settings.DATABASE_URL, poolclass=NullPool, connect_args={"timeout": settings.READINESS_DB_TIMEOUT}
+)
+
+
+class ReadinessProbe:
+    def __init__(self):
+        self._report: Optional[ReadinessReport] = None
+        self._checked_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def report(self) -> ReadinessReport:
+        if self._fresh():
+            return self._report
+        # Created on first use so it binds to the server's event loop.
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._fresh():
+                self._report = await run_in_threadpool(self.probe)
+                self._checked_at = time.monotonic()
+        return self._report
+
+    def _fresh(self) -> bool:
+        return (
+            self._report is not None
+            and time.monotonic() - self._checked_at < settings.READINESS_CACHE_SECONDS
+        )
+
+    def probe(self) -> ReadinessReport:
+        database = self._probe_database()
+        volumes = [self._probe_volume(volume) for volume in get_volumes().values()]
+        ready = database.ok and any(v.writable and v.has_space for v in volumes)
+        if not ready:
+            problems = [f"database: {database.error}"] if not database.ok else []
+            problems += [
+                f"volume {v.volume_id}: {v.error or 'low on space'}"
+                for v in volumes
+                if not (v.writable and v.has_space)
+            ]
+            logger.warning(f"Not ready: {'; '.join(problems) or 'no storage volumes'}")
+        return ReadinessReport(
+            ready=ready,
+            checked_at=datetime.now(timezone.utc),
+            database=database,
+            pool=self._pool(),
+            volumes=volumes,
+        )
+
+    @staticmethod
+    def _probe_database() -> DatabaseHealth:
+        started = time.perf_counter()
+        try:
+            with _probe_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except Exception as e:
+            return DatabaseHealth(ok=False, error=str(e))
+        return DatabaseHealth(ok=True, latency_ms=round((time.perf_counter() - started) * 1000, 1))
+
+    @staticmethod
+    def _pool() -> PoolHealth:
+        pool = engine.pool
+        size, max_overflow = pool.size(), pool._max_overflow
+        checked_out = pool.checkedout()
+        return PoolHealth(
+            size=size,
+            checked_out=checked_out,
+            overflow=max(0, pool.overflow()),
+            max_overflow=max_overflow,
+            saturation=round(checked_out / max(1, size + max_overflow), 3),
+        )
+
+    @staticmethod
+    def _probe_volume(volume: StorageVolume) -> VolumeHealth:
+        error = None
+        try:
+            writer = volume.backend.open_writer(PROBE_KEY)
+            try:
+                writer.write(b"ok")
+                writer.commit()
+            except BaseException:
+                writer.abort()
+                raise
+            volume.backend.delete(PROBE_KEY)
+        except Exception as e:
+            error = str(e)
+        writable = error is None
+        try:
+            capacity = volume.capacity()
+        except Exception as e:
+            capacity, error = None, error or str(e)
+        total, free = capacity if capacity is not None else (None, None)
+        return VolumeHealth(
+            volume_id=volume.id,
+            writable=writable,
+            total_bytes=total,
+            free_bytes=free,
+            has_space=free is None or free >= settings.STORAGE_MIN_FREE_BYTES,
+            error=error,
+        )
+
+
+readiness_probe = ReadinessProbe()
@@ -0,0 +1,116 @@
+"""
+Integrity service: checksum backfill and the background scrubber.
+
+Every file's SHA-256 is recorded at upload. The scrubber re-hashes files in
+least-recently-verified order, a bounded number per pass, on a small thread
+pool whose combined read rate is capped by SCRUB_MAX_BYTES_PER_SEC so it never
+competes with downloads for disk bandwidth.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.apk_file import IntegrityStatus
+from app.models.scrub_run import ScrubRun
+from app.repositories.apk_file import APKFileRepository
+from app.repositories.scrub_run import ScrubRunRepository
+from app.schemas.apk_file import APKFileDetail
+from app.schemas.integrity import IntegrityStatusRead, ScrubRunRead
+from app.services.storage import StorageService
+from app.utils.logger import get_logger
+from app.utils.throttle import Throttle
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+# One throttle per process, so backfill and scrub passes share the cap.
+scrub_throttle = Throttle(settings.SCRUB_MAX_BYTES_PER_SEC)
+
+
+class IntegrityService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.file_repo = APKFileRepository(db)
+        self.run_repo = ScrubRunRepository(db)
+        self.storage = StorageService()
+
+    def backfill_checksums(self, batch_size: int) -> int:
+        """Hash files uploaded before checksums existed. Returns rows processed."""
+        rows = self.file_repo.get_unhashed(batch_size)
+        for row, result in self._hash_all(rows):
+            if isinstance(result, Exception):
+                # Stamp it so the backfill moves on; it stays unhashed and shows up in the status.
+                self.file_repo.record_verification(row.id, None)
+            elif result is None:
+                self.file_repo.record_verification(row.id, IntegrityStatus.MISSING)
+            else:
+                self.file_repo.record_verification(row.id, IntegrityStatus.OK, sha256=result[0])
+        self.db.commit()
+        return len(rows)
+
+    def scrub_pass(self) -> Optional[ScrubRun]:
+        """Re-verify up to SCRUB_FILES_PER_PASS files that are due. Returns None if none were."""
+        rows = self.file_repo.get_due_for_scrub(self._verified_before(), settings.SCRUB_FILES_PER_PASS)
+        if not rows:
+            return None
+        run = self.run_repo.create(ScrubRun())
+        for row, result in self._hash_all(rows):
+            if isinstance(result, Exception):
+                run.errors += 1
+                logger.error(f"Scrub of file id={row.id} failed: {result}")
+                self.file_repo.record_verification(row.id, None)
+                continue
+            run.files_checked += 1
+            if result is None:
+                run.missing += 1
+                logger.error(f"Scrub: file id={row.id} is missing from storage")
+                self.file_repo.record_verification(row.id, IntegrityStatus.MISSING)
+                continue
+            sha256, size = result
+            run.bytes_read += size
+            if sha256 != row.sha256:
+                run.mismatches += 1
+                logger.error(f"Scrub: checksum mismatch for file id={row.id}")
+                self.file_repo.record_verification(row.id, IntegrityStatus.MISMATCH)
+            else:
+                self.file_repo.record_verification(row.id, IntegrityStatus.OK)
+        run.finished_at = datetime.now(timezone.utc)
+        run = self.run_repo.update(run)
+        logger.info(
+            f"Scrub pass id={run.id}: {run.files_checked} files, {run.mismatches} mismatched, "
+            f"{run.missing} missing, {run.bytes_per_second / (1024 * 1024):.1f} MB/s"
+        )
+        return run
+
+    def get_status(self) -> IntegrityStatusRead:
+        counts = self.file_repo.integrity_counts(self._verified_before())
+        return IntegrityStatusRead(
+            total_files=counts["total"],
+            unhashed=counts["unhashed"],
+            due=counts["due"],
+            mismatched=counts["mismatched"],
+            missing=counts["missing"],
+            max_bytes_per_second=settings.SCRUB_MAX_BYTES_PER_SEC,
+            recent_runs=[ScrubRunRead.model_validate(r) for r in self.run_repo.get_recent()],
+            flagged_files=[APKFileDetail.model_validate(f) for f in self.file_repo.get_flagged()],
+        )
+
+    @staticmethod
+    def _verified_before() -> datetime:
+        return datetime.now(timezone.utc) - timedelta(days=settings.SCRUB_VERIFY_EVERY_DAYS)
+
+    def _hash_all(self, rows) -> list[tuple]:
+        """Hash files on the scrub pool. Returns (row, (sha256, size) | None if missing | Exception)."""
+
+        def hash_one(row) -> Optional[tuple[str, int]] | Exception:
+            try:
+                return self.storage.checksum(row.volume_id, row.file_path, scrub_throttle)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=settings.SCRUB_THREADS) as pool:
+            return list(zip(rows, pool.map(hash_one, rows)))
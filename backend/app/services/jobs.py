@@ -0,0 +1,123 @@
+"""
+Job service: enqueue background work and report queue status.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.job import JobStatus
+from app.repositories.job import JobRepository
+from app.schemas.job import JobQueueStatus, JobRead, JobTypeStatus
+from app.utils.logger import get_logger
+from app.workers.registry import all_handlers, get_handler
+from app.workers.runner import job_runner, wake_job_runner
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+PRUNE_BATCH_SIZE = 1000
+
+
+class JobService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.repo = JobRepository(db)
+
+    def enqueue(
+        self,
+        job_type: str,
+        payload: Optional[dict[str, Any]] = None,
+        *,
+        unique_key: Optional[str] = None,
+        delay: float = 0.0,
+        commit: bool = True,
+    ) -> Optional[int]:
+        """
+        Queue a job for background execution.
+
+        With `commit=False` the job is only added to the caller's transaction and
+        becomes visible to workers when the caller commits.
+
+        Returns:
+            The job id, or None if an active job with `unique_key` already exists.
+        """
+        handler = get_handler(job_type)
+        run_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+        job_id = self.repo.enqueue(
+            job_type,
+            payload or {},
+            max_attempts=handler.max_attempts,
+            unique_key=unique_key,
+            run_at=run_at,
+        )
+        if commit:
+            self.db.commit()
+            wake_job_runner()
+        return job_id
+
+    def get_job(self, job_id: int) -> JobRead:
+        job = self.repo.get(job_id)
+        if not job:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+        return JobRead.model_validate(job)
+
+    def retry_job(self, job_id: int) -> JobRead:
+        """Re-queue a permanently failed job with a fresh attempt budget."""
+        job = self.repo.get(job_id)
+        if not job:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+        if job.status != JobStatus.FAILED:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT, detail="Only failed jobs can be retried"
+            )
+        conflict = HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Another job for '{job.unique_key}' is already queued or running",
+        )
+        if job.unique_key and self.repo.get_active_by_unique_key(job.unique_key):
+            raise conflict
+        job.status = JobStatus.QUEUED
+        job.attempts = 0
+        job.run_at = datetime.now(timezone.utc)
+        job.finished_at = None
+        try:
+            job = self.repo.update(job)
+        except IntegrityError:
+            # An equivalent job was enqueued after the check above.
+            self.db.rollback()
+            raise conflict
+        wake_job_runner()
+        logger.info(f"Re-queued job id={job_id}")
+        return JobRead.model_validate(job)
+
+    def get_status(self) -> JobQueueStatus:
+        running_here = job_runner.running_counts()
+        by_type = {
+            h.name: JobTypeStatus(
+                job_type=h.name, concurrency=h.limit, running_here=running_here.get(h.name, 0)
+            )
+            for h in all_handlers()
+        }
+        for job_type, job_status, count in self.repo.counts_by_type():
+            row = by_type.setdefault(job_type, JobTypeStatus(job_type=job_type, concurrency=0))
+            setattr(row, job_status.value.lower(), count)
+        return JobQueueStatus(
+            worker_id=job_runner.worker_id,
+            job_types=sorted(by_type.values(), key=lambda r: r.job_type),
+            recent_failures=[JobRead.model_validate(j) for j in self.repo.get_recent_failures()],
+        )
+
+    def prune_finished(self) -> int:
+        """Delete finished jobs past JOB_RETENTION_DAYS in bounded batches."""
+        threshold = datetime.now(timezone.utc) - timedelta(days=settings.JOB_RETENTION_DAYS)
+        total = 0
+        while deleted := self.repo.delete_finished_before(threshold, PRUNE_BATCH_SIZE):
+            total += deleted
+        if total:
+            logger.info(f"Pruned {total} finished job(s)")
+        return total
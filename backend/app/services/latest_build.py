@@ -0,0 +1,188 @@
+"""
+Latest-build service: in-memory index of the newest build per project/channel,
+used to answer device update checks without touching the database.
+
+Every worker process holds its own copy; changes made in one are broadcast on
+the invalidation bus and reloaded by the others.
+"""
+
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.core.invalidation import invalidation
+from app.models.user import User
+from app.models.version import Version
+from app.repositories.apk_file import APKFileRepository
+from app.repositories.version import VersionRepository
+from app.schemas.latest_build import LatestBuildRead
+from app.services.access import project_access
+from app.utils.logger import get_logger
+from app.utils.semver import parse_version
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class IndexedFile:
+    file_id: int
+    filename: str
+    file_size: int
+    uploaded_at: datetime
+    abis: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class LatestBuild:
+    project_id: int
+    project_name: str
+    channel: str
+    version_id: int
+    version_string: str
+    files: tuple[IndexedFile, ...]  # newest upload first
+
+    def pick(self, abi: Optional[str]) -> Optional[IndexedFile]:
+        """The newest file, or the newest one shipping `abi` (universal APKs match any ABI)."""
+        if abi is None:
+            return self.files[0]
+        for f in self.files:
+            if abi in f.abis or not f.abis:
+                return f
+        return None
+
+
+class LatestBuildIndex:
+    """Process-local map of (project name, channel) → newest build. Thread-safe."""
+
+    def __init__(self):
+        self._builds: dict[tuple[str, str], LatestBuild] = {}
+        self._lock = threading.Lock()
+
+    def get(self, project_name: str, channel: str) -> Optional[LatestBuild]:
+        return self._builds.get((project_name, channel))
+
+    def rebuild(self, db: Session) -> None:
+        """Replace the whole index; two queries regardless of project count."""
+        builds = self._load(db, project_id=None)
+        with self._lock:
+            self._builds = {(b.project_name, b.channel): b for b in builds}
+        logger.info(f"Latest-build index rebuilt with {len(builds)} entries")
+
+    def refresh_project(self, db: Session, project_id: int) -> None:
+        """Recompute one project's entries after an upload, delete or rename (committed)."""
+        self._refresh(db, project_id)
+        invalidation.publish(INVALIDATION_KIND, project_id)
+
+    def remove_project(self, project_id: int) -> None:
+        with self._lock:
+            self._builds = {k: b for k, b in self._builds.items() if b.project_id != project_id}
+        invalidation.publish(INVALIDATION_KIND, project_id)
+
+    def _refresh(self, db: Session, project_id: int) -> None:
+        builds = self._load(db, project_id=project_id)
+        with self._lock:
+            kept = {k: b for k, b in self._builds.items() if b.project_id != project_id}
+            kept.update({(b.project_name, b.channel): b for b in builds})
+            self._builds = kept
+
+    @staticmethod
+    def _load(db: Session, project_id: Optional[int]) -> list[LatestBuild]:
+        versions: list[Version] = VersionRepository(db).get_latest_with_files(project_id)
+        files_by_version: dict[int, list[IndexedFile]] = {}
+        for f in APKFileRepository(db).get_by_versions([v.id for v in versions]):
+            files_by_version.setdefault(f.version_id, []).append(
+                IndexedFile(
+                    file_id=f.id,
+                    filename=f.filename,
+                    file_size=f.file_size,
+                    uploaded_at=f.uploaded_at,
+                    abis=tuple(f.abis or ()),
+                )
+            )
+        return [
+            LatestBuild(
+                project_id=v.project_id,
+                project_name=v.project.name,
+                channel=v.channel,
+                version_id=v.id,
+                version_string=v.version_string,
+                files=tuple(files_by_version[v.id]),
+            )
+            for v in versions
+            if v.id in files_by_version
+        ]
+
+
+INVALIDATION_KIND = "latest_build"
+
+latest_build_index = LatestBuildIndex()
+
+
+def rebuild_latest_build_index() -> None:
+    """Populate the index at startup; a failure only delays update checks, never boot."""
+    db = SessionLocal()
+    try:
+        latest_build_index.rebuild(db)
+    except Exception as e:
+        logger.error(f"Failed to rebuild latest-build index: {e}")
+    finally:
+        db.close()
+
+
+def _reload_project(project_id: int) -> None:
+    """Apply another process's change; a removed project simply loads no entries."""
+    db = SessionLocal()
+    try:
+        latest_build_index._refresh(db, project_id)
+    finally:
+        db.close()
+
+
+invalidation.register(INVALIDATION_KIND, _reload_project, rebuild_latest_build_index)
+
+
+class LatestBuildService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_latest(
+        self, project_name: str, channel: str, abi: Optional[str], current_user: User
+    ) -> LatestBuildRead:
+        build = latest_build_index.get(project_name, channel)
+        if build is not None:
+            project_access.authorize(self.db, current_user, build.project_id)
+        picked = build.pick(abi) if build else None
+        if build is None or picked is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No build available for '{project_name}' on channel '{channel}'",
+            )
+        return LatestBuildRead(
+            project=build.project_name,
+            channel=build.channel,
+            version=build.version_string,
+            version_id=build.version_id,
+            file_id=picked.file_id,
+            filename=picked.filename,
+            file_size=picked.file_size,
+            uploaded_at=picked.uploaded_at,
+            download_url=f"/api/files/{picked.file_id}/download",
+        )
+
+    def check_update(
+        self, project_name: str, channel: str, current_version: str, abi: Optional[str], current_user: User
+    ) -> Optional[LatestBuildRead]:
+        """Return the latest build if it is newer than `current_version`, else None."""
+        latest = self.get_latest(project_name, channel, abi, current_user)
+        if parse_version(latest.version) <= parse_version(current_version):
+            return None
+        return latest
+
+    @staticmethod
+    def etag(latest: LatestBuildRead) -> str:
+        return f'"{latest.version_id}-{latest.file_id}"'
@@ -2,13 +2,19 @@
 Project service: business logic for project management.
 """
 
+from typing import Optional
+
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.core.events import event_bus
 from app.models.project import Project
 from app.models.user import User
 from app.repositories.project import ProjectRepository
+from app.schemas.deletion import DeletionTaskRead
 from app.schemas.project import ProjectCreate, ProjectRead, ProjectUpdate
+from app.services.deletion import DeletionService
+from app.services.latest_build import latest_build_index
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -17,6 +23,7 @@ logger = get_logger(__name__)
 class ProjectService:
     def __init__(self, db: Session):
         self.repo = ProjectRepository(db)
+        self.deletion = DeletionService(db)
 
     def list_projects(self, current_user: User) -> list[ProjectRead]:
         from app.models.user import UserRole
@@ -40,13 +47,17 @@ class ProjectService:
         return ProjectRead.model_validate(project)
 
     def create_project(self, payload: ProjectCreate) -> ProjectRead:
-        if self.repo.get_by_name(payload.name):
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"Project '{payload.name}' already exists",
-            )
+        existing = self.repo.get_by_name(payload.name)
+        if existing:
+            detail = f"Project '{payload.name}' already exists"
+            if existing.deleted_at is not None:
+                detail = f"Project '{payload.name}' is still being deleted, try again later"
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail)
         project = Project(name=payload.name, description=payload.description)
         project = self.repo.create(project)
+        event_bus.publish(
+            "project_created", project.id, {"project_id": project.id, "name": project.name}, {"total_projects": 1}
+        )
         logger.info(f"Created project '{project.name}'")
         return ProjectRead.model_validate(project)
 
@@ -65,12 +76,26 @@ class ProjectService:
         if payload.description is not None:
             project.description = payload.description
         project = self.repo.update(project)
+        if payload.name is not None:
+            latest_build_index.refresh_project(self.repo.db, project_id)
         logger.info(f"Updated project id={project_id}")
         return ProjectRead.model_validate(project)
 
-    def delete_project(self, project_id: int) -> None:
+    def set_quota(self, project_id: int, quota_bytes: Optional[int]) -> ProjectRead:
+        """Set the project's storage quota; existing files are kept even if it is already over."""
+        project = self.repo.get(project_id)
+        if not project:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+        project.storage_quota_bytes = quota_bytes
+        project = self.repo.update(project)
+        logger.info(f"Storage quota of project id={project_id} set to {quota_bytes}")
+        return ProjectRead.model_validate(project)
+
+    def delete_project(self, project_id: int, current_user: User) -> DeletionTaskRead:
+        """
+        Hide the project immediately; rows and files are purged in the background.
+        """
         project = self.repo.get(project_id)
         if not project:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-        self.repo.delete(project)
-        logger.info(f"Deleted project id={project_id}")
+        return self.deletion.schedule_project(project, requested_by=current_user.id)
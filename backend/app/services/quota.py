@@ -0,0 +1,63 @@
+"""
+Project storage quotas.
+
+Each project row carries `storage_used_bytes`, maintained incrementally:
+uploads reserve their bytes before they are written and settle the exact
+size afterwards; deletes subtract in the same transaction that removes the
+rows. No upload ever sums file sizes. Reservations run in short
+transactions of their own, so concurrent uploads (and batch members) never
+share a session. A daily recount corrects drift from crashed uploads.
+"""
+
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from app.core.database import SessionLocal
+from app.models.project import Project
+from app.repositories.project import ProjectRepository
+from app.services.access import project_access
+
+
+def _quota_exceeded() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_507_INSUFFICIENT_STORAGE,
+        detail="Project storage quota exceeded",
+    )
+
+
+def reserve_project_bytes(project_id: int, size: int) -> None:
+    """
+    Count `size` bytes against the project (a negative size releases them).
+
+    Raises:
+        HTTPException 507 if the project's quota would be exceeded.
+    """
+    db = SessionLocal()
+    try:
+        if not ProjectRepository(db).reserve_bytes(project_id, size):
+            raise _quota_exceeded()
+    finally:
+        db.close()
+
+
+def release_project_bytes(project_id: int, size: int) -> None:
+    if size:
+        reserve_project_bytes(project_id, -size)
+
+
+def version_would_exceed_quota(version_id: int, size: int) -> bool:
+    """Cheap pre-check for upload admission: two primary-key reads, no reservation."""
+    db = SessionLocal()
+    try:
+        project_id = project_access.project_of_version(db, version_id)
+        if project_id is None:
+            return False
+        project: Optional[Project] = db.get(Project, project_id)
+        return (
+            project is not None
+            and project.storage_quota_bytes is not None
+            and project.storage_used_bytes + size > project.storage_quota_bytes
+        )
+    finally:
+        db.close()
@@ -0,0 +1,159 @@
+"""
+Rebalance service: migrate stored files between volumes while the app is serving.
+
+A move copies the file to its new volume, repoints the rows sharing it only if
+they still point at the old location, then removes the old copy. Readers see either the
+old or the new location, never a missing file; a file deleted mid-move just
+has its new copy discarded.
+"""
+
+import uuid
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.apk_file import APKFile
+from app.repositories.apk_file import APKFileRepository
+from app.services.storage import StorageService, StorageVolume
+from app.utils.file_handler import build_storage_path
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SCAN_BATCH_SIZE = 100
+
+
+@dataclass
+class VolumeUsage:
+    id: str
+    location: str
+    weight: float
+    total_bytes: Optional[int]  # None for object stores, which have no fixed size
+    free_bytes: Optional[int]
+
+    @property
+    def used_fraction(self) -> float:
+        if self.total_bytes is None:
+            return 0.0
+        return 1 - self.free_bytes / self.total_bytes if self.total_bytes else 1.0
+
+
+class RebalanceService:
+    def __init__(self, db: Session):
+        self.repo = APKFileRepository(db)
+        self.storage = StorageService()
+
+    def usage(self) -> list[VolumeUsage]:
+        result = []
+        for volume in self.storage.volumes.values():
+            total, free = volume.capacity() or (None, None)
+            result.append(VolumeUsage(volume.id, volume.backend.uri, volume.weight, total, free))
+        return result
+
+    def drain(
+        self,
+        source: Optional[str],
+        target: Optional[str] = None,
+        limit: Optional[int] = None,
+        dry_run: bool = False,
+    ) -> tuple[int, int]:
+        """
+        Move files off `source` (None = legacy absolute paths) onto `target`,
+        or onto the roomiest other volume per file when no target is given.
+
+        Returns:
+            (files moved, bytes moved).
+        """
+        moved = moved_bytes = 0
+        for apk in self._files_on(source):
+            if limit is not None and moved >= limit:
+                break
+            volume = (
+                self.storage.volumes[target]
+                if target
+                else self.storage.pick_volume(apk.file_size, exclude=source)
+            )
+            size = apk.file_size
+            if dry_run:
+                logger.info(f"Would move file id={apk.id} ({size} bytes) to '{volume.id}'")
+            elif not self.migrate_file(apk, volume):
+                continue
+            moved += 1
+            moved_bytes += size
+        return moved, moved_bytes
+
+    def balance(self, tolerance: float = 0.05, dry_run: bool = False) -> tuple[int, int]:
+        """
+        Move files from the fullest volume to the emptiest, one at a time,
+        until their used fractions are within `tolerance` of each other.
+        Only fixed-size volumes take part; use `drain` to move files into or
+        out of an object store.
+        """
+        moved = moved_bytes = 0
+        skipped: set[int] = set()
+        while True:
+            usage = sorted(
+                (u for u in self.usage() if u.total_bytes is not None),
+                key=lambda u: u.used_fraction,
+            )
+            if len(usage) < 2:
+                break
+            emptiest, fullest = usage[0], usage[-1]
+            if fullest.used_fraction - emptiest.used_fraction <= tolerance:
+                break
+            apk = next((f for f in self._files_on(fullest.id) if f.id not in skipped), None)
+            if apk is None:
+                break  # nothing (left) of ours on the fullest volume
+            if dry_run:
+                # Nothing changes on disk, so one step is all a dry run can show.
+                logger.info(f"Would move files from '{fullest.id}' to '{emptiest.id}'")
+                break
+            size = apk.file_size
+            if self.migrate_file(apk, self.storage.volumes[emptiest.id]):
+                moved += 1
+                moved_bytes += size
+            else:
+                skipped.add(apk.id)
+        return moved, moved_bytes
+
+    def migrate_file(self, apk: APKFile, volume: StorageVolume) -> bool:
+        """Move one file onto `volume`. Returns False if it vanished or changed meanwhile."""
+        if apk.volume_id == volume.id:
+            return False
+        source = self.storage.backend_for(apk.volume_id)
+        if source is None or source.stat(apk.file_path) is None:
+            logger.warning(f"File id={apk.id} is missing from storage, not moving it")
+            return False
+
+        version = apk.version
+        key = str(
+            build_storage_path(
+                version.project_id,
+                version.project.name,
+                version.id,
+                version.version_string,
+                apk.filename,
+                uuid.uuid4().hex[:12],
+            )
+        )
+        self.storage.copy(source, apk.file_path, volume, key)
+
+        old_volume, old_path = apk.volume_id, apk.file_path
+        if not self.repo.move(old_volume, old_path, volume.id, key):
+            volume.backend.delete(key)
+            logger.info(f"File id={apk.id} changed during the move, discarded the copy")
+            return False
+
+        # A row may have started sharing the old copy after the repoint; keep it for that row.
+        if not self.repo.referenced_locations([(old_volume, old_path)]):
+            self.storage.delete(old_volume, old_path)
+        logger.info(f"Moved file id={apk.id} from '{old_volume or 'legacy'}' to '{volume.id}'")
+        return True
+
+    def _files_on(self, volume_id: Optional[str]) -> Iterator[APKFile]:
+        after_id = 0
+        while batch := self.repo.get_on_volume(volume_id, after_id, SCAN_BATCH_SIZE):
+            yield from batch
+            after_id = batch[-1].id
+            self.repo.db.expunge_all()
@@ -0,0 +1,260 @@
+"""
+Reconcile service: find drift between stored files and the apk_files table.
+
+A run is split into units, one per fan-out directory of each volume plus one
+for the legacy STORAGE_PATH tree. Each unit lists its files and streams the
+matching rows with a keyset scan, then compares the two sets:
+
+- orphan files: stored but referenced by no row (failed uploads, crashes
+  between save and insert, interrupted purges);
+- dangling rows: referencing a file that no longer exists;
+- shared paths: several rows referencing one file. These are normal since
+  uploads are deduplicated by hash, so they are counted but not reported.
+
+The run's position is committed after every unit, so a run survives restarts
+and never repeats finished work. Anything younger than RECONCILE_GRACE_SECONDS
+is left alone, since it may belong to an upload or move still in flight.
+"""
+
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.reconcile_run import ReconcileMode, ReconcileRun, ReconcileStatus
+from app.repositories.apk_file import APKFileRepository
+from app.repositories.project import ProjectRepository
+from app.repositories.reconcile_run import ReconcileRunRepository
+from app.schemas.reconcile import ReconcileRunRead
+from app.services.jobs import JobService
+from app.services.latest_build import latest_build_index
+from app.services.storage import StorageService, get_volumes
+from app.storage import LocalBackend, StorageBackend
+from app.utils.logger import get_logger
+from app.workers.runner import wake_job_runner
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+LEGACY_UNIT = "legacy:"
+QUARANTINE_DIR = ".quarantine"
+SCAN_BATCH_SIZE = 1000
+
+FANOUT_DIR_RE = re.compile(r"^[0-9a-f]{2}$")
+# Only keys in the layouts build_storage_path has produced are ever considered ours.
+FANOUT_KEY_RE = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{2}/[^/]+/[^/]+/[^/]+$")
+LEGACY_KEY_RE = re.compile(r"^[^/]+/[^/]+/[^/]+$")
+
+
+class ReconcileService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.repo = ReconcileRunRepository(db)
+        self.file_repo = APKFileRepository(db)
+        self.project_repo = ProjectRepository(db)
+        self.jobs = JobService(db)
+        self.storage = StorageService()
+
+    # ─── Scheduling ───────────────────────────────────────────────────────
+
+    def start(self, mode: ReconcileMode, requested_by: Optional[int]) -> ReconcileRunRead:
+        if self.repo.get_active():
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A reconciliation run is already in progress",
+            )
+        run = ReconcileRun(mode=mode, units=self._plan_units(), findings=[], requested_by=requested_by)
+        self.db.add(run)
+        self.db.flush()
+        self.jobs.enqueue(
+            "reconcile_storage",
+            {"run_id": run.id},
+            unique_key=f"reconcile:{run.id}",
+            commit=False,
+        )
+        self.db.commit()
+        self.db.refresh(run)
+        wake_job_runner()
+        logger.info(f"Scheduled {mode.value} reconciliation run id={run.id}")
+        return ReconcileRunRead.model_validate(run)
+
+    def start_scheduled(self) -> None:
+        """Periodic report-only run; skipped while another run is in progress."""
+        if not self.repo.get_active():
+            self.start(ReconcileMode.REPORT, requested_by=None)
+
+    @staticmethod
+    def _plan_units() -> list[str]:
+        units = [LEGACY_UNIT]
+        for volume_id in get_volumes():
+            units.extend(f"{volume_id}:{i:02x}" for i in range(256))
+        return units
+
+    # ─── Progress ─────────────────────────────────────────────────────────
+
+    def get_run(self, run_id: int) -> ReconcileRunRead:
+        run = self.repo.get(run_id)
+        if not run:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reconciliation run not found")
+        return ReconcileRunRead.model_validate(run)
+
+    def list_runs(self, limit: int = 50) -> list[ReconcileRunRead]:
+        return [ReconcileRunRead.model_validate(r) for r in self.repo.get_recent(limit)]
+
+    # ─── Reconciliation ───────────────────────────────────────────────────
+
+    def process_unit(self, run_id: int) -> bool:
+        """
+        Reconcile the next unit of a run and checkpoint it.
+
+        Returns:
+            True once the run is finished (or no longer exists).
+        """
+        run = self.repo.get_for_update(run_id)
+        if run is None or run.status in (ReconcileStatus.COMPLETED, ReconcileStatus.FAILED):
+            self.db.rollback()
+            return True
+
+        run.status = ReconcileStatus.RUNNING
+        touched_projects: set[int] = set()
+        if run.position < len(run.units):
+            touched_projects = self._reconcile_unit(run, run.units[run.position])
+            run.position += 1
+        done = run.position >= len(run.units)
+        if done:
+            run.status = ReconcileStatus.COMPLETED
+            run.finished_at = datetime.now(timezone.utc)
+            logger.info(
+                f"Reconciliation run id={run.id} completed: {run.orphan_files} orphan files, "
+                f"{run.dangling_rows} dangling rows, {run.duplicate_paths} shared paths"
+            )
+        self.db.commit()
+
+        for project_id in touched_projects:
+            latest_build_index.refresh_project(self.db, project_id)
+        return done
+
+    def record_failure(self, run_id: int, error: str, final: bool) -> None:
+        """Store the last error; a final failure also marks the run FAILED."""
+        self.db.rollback()
+        run = self.repo.get(run_id)
+        if run:
+            run.error = error
+            if final:
+                run.status = ReconcileStatus.FAILED
+                run.finished_at = datetime.now(timezone.utc)
+            self.repo.update(run)
+
+    def _reconcile_unit(self, run: ReconcileRun, unit: str) -> set[int]:
+        """Compare one unit's files with its rows and act per the run's mode. Returns touched project ids."""
+        legacy = unit == LEGACY_UNIT
+        volume_id, _, prefix = unit.rpartition(":")
+        volume_id = None if legacy else volume_id
+        backend = self.storage.backend_for(volume_id)
+        if backend is None:
+            return set()  # volume removed from the configuration since the run started
+
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.RECONCILE_GRACE_SECONDS)
+        files = self._list_files(backend, legacy, prefix)
+        rows = self._scan_rows(run, volume_id, None if legacy else prefix, legacy)
+        run.files_scanned += len(files)
+        findings: list[dict] = []
+
+        run.duplicate_paths += sum(1 for file_rows in rows.values() if len(file_rows) > 1)
+
+        for key, stat in files.items():
+            if key in rows or stat.modified_at > cutoff:
+                continue
+            run.orphan_files += 1
+            run.orphan_bytes += stat.size
+            finding = {"kind": "orphan", "volume": volume_id, "key": key, "size": stat.size}
+            try:
+                if run.mode == ReconcileMode.QUARANTINE:
+                    quarantined = f"{QUARANTINE_DIR}/{run.id}/{key}"
+                    backend.move(key, quarantined)
+                    run.files_quarantined += 1
+                    finding["action"] = f"quarantined to {quarantined}"
+                elif run.mode == ReconcileMode.DELETE:
+                    backend.delete(key)
+                    run.files_deleted += 1
+                    finding["action"] = "deleted"
+            except Exception as e:
+                logger.error(f"Failed to clean up orphan {key} on volume '{volume_id}': {e}")
+                finding["error"] = str(e)
+            findings.append(finding)
+
+        dangling: list[int] = []
+        for key, file_rows in rows.items():
+            if key in files:
+                continue
+            for row in file_rows:
+                # Re-check: the file may have appeared after the listing was taken.
+                if row.uploaded_at > cutoff or backend.stat(row.file_path) is not None:
+                    continue
+                run.dangling_rows += 1
+                dangling.append(row.id)
+                findings.append({"kind": "dangling", "volume": volume_id, "key": key, "file_id": row.id})
+
+        touched: set[int] = set()
+        if run.mode == ReconcileMode.DELETE and dangling:
+            removed = self.file_repo.delete_by_ids(dangling)
+            for project_id, size in removed.items():
+                self.project_repo.add_usage(project_id, -size)
+            touched = set(removed)
+            run.rows_deleted += len(dangling)
+
+        room = settings.RECONCILE_MAX_FINDINGS - len(run.findings)
+        if findings and room > 0:
+            run.findings = run.findings + findings[:room]
+        return touched
+
+    def _list_files(self, backend: StorageBackend, legacy: bool, prefix: str) -> dict:
+        if not legacy:
+            return {k: s for k, s in backend.list_objects(prefix) if FANOUT_KEY_RE.match(k)}
+        skipped = self._volume_dirs_in_storage_path()
+        return {
+            k: s
+            for k, s in backend.list_objects(
+                "",
+                skip=lambda name: name.startswith(".") or bool(FANOUT_DIR_RE.match(name)) or name in skipped,
+            )
+            if LEGACY_KEY_RE.match(k)
+        }
+
+    def _volume_dirs_in_storage_path(self) -> set[str]:
+        """Top-level directories of STORAGE_PATH that are themselves volume roots."""
+        names = set()
+        root = Path(settings.STORAGE_PATH).resolve()
+        for volume in self.storage.volumes.values():
+            if isinstance(volume.backend, LocalBackend):
+                volume_root = volume.backend.root.resolve()
+                if root in volume_root.parents:
+                    names.add(volume_root.relative_to(root).parts[0])
+        return names
+
+    def _scan_rows(
+        self, run: ReconcileRun, volume_id: Optional[str], prefix: Optional[str], legacy: bool
+    ) -> dict[str, list]:
+        rows: dict[str, list] = {}
+        after_id = 0
+        while batch := self.file_repo.scan_locations(volume_id, prefix, after_id, SCAN_BATCH_SIZE):
+            for row in batch:
+                key = self._legacy_key(row.file_path) if legacy else row.file_path
+                rows.setdefault(key, []).append(row)
+            after_id = batch[-1].id
+            run.rows_scanned += len(batch)
+        return rows
+
+    @staticmethod
+    def _legacy_key(file_path: str) -> str:
+        """Legacy rows hold absolute paths; key them like the listing of STORAGE_PATH."""
+        root = os.path.abspath(settings.STORAGE_PATH)
+        path = os.path.abspath(file_path)
+        if os.path.commonpath([root, path]) != root:
+            return path
+        return Path(os.path.relpath(path, root)).as_posix()
@@ -0,0 +1,119 @@
+"""
+Retention service: per-project rules that expire old versions.
+
+A version is kept if it is pinned, among the project's newest `keep_last`
+versions, or younger than `keep_days`; the newest version of each channel is
+always kept so update checks keep answering. Expired versions are deleted
+through the regular version deletion path (soft delete, then batched purge
+jobs that only unlink files no other row references), so the volume and the
+apk_files / file_download_logs rows shrink together.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.project import Project
+from app.models.version import Version
+from app.repositories.apk_file import APKFileRepository
+from app.repositories.project import ProjectRepository
+from app.repositories.version import VersionRepository
+from app.schemas.project import ProjectRead
+from app.schemas.retention import RetentionCandidate, RetentionPolicy, RetentionReport
+from app.services.deletion import DeletionService
+from app.utils.logger import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+
+class RetentionService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.project_repo = ProjectRepository(db)
+        self.version_repo = VersionRepository(db)
+        self.file_repo = APKFileRepository(db)
+        self.deletion = DeletionService(db)
+
+    def set_policy(self, project_id: int, payload: RetentionPolicy) -> ProjectRead:
+        project = self._get_project_or_404(project_id)
+        project.retention_keep_last = payload.keep_last
+        project.retention_keep_days = payload.keep_days
+        project = self.project_repo.update(project)
+        logger.info(
+            f"Retention for project id={project_id}: keep_last={payload.keep_last}, "
+            f"keep_days={payload.keep_days}"
+        )
+        return ProjectRead.model_validate(project)
+
+    def preview(self, project_id: int) -> RetentionReport:
+        """Dry run for one project: the versions the next sweep would delete and what that frees."""
+        project = self._get_project_or_404(project_id)
+        return self._report(project, self._expired(project))
+
+    def sweep(self, limit: int) -> Optional[int]:
+        """
+        Schedule deletion of expired versions across all projects, at most
+        `limit` per call. With RETENTION_DRY_RUN the report is only logged.
+
+        Returns:
+            Versions scheduled, or None if more remain than `limit` allowed.
+        """
+        scheduled = 0
+        for project in self.project_repo.get_with_retention():
+            expired = self._expired(project)
+            if not expired:
+                continue
+            if settings.RETENTION_DRY_RUN:
+                report = self._report(project, expired)
+                logger.info(
+                    f"Retention dry run for project '{project.name}': would delete "
+                    f"{len(expired)} versions, {report.files} files, {report.bytes_reclaimable} bytes"
+                )
+                continue
+            for version in expired:
+                if scheduled >= limit:
+                    return None
+                self.deletion.schedule_version(version, requested_by=None)
+                scheduled += 1
+            logger.info(f"Retention expired {len(expired)} versions of project '{project.name}'")
+        return scheduled
+
+    def _expired(self, project: Project) -> list[Version]:
+        keep_last, keep_days = project.retention_keep_last, project.retention_keep_days
+        if keep_last is None and keep_days is None:
+            return []
+        cutoff = datetime.now(timezone.utc) - timedelta(days=keep_days) if keep_days else None
+        channels: set[str] = set()
+        expired = []
+        for rank, version in enumerate(self.version_repo.get_by_project(project.id)):  # newest first
+            if version.channel not in channels:
+                channels.add(version.channel)
+                continue
+            if version.pinned:
+                continue
+            if keep_last is not None and rank < keep_last:
+                continue
+            if cutoff is not None and version.created_at >= cutoff:
+                continue
+            expired.append(version)
+        return expired
+
+    def _report(self, project: Project, expired: list[Version]) -> RetentionReport:
+        files, freed = self.file_repo.reclaimable([v.id for v in expired])
+        return RetentionReport(
+            project_id=project.id,
+            policy=RetentionPolicy(keep_last=project.retention_keep_last, keep_days=project.retention_keep_days),
+            versions=[RetentionCandidate.model_validate(v) for v in expired],
+            files=files,
+            bytes_reclaimable=freed,
+        )
+
+    def _get_project_or_404(self, project_id: int) -> Project:
+        project = self.project_repo.get(project_id)
+        if not project:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+        return project
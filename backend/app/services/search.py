@@ -0,0 +1,60 @@
+"""
+Search service: ranked, paginated search over the projects a user can see.
+"""
+
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.user import User, UserRole
+from app.repositories.search import SearchRepository
+from app.schemas.common import PaginatedData
+from app.schemas.search import SearchHit, SearchKind
+from app.services.access import project_access
+
+settings = get_settings()
+
+
+class SearchService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.repo = SearchRepository(db)
+
+    def search(
+        self,
+        query: str,
+        kinds: Optional[list[SearchKind]],
+        page: int,
+        page_size: int,
+        current_user: User,
+    ) -> PaginatedData[SearchHit]:
+        """
+        Match `query` against project names and descriptions, version strings
+        and filenames, best first. Only the SEARCH_MAX_RESULTS best matches of
+        each kind are ranked, so `total` is capped accordingly.
+        """
+        query = query.strip()
+        project_ids = None
+        if current_user.role != UserRole.ADMIN:
+            project_ids = project_access.allowed_projects(self.db, current_user.id)
+            if not project_ids:
+                return PaginatedData(items=[], total=0)
+
+        searches = {
+            "project": self.repo.search_projects,
+            "version": self.repo.search_versions,
+            "file": self.repo.search_files,
+        }
+        rows = [
+            row
+            for kind, search in searches.items()
+            if not kinds or kind in kinds
+            for row in search(query, project_ids, settings.SEARCH_MAX_RESULTS)
+        ]
+        rows.sort(key=lambda r: (-r.score, r.kind, r.id))
+        start = (page - 1) * page_size
+        return PaginatedData(
+            items=[SearchHit.model_validate(r) for r in rows[start : start + page_size]],
+            total=len(rows),
+        )
@@ -1,66 +1,268 @@
 """
-Storage service: handle file I/O on disk.
+Storage service: place, read and remove APK files across storage volumes.
+
+A volume is a storage root declared in STORAGE_VOLUMES, backed by the local
+filesystem or an S3-compatible bucket. Files keep a key relative to their
+volume, so a disk can be remounted or a bucket renamed by changing the
+setting. Rows without a volume id predate volumes and keep their absolute
+path under STORAGE_PATH.
 """
 
+import hashlib
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import Mapping, NamedTuple, Optional
 
 from fastapi import HTTPException, UploadFile, status
 
 from app.core.config import get_settings
-from app.utils.file_handler import build_storage_path, ensure_directory, validate_apk_file
+from app.core.executors import Workload, run_in
+from app.services.quota import release_project_bytes, reserve_project_bytes
+from app.storage import CHUNK_SIZE, LocalBackend, StorageBackend, StorageError, create_backend
+from app.utils.file_handler import build_storage_path, validate_apk_file
 from app.utils.logger import get_logger
+from app.utils.throttle import Throttle
 
 settings = get_settings()
 logger = get_logger(__name__)
 
-CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+class UploadTooLarge(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class StorageVolume:
+    id: str
+    backend: StorageBackend
+    weight: float
+
+    def capacity(self) -> Optional[tuple[int, int]]:
+        return self.backend.capacity()
+
+
+class StoredFile(NamedTuple):
+    volume_id: str
+    file_path: str  # key relative to the volume root
+    size: int
+    sha256: str
+
+
+@lru_cache()
+def get_volumes() -> dict[str, StorageVolume]:
+    return {
+        volume_id: StorageVolume(id=volume_id, backend=create_backend(location), weight=weight)
+        for volume_id, location, weight in settings.STORAGE_VOLUME_SPECS
+    }
+
+
+@lru_cache()
+def get_legacy_backend() -> LocalBackend:
+    return LocalBackend(settings.STORAGE_PATH)
 
 
 class StorageService:
+    def __init__(self):
+        self.volumes = get_volumes()
+
+    # ─── Placement ────────────────────────────────────────────────────────
+
+    def pick_volume(
+        self,
+        size: int = 0,
+        exclude: Optional[str] = None,
+        reserved: Optional[Mapping[str, int]] = None,
+        capacities: Optional[Mapping[str, Optional[tuple[int, int]]]] = None,
+    ) -> StorageVolume:
+        """
+        Choose the volume for a new file: the most weighted free space among
+        volumes that keep STORAGE_MIN_FREE_BYTES free after taking `size` bytes.
+        Volumes without a fixed size (object stores) always have room.
+        `reserved` holds bytes already promised to in-flight uploads per volume.
+        `capacities`, as returned by capacities(), saves querying the volumes
+        again, so the choice itself does no I/O.
+
+        Raises:
+            HTTPException 507 if no volume has room.
+        """
+        best, best_score = None, -1.0
+        for volume in self.volumes.values():
+            if volume.id == exclude:
+                continue
+            capacity = capacities[volume.id] if capacities is not None else volume.capacity()
+            if capacity is None:
+                score = float("inf")
+            else:
+                _, free = capacity
+                free -= (reserved or {}).get(volume.id, 0)
+                if free - size < settings.STORAGE_MIN_FREE_BYTES:
+                    continue
+                score = free * volume.weight
+            if score > best_score:
+                best, best_score = volume, score
+        if best is None:
+            logger.error(f"No storage volume has room for {size} bytes")
+            raise HTTPException(
+                status_code=status.HTTP_507_INSUFFICIENT_STORAGE,
+                detail="Storage is full",
+            )
+        return best
+
+    def capacities(self) -> dict[str, Optional[tuple[int, int]]]:
+        """(total, free) bytes of every volume, None for object stores. Blocking."""
+        return {volume.id: volume.capacity() for volume in self.volumes.values()}
+
+    # ─── Lookup / removal ─────────────────────────────────────────────────
+
+    def backend_for(self, volume_id: Optional[str]) -> Optional[StorageBackend]:
+        """The backend holding a file, or None if its volume is not configured."""
+        if volume_id is None:
+            return get_legacy_backend()
+        volume = self.volumes.get(volume_id)
+        if volume is None:
+            logger.error(f"Storage volume '{volume_id}' is not configured")
+            return None
+        return volume.backend
+
+    def delete(self, volume_id: Optional[str], file_path: str) -> None:
+        backend = self.backend_for(volume_id)
+        if backend is None:
+            return
+        try:
+            backend.delete(file_path)
+        except Exception as e:
+            logger.error(f"Failed to delete {file_path} from volume '{volume_id}': {e}")
+
+    # ─── Writes ───────────────────────────────────────────────────────────
+
     async def save_apk(
         self,
         file: UploadFile,
+        project_id: int,
         project_name: str,
+        version_id: int,
         version_string: str,
-    ) -> tuple[Path, int]:
+        volume_id: Optional[str] = None,
+    ) -> StoredFile:
         """
-        Validate and save an APK file to disk.
+        Validate and stream an APK to `volume_id`, as reserved by upload
+        admission, or else to the volume with the most room.
+
+        Every call writes to a fresh key (see build_storage_path), never over
+        an existing file: a deleted row's name may be reused while reference
+        rows still point at its bytes.
 
-        Returns:
-            Tuple of (absolute_path, file_size_bytes).
+        The file's bytes are counted against `project_id`'s quota: the
+        declared size is reserved before writing and the exact size settled
+        after, so the returned file is already accounted for. A caller that
+        then fails to record it must release `size` again.
 
         Raises:
             HTTPException 400 for invalid file type.
             HTTPException 413 if file exceeds MAX_UPLOAD_SIZE.
+            HTTPException 507 if every volume is full or the project's quota is exceeded.
         """
         validate_apk_file(file)
 
-        dest_path = build_storage_path(project_name, version_string, file.filename)
-        ensure_directory(dest_path.parent)
-
-        total_bytes = 0
+        volume = self.volumes.get(volume_id) if volume_id else None
+        if volume is None:
+            volume = self.pick_volume(file.size or 0)
+        key = str(
+            build_storage_path(
+                project_id, project_name, version_id, version_string, file.filename, uuid.uuid4().hex[:12]
+            )
+        )
 
+        reserved = file.size or 0
+        if reserved:
+            await run_in(Workload.UPLOAD, reserve_project_bytes, project_id, reserved)
         try:
-            with open(dest_path, "wb") as out_file:
-                while chunk := await file.read(CHUNK_SIZE):
-                    total_bytes += len(chunk)
-                    if total_bytes > settings.MAX_UPLOAD_SIZE:
-                        out_file.close()
-                        dest_path.unlink(missing_ok=True)
-                        raise HTTPException(
-                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                            detail=f"File exceeds maximum upload size of {settings.MAX_UPLOAD_SIZE // (1024*1024)} MB",
-                        )
-                    out_file.write(chunk)
-        except HTTPException:
-            raise
+            total_bytes, sha256 = await run_in(
+                Workload.UPLOAD, self._write, volume.backend, key, file
+            )
+        except UploadTooLarge:
+            await run_in(Workload.UPLOAD, release_project_bytes, project_id, reserved)
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File exceeds maximum upload size of {settings.MAX_UPLOAD_SIZE // (1024*1024)} MB",
+            )
         except Exception as e:
-            dest_path.unlink(missing_ok=True)
             logger.error(f"Failed to save file: {e}")
+            await run_in(Workload.UPLOAD, release_project_bytes, project_id, reserved)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to save file",
             )
 
-        logger.info(f"Saved APK: {dest_path} ({total_bytes} bytes)")
-        return dest_path, total_bytes
+        if total_bytes != reserved:
+            try:
+                await run_in(Workload.UPLOAD, reserve_project_bytes, project_id, total_bytes - reserved)
+            except HTTPException:
+                # Larger than declared and over quota: undo the whole upload.
+                await run_in(Workload.UPLOAD, self.delete, volume.id, key)
+                await run_in(Workload.UPLOAD, release_project_bytes, project_id, reserved)
+                raise
+
+        logger.info(f"Saved APK: {key} on volume '{volume.id}' ({total_bytes} bytes)")
+        return StoredFile(volume.id, key, total_bytes, sha256)
+
+    @staticmethod
+    def _write(backend: StorageBackend, key: str, file: UploadFile) -> tuple[int, str]:
+        # The request body is already spooled by the multipart parser, so read it directly.
+        file.file.seek(0)
+        writer = backend.open_writer(key)
+        digest = hashlib.sha256()
+        total_bytes = 0
+        try:
+            while chunk := file.file.read(CHUNK_SIZE):
+                total_bytes += len(chunk)
+                if total_bytes > settings.MAX_UPLOAD_SIZE:
+                    raise UploadTooLarge()
+                digest.update(chunk)
+                writer.write(chunk)
+            writer.commit()
+        except BaseException:
+            writer.abort()
+            raise
+        return total_bytes, digest.hexdigest()
+
+    def checksum(
+        self, volume_id: Optional[str], file_path: str, throttle: Optional[Throttle] = None
+    ) -> Optional[tuple[str, int]]:
+        """
+        SHA-256 and size of a stored file, or None if it is missing.
+
+        Raises:
+            StorageError if the file's volume is not configured.
+        """
+        backend = self.backend_for(volume_id)
+        if backend is None:
+            raise StorageError(f"Storage volume '{volume_id}' is not configured")
+        if backend.stat(file_path) is None:
+            return None
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            for chunk in backend.get(file_path):
+                if throttle:
+                    throttle.consume(len(chunk))
+                digest.update(chunk)
+                size += len(chunk)
+        except FileNotFoundError:
+            return None  # deleted between stat and read
+        return digest.hexdigest(), size
+
+    def copy(
+        self, source: StorageBackend, source_key: str, volume: StorageVolume, key: str
+    ) -> None:
+        """Stream a stored file onto another volume; nothing is visible there until it completes."""
+        writer = volume.backend.open_writer(key)
+        try:
+            for chunk in source.get(source_key):
+                writer.write(chunk)
+            writer.commit()
+        except BaseException:
+            writer.abort()
+            raise
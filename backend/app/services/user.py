@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 from app.models.user import User, UserRole
 from app.repositories.user import UserRepository
 from app.schemas.user import UserRead
+from app.services.access import project_access
 
 
 class UserService:
@@ -46,6 +47,7 @@ class UserService:
                 raise HTTPException(status_code=400, detail="Cannot delete the last admin account")
 
         self.repo.delete(target_user)
+        project_access.invalidate_user(target_user_id)
 
     def update_password(self, target_user_id: int, new_password: str):
         """Update a user's password."""
@@ -75,3 +77,4 @@ class UserService:
         projects = self.repo.db.query(Project).filter(Project.id.in_(project_ids)).all()
         user.projects = projects
         self.repo.update(user)
+        project_access.invalidate_user(user_id)
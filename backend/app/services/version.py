@@ -2,14 +2,21 @@
 Version service: business logic for version management.
 """
 
+from typing import Optional
+
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.core.events import event_bus
+from app.models.user import User
 from app.models.version import Version
 from app.repositories.project import ProjectRepository
 from app.repositories.version import VersionRepository
+from app.schemas.deletion import DeletionTaskRead
 from app.schemas.version import VersionCreate, VersionRead
+from app.services.deletion import DeletionService
 from app.utils.logger import get_logger
+from app.utils.semver import parse_version
 
 logger = get_logger(__name__)
 
@@ -18,11 +25,13 @@ class VersionService:
     def __init__(self, db: Session):
         self.repo = VersionRepository(db)
         self.project_repo = ProjectRepository(db)
+        self.deletion = DeletionService(db)
 
-    def list_versions(self, project_id: int) -> list[VersionRead]:
+    def list_versions(self, project_id: int, limit: Optional[int] = None) -> list[VersionRead]:
+        """List versions in semantic-version order, newest first."""
         if not self.project_repo.get(project_id):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-        rows = self.repo.get_with_file_counts(project_id)
+        rows = self.repo.get_with_file_counts(project_id, limit)
         result = []
         for version, file_count in rows:
             r = VersionRead.model_validate(version)
@@ -33,12 +42,54 @@ class VersionService:
     def create_version(self, project_id: int, payload: VersionCreate) -> VersionRead:
         if not self.project_repo.get(project_id):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-        if self.repo.get_by_project_and_string(project_id, payload.version_string):
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"Version '{payload.version_string}' already exists for this project",
-            )
-        version = Version(version_string=payload.version_string, project_id=project_id)
+        existing = self.repo.get_by_project_and_string(project_id, payload.version_string)
+        if existing:
+            detail = f"Version '{payload.version_string}' already exists for this project"
+            if existing.deleted_at is not None:
+                detail = f"Version '{payload.version_string}' is still being deleted, try again later"
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail)
+        version = Version(
+            version_string=payload.version_string,
+            channel=payload.channel,
+            project_id=project_id,
+            **parse_version(payload.version_string).columns(),
+        )
         version = self.repo.create(version)
+        event_bus.publish(
+            "version_created",
+            project_id,
+            {"version_id": version.id, "version_string": version.version_string},
+            {"total_versions": 1},
+        )
         logger.info(f"Created version '{version.version_string}' for project_id={project_id}")
         return VersionRead.model_validate(version)
+
+    def set_pinned(self, project_id: int, version_id: int, pinned: bool) -> VersionRead:
+        """Pin or unpin a version; pinned versions are never removed by retention."""
+        version = self.repo.get(version_id)
+        if not version or version.project_id != project_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Version not found")
+        version.pinned = pinned
+        version = self.repo.update(version)
+        logger.info(f"{'Pinned' if pinned else 'Unpinned'} version id={version_id}")
+        return VersionRead.model_validate(version)
+
+    def backfill_sort_keys(self, batch_size: int) -> int:
+        """Compute sort keys for versions created before they existed. Returns rows updated."""
+        versions = self.repo.get_missing_sort_keys(batch_size)
+        for version in versions:
+            for column, value in parse_version(version.version_string).columns().items():
+                setattr(version, column, value)
+        self.repo.db.commit()
+        return len(versions)
+
+    def delete_version(
+        self, project_id: int, version_id: int, current_user: User
+    ) -> DeletionTaskRead:
+        """
+        Hide the version immediately; rows and files are purged in the background.
+        """
+        version = self.repo.get(version_id)
+        if not version or version.project_id != project_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Version not found")
+        return self.deletion.schedule_version(version, requested_by=current_user.id)
@@ -11,6 +11,8 @@ const state = {
     user: null,
     currentPage: "dashboard",
     selectedFile: null,
+    dashboard: null,
+    events: null,
 };
 
 // ═══════════════════════════════════════════════════════════════
@@ -145,6 +147,7 @@ function clearAuth() {
 }
 
 async function logout() {
+    closeDashboardEvents();
     clearAuth();
     document.getElementById("app").classList.add("hidden");
     document.getElementById("login-screen").classList.remove("hidden");
@@ -189,6 +192,7 @@ function togglePassword() {
 // ═══════════════════════════════════════════════════════════════
 function navigate(page) {
     state.currentPage = page;
+    if (page !== "dashboard") closeDashboardEvents();
 
     // Update nav items
     document.querySelectorAll(".nav-item").forEach((item) => {
@@ -235,10 +239,8 @@ function closeSidebarMobile() {
 async function loadDashboard() {
     try {
         const stats = await apiRequest("GET", "/dashboard/stats");
-        document.getElementById("stat-projects").textContent = stats.total_projects;
-        document.getElementById("stat-versions").textContent = stats.total_versions;
-        document.getElementById("stat-files").textContent = stats.total_files;
-        document.getElementById("stat-storage").textContent = formatBytes(stats.total_storage_bytes);
+        state.dashboard = stats;
+        renderStatCards(stats);
 
         document.querySelectorAll(".stat-card").forEach((c) => c.classList.remove("loading"));
 
@@ -249,11 +251,82 @@ async function loadDashboard() {
         // Chart and recent downloads logs
         if (stats.download_trends) renderDownloadsChart(stats.download_trends);
         if (stats.recent_downloads) renderRecentDownloads(stats.recent_downloads);
+
+        if (state.currentPage === "dashboard") openDashboardEvents();
     } catch (err) {
         showToast("Error", err.message, "error");
     }
 }
 
+function renderStatCards(stats) {
+    document.getElementById("stat-projects").textContent = stats.total_projects;
+    document.getElementById("stat-versions").textContent = stats.total_versions;
+    document.getElementById("stat-files").textContent = stats.total_files;
+    document.getElementById("stat-storage").textContent = formatBytes(stats.total_storage_bytes);
+}
+
+// Live updates: the server pushes deltas, so the stats are fetched once per visit.
+const DASHBOARD_EVENTS = [
+    "download", "file_uploaded", "file_deleted", "project_created", "project_deleted",
+    "version_created", "version_deleted", "counters",
+];
+
+function openDashboardEvents() {
+    if (state.events || !state.token) return;
+    const source = new EventSource(`${API_BASE}/dashboard/events?token=${encodeURIComponent(state.token)}`);
+    let reconnecting = false;
+    source.onopen = () => {
+        // Events sent while the stream was down are lost: resync once.
+        if (reconnecting) {
+            reconnecting = false;
+            loadDashboard();
+        }
+    };
+    source.onerror = () => { reconnecting = true; };
+    const apply = (e) => applyDashboardEvent(JSON.parse(e.data));
+    DASHBOARD_EVENTS.forEach((type) => source.addEventListener(type, apply));
+    state.events = source;
+}
+
+function closeDashboardEvents() {
+    if (!state.events) return;
+    state.events.close();
+    state.events = null;
+}
+
+function applyDashboardEvent(event) {
+    const stats = state.dashboard;
+    if (!stats) return;
+    for (const [field, delta] of Object.entries(event.counters || {})) {
+        if (field in stats) stats[field] += delta;
+    }
+    renderStatCards(stats);
+
+    if (event.type === "download") {
+        const d = event.data;
+        stats.recent_downloads = [
+            { ip_address: d.ip_address, filename: d.filename, downloaded_at: d.downloaded_at },
+            ...(stats.recent_downloads || []),
+        ].slice(0, 10);
+        renderRecentDownloads(stats.recent_downloads);
+
+        const trends = (stats.download_trends = stats.download_trends || []);
+        const day = d.downloaded_at.slice(0, 10);
+        const last = trends[trends.length - 1];
+        if (last && last.date === day) last.count += 1;
+        else trends.push({ date: day, count: 1 });
+        updateDownloadsChart(trends);
+    }
+}
+
+function updateDownloadsChart(trends) {
+    const chart = window.downloadsChartInstance;
+    if (!chart) return renderDownloadsChart(trends);
+    chart.data.labels = trends.map(t => t.date);
+    chart.data.datasets[0].data = trends.map(t => t.count);
+    chart.update("none");
+}
+
 function renderDownloadsChart(trends) {
     const ctx = document.getElementById('downloadsChart');
     if (!ctx) return;
@@ -0,0 +1,27 @@
+"""
+Pluggable storage backends. A storage volume's location decides its backend:
+a filesystem path uses `LocalBackend`, `s3://bucket/prefix` uses `S3Backend`.
+"""
+
+from app.storage.base import CHUNK_SIZE, ObjectStat, ObjectWriter, StorageBackend, StorageError
+from app.storage.local import LocalBackend
+
+
+def create_backend(location: str) -> StorageBackend:
+    if location.startswith("s3://"):
+        from app.storage.s3 import S3Backend
+
+        bucket, _, prefix = location[len("s3://"):].partition("/")
+        return S3Backend(bucket, prefix)
+    return LocalBackend(location)
+
+
+__all__ = [
+    "CHUNK_SIZE",
+    "LocalBackend",
+    "ObjectStat",
+    "ObjectWriter",
+    "StorageBackend",
+    "StorageError",
+    "create_backend",
+]
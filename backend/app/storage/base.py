@@ -0,0 +1,107 @@
+"""
+Storage backend interface: where APK bytes live, independent of the database.
+
+Keys are "/"-separated paths relative to the backend root. All methods block
+and are meant to run on a worker thread, never on the event loop.
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, Optional
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+class StorageError(Exception):
+    """Raised when a backend cannot complete an operation."""
+
+
+@dataclass(frozen=True)
+class ObjectStat:
+    size: int
+    modified_at: datetime
+
+
+class ObjectWriter(ABC):
+    """
+    Streaming write of a single object. Nothing is visible under the key until
+    `commit()` succeeds; `abort()` discards whatever was written.
+    """
+
+    @abstractmethod
+    def write(self, chunk: bytes) -> None: ...
+
+    @abstractmethod
+    def commit(self) -> None: ...
+
+    @abstractmethod
+    def abort(self) -> None: ...
+
+
+class StorageBackend(ABC):
+    uri: str
+
+    @abstractmethod
+    def open_writer(self, key: str) -> ObjectWriter:
+        """Start writing `key`, replacing any existing object on commit."""
+
+    @abstractmethod
+    def get(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Stream an object, or the inclusive byte range [start, end] of it."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Delete an object; missing objects are ignored."""
+
+    @abstractmethod
+    def stat(self, key: str) -> Optional[ObjectStat]:
+        """Size and modification time, or None if the object does not exist."""
+
+    @abstractmethod
+    def list_objects(
+        self, prefix: str = "", skip: Optional[Callable[[str], bool]] = None
+    ) -> Iterator[tuple[str, ObjectStat]]:
+        """
+        Every object under `prefix` (recursively), as (key, stat), in no particular
+        order. `skip` drops whole top-level entries below `prefix` by name.
+        """
+
+    def move(self, key: str, new_key: str) -> None:
+        """Rename an object within the backend."""
+        writer = self.open_writer(new_key)
+        try:
+            for chunk in self.get(key):
+                writer.write(chunk)
+            writer.commit()
+        except BaseException:
+            writer.abort()
+            raise
+        self.delete(key)
+
+    def capacity(self) -> Optional[tuple[int, int]]:
+        """(total, free) bytes, or None for backends without a fixed size."""
+        return None
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """Filesystem path of the object, for backends that have one."""
+        return None
+
+    def presigned_url(self, key: str, filename: str, expires_in: int) -> Optional[str]:
+        """Time-limited direct download URL, for backends that support one."""
+        return None
+
+    def put(self, key: str, source: BinaryIO) -> int:
+        """Store the contents of a readable file object. Returns bytes written."""
+        writer = self.open_writer(key)
+        total = 0
+        try:
+            while chunk := source.read(CHUNK_SIZE):
+                writer.write(chunk)
+                total += len(chunk)
+            writer.commit()
+        except BaseException:
+            writer.abort()
+            raise
+        return total
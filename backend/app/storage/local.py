@@ -0,0 +1,135 @@
+"""
+Local filesystem storage backend (the default).
+"""
+
+import os
+import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from app.core.config import get_settings
+from app.storage.base import CHUNK_SIZE, ObjectStat, ObjectWriter, StorageBackend
+from app.utils.file_handler import delete_file, ensure_directory, remove_empty_parents
+from app.utils.logger import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+
+class LocalWriter(ObjectWriter):
+    """Writes a hidden temporary sibling, fsyncs it and renames it into place."""
+
+    def __init__(self, dest: Path):
+        ensure_directory(dest.parent)
+        self.dest = dest
+        self.tmp = dest.with_name(f".{dest.name}.{uuid.uuid4().hex}.part")
+        self.fp = open(self.tmp, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self.fp.write(chunk)
+
+    def commit(self) -> None:
+        self.fp.flush()
+        os.fsync(self.fp.fileno())
+        self.fp.close()
+        os.replace(self.tmp, self.dest)
+
+    def abort(self) -> None:
+        self.fp.close()
+        self.tmp.unlink(missing_ok=True)
+
+
+class LocalBackend(StorageBackend):
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.uri = str(self.root)
+
+    def path(self, key: str) -> Path:
+        # An absolute key (legacy rows) resolves to itself.
+        return self.root / key
+
+    def open_writer(self, key: str) -> ObjectWriter:
+        return LocalWriter(self.path(key))
+
+    def get(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        with open(self.path(key), "rb") as fp:
+            fp.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = fp.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def delete(self, key: str) -> None:
+        path = self.path(key)
+        delete_file(str(path))
+        remove_empty_parents(str(path), str(self.root))
+
+    def stat(self, key: str) -> Optional[ObjectStat]:
+        try:
+            st = self.path(key).stat()
+        except FileNotFoundError:
+            return None
+        return ObjectStat(st.st_size, datetime.fromtimestamp(st.st_mtime, tz=timezone.utc))
+
+    def list_objects(
+        self, prefix: str = "", skip: Optional[Callable[[str], bool]] = None
+    ) -> Iterator[tuple[str, ObjectStat]]:
+        """Walks each top-level entry below `prefix` on its own thread with os.scandir."""
+        base = self.path(prefix) if prefix else self.root
+        try:
+            with os.scandir(base) as it:
+                entries = [e for e in it if not (skip and skip(e.name))]
+        except FileNotFoundError:
+            return
+        files = [e for e in entries if e.is_file(follow_symlinks=False)]
+        dirs = [e.path for e in entries if e.is_dir(follow_symlinks=False)]
+
+        for entry in files:
+            yield self._listing(entry)
+        with ThreadPoolExecutor(max_workers=settings.RECONCILE_SCAN_THREADS) as pool:
+            for listing in pool.map(self._walk, dirs):
+                yield from listing
+
+    def _walk(self, directory: str) -> list[tuple[str, ObjectStat]]:
+        result = []
+        stack = [directory]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            result.append(self._listing(entry))
+            except FileNotFoundError:
+                continue  # removed while walking
+        return result
+
+    def _listing(self, entry: os.DirEntry) -> tuple[str, ObjectStat]:
+        st = entry.stat(follow_symlinks=False)
+        key = Path(entry.path).relative_to(self.root).as_posix()
+        return key, ObjectStat(st.st_size, datetime.fromtimestamp(st.st_mtime, tz=timezone.utc))
+
+    def move(self, key: str, new_key: str) -> None:
+        dest = self.path(new_key)
+        ensure_directory(dest.parent)
+        os.replace(self.path(key), dest)
+        remove_empty_parents(str(self.path(key)), str(self.root))
+
+    def capacity(self) -> Optional[tuple[int, int]]:
+        try:
+            usage = shutil.disk_usage(self.root)
+        except OSError as e:
+            logger.error(f"Storage root {self.root} is unavailable: {e}")
+            return 0, 0
+        return usage.total, usage.free
+
+    def local_path(self, key: str) -> Optional[Path]:
+        return self.path(key)
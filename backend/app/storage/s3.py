@@ -0,0 +1,192 @@
+"""
+S3-compatible storage backend (AWS S3, MinIO, Ceph RGW, ...).
+
+Objects are written with multipart upload, uploading up to
+S3_UPLOAD_CONCURRENCY parts in parallel; downloads are served by redirecting
+clients to presigned GET URLs so APK bytes never pass through the app.
+
+boto3 is only imported when an s3:// volume is configured.
+"""
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterator, Optional
+
+from app.core.config import get_settings
+from app.storage.base import CHUNK_SIZE, ObjectStat, ObjectWriter, StorageBackend, StorageError
+from app.utils.logger import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+APK_MEDIA_TYPE = "application/vnd.android.package-archive"
+NOT_FOUND_CODES = {"404", "NoSuchKey", "NotFound"}
+
+
+class S3Writer(ObjectWriter):
+    """
+    Buffers S3_PART_SIZE bytes per part. Objects smaller than one part are sent
+    with a single PUT; larger ones become a multipart upload whose parts are
+    uploaded in the background, with at most `concurrency` parts in memory.
+    """
+
+    def __init__(self, backend: "S3Backend", key: str):
+        self.backend = backend
+        self.key = key
+        self.buffer = bytearray()
+        self.upload_id: Optional[str] = None
+        self.pending: deque[tuple[int, Future]] = deque()
+        self.parts: list[dict] = []
+
+    def write(self, chunk: bytes) -> None:
+        self.buffer += chunk
+        while len(self.buffer) >= settings.S3_PART_SIZE:
+            part = bytes(self.buffer[: settings.S3_PART_SIZE])
+            del self.buffer[: settings.S3_PART_SIZE]
+            self._submit(part)
+
+    def commit(self) -> None:
+        client, bucket, key = self.backend.client, self.backend.bucket, self.backend.key(self.key)
+        if self.upload_id is None:
+            client.put_object(
+                Bucket=bucket, Key=key, Body=bytes(self.buffer), ContentType=APK_MEDIA_TYPE
+            )
+            return
+        if self.buffer:
+            self._submit(bytes(self.buffer))
+        while self.pending:
+            self._collect()
+        client.complete_multipart_upload(
+            Bucket=bucket,
+            Key=key,
+            UploadId=self.upload_id,
+            MultipartUpload={"Parts": sorted(self.parts, key=lambda p: p["PartNumber"])},
+        )
+
+    def abort(self) -> None:
+        # A part still uploading when the upload is aborted would be stored
+        # afterwards and linger, so cancel what has not started and wait out the rest.
+        running = [future for _, future in self.pending if not future.cancel()]
+        wait(running)
+        self.pending.clear()
+        if self.upload_id is not None:
+            try:
+                self.backend.client.abort_multipart_upload(
+                    Bucket=self.backend.bucket, Key=self.backend.key(self.key), UploadId=self.upload_id
+                )
+            except Exception as e:
+                logger.warning(f"Failed to abort multipart upload of {self.key}: {e}")
+
+    def _submit(self, data: bytes) -> None:
+        if self.upload_id is None:
+            self.upload_id = self.backend.client.create_multipart_upload(
+                Bucket=self.backend.bucket, Key=self.backend.key(self.key), ContentType=APK_MEDIA_TYPE
+            )["UploadId"]
+        while len(self.pending) >= settings.S3_UPLOAD_CONCURRENCY:
+            self._collect()
+        part_number = len(self.parts) + len(self.pending) + 1
+        future = self.backend.executor.submit(
+            self.backend.client.upload_part,
+            Bucket=self.backend.bucket,
+            Key=self.backend.key(self.key),
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=data,
+        )
+        self.pending.append((part_number, future))
+
+    def _collect(self) -> None:
+        part_number, future = self.pending.popleft()
+        self.parts.append({"PartNumber": part_number, "ETag": future.result()["ETag"]})
+
+
+class S3Backend(StorageBackend):
+    def __init__(self, bucket: str, prefix: str = ""):
+        try:
+            import boto3
+            from botocore.config import Config
+        except ImportError as e:
+            raise StorageError("s3:// storage volumes require the boto3 package") from e
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.uri = f"s3://{bucket}/{self.prefix}".rstrip("/")
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL or None,
+            aws_access_key_id=settings.S3_ACCESS_KEY or None,
+            aws_secret_access_key=settings.S3_SECRET_KEY or None,
+            region_name=settings.S3_REGION,
+            # MinIO and most self-hosted stores only do path-style addressing.
+            config=Config(
+                s3={"addressing_style": "path" if settings.S3_ENDPOINT_URL else "auto"},
+                max_pool_connections=settings.S3_UPLOAD_CONCURRENCY * 4,
+            ),
+        )
+        # Shared by all writers so parallelism is bounded per process, not per upload.
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.S3_UPLOAD_CONCURRENCY * 2, thread_name_prefix="s3-upload"
+        )
+
+    def key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def open_writer(self, key: str) -> ObjectWriter:
+        return S3Writer(self, key)
+
+    def get(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        params = {"Bucket": self.bucket, "Key": self.key(key)}
+        if start or end is not None:
+            params["Range"] = f"bytes={start}-{'' if end is None else end}"
+        body = self.client.get_object(**params)["Body"]
+        try:
+            yield from body.iter_chunks(CHUNK_SIZE)
+        finally:
+            body.close()
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.key(key))
+
+    def stat(self, key: str) -> Optional[ObjectStat]:
+        from botocore.exceptions import ClientError
+
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=self.key(key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in NOT_FOUND_CODES:
+                return None
+            raise
+        return ObjectStat(head["ContentLength"], head["LastModified"])
+
+    def list_objects(
+        self, prefix: str = "", skip: Optional[Callable[[str], bool]] = None
+    ) -> Iterator[tuple[str, ObjectStat]]:
+        base = f"{prefix.strip('/')}/" if prefix else ""
+        strip = len(self.key(""))
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.key(base)):
+            for obj in page.get("Contents", []):
+                key = obj["Key"][strip:]
+                if skip and skip(key[len(base):].split("/", 1)[0]):
+                    continue
+                yield key, ObjectStat(obj["Size"], obj["LastModified"])
+
+    def move(self, key: str, new_key: str) -> None:
+        self.client.copy_object(
+            Bucket=self.bucket,
+            Key=self.key(new_key),
+            CopySource={"Bucket": self.bucket, "Key": self.key(key)},
+        )
+        self.delete(key)
+
+    def presigned_url(self, key: str, filename: str, expires_in: int) -> Optional[str]:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": self.key(key),
+                "ResponseContentDisposition": f'attachment; filename="{filename}"',
+                "ResponseContentType": APK_MEDIA_TYPE,
+            },
+            ExpiresIn=expires_in,
+        )
@@ -0,0 +1,208 @@
+"""
+Zip-aware binary delta between two APKs.
+
+An APK is a zip archive, and most entries of an incremental release (resources,
+native libraries, unchanged dex files) are byte-identical compressed streams
+that merely moved. The delta therefore works at entry granularity: each
+entry's compressed data is either copied from the old APK (when an entry with
+the same CRC, size and compression exists there) or inserted literally, and
+everything else (local headers, signing block, central directory) is inserted.
+Applying it reproduces the new APK byte for byte, so the signature stays valid.
+
+Patch format (all integers little-endian):
+
+    magic     8 bytes   b"APKDLT01"
+    old_sha   32 bytes  SHA-256 of the APK the patch applies to
+    new_sha   32 bytes  SHA-256 of the APK it produces
+    new_size  u64
+    ops       repeated until EOF:
+                0x01 COPY    u64 old_offset, u64 length
+                0x02 INSERT  u64 length, then `length` literal bytes
+"""
+
+import hashlib
+import mmap
+import struct
+import zipfile
+from pathlib import Path
+from typing import BinaryIO
+
+MAGIC = b"APKDLT01"
+HEADER = struct.Struct("<8s32s32sQ")
+OP_COPY = 0x01
+OP_INSERT = 0x02
+COPY_OP = struct.Struct("<BQQ")
+INSERT_OP = struct.Struct("<BQ")
+
+LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+DATA_DESCRIPTOR_SIGNATURE = b"PK\x07\x08"
+FLAG_DATA_DESCRIPTOR = 0x08
+CHUNK_SIZE = 1024 * 1024
+
+
+class DeltaError(ValueError):
+    """Raised for unreadable inputs or a patch that does not match its base."""
+
+
+def build_delta(old_path: Path, new_path: Path, out_path: Path) -> int:
+    """
+    Write a patch turning `old_path` into `new_path` and verify it by applying it.
+
+    Returns:
+        Size of the patch in bytes.
+    """
+    with open(old_path, "rb") as old_fp, open(new_path, "rb") as new_fp:
+        old = mmap.mmap(old_fp.fileno(), 0, access=mmap.ACCESS_READ)
+        new = mmap.mmap(new_fp.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            old_entries = _index_entries(old)
+            ops = _diff(old, new, old_entries, _entries(new))
+            header = HEADER.pack(MAGIC, _sha256(old), _sha256(new), len(new))
+            with open(out_path, "wb") as out:
+                out.write(header)
+                for op in ops:
+                    if op[0] == OP_COPY:
+                        out.write(COPY_OP.pack(*op))
+                    else:
+                        _, start, end = op
+                        out.write(INSERT_OP.pack(OP_INSERT, end - start))
+                        out.write(new[start:end])
+            expected = _sha256(new)
+        finally:
+            old.close()
+            new.close()
+
+    verify_path = out_path.with_name(out_path.name + ".verify")
+    try:
+        with open(verify_path, "wb") as verify:
+            apply_delta(old_path, out_path, verify)
+        with open(verify_path, "rb") as verify:
+            if _sha256_file(verify) != expected:
+                raise DeltaError("Patch does not reproduce the target APK")
+    finally:
+        verify_path.unlink(missing_ok=True)
+    return out_path.stat().st_size
+
+
+def apply_delta(old_path: Path, patch_path: Path, out: BinaryIO) -> None:
+    """Reference patcher: reconstruct the new APK from the old one and a patch."""
+    with open(old_path, "rb") as old, open(patch_path, "rb") as patch:
+        magic, old_sha, _, _ = HEADER.unpack(patch.read(HEADER.size))
+        if magic != MAGIC:
+            raise DeltaError("Not an APK delta")
+        if _sha256_file(old) != old_sha:
+            raise DeltaError("Patch was made for a different base APK")
+        while op := patch.read(1):
+            if op[0] == OP_COPY:
+                offset, length = struct.unpack("<QQ", patch.read(16))
+                old.seek(offset)
+                _copy(old, out, length)
+            elif op[0] == OP_INSERT:
+                (length,) = struct.unpack("<Q", patch.read(8))
+                _copy(patch, out, length)
+            else:
+                raise DeltaError(f"Unknown patch op {op[0]:#x}")
+
+
+# ─── Diff ─────────────────────────────────────────────────────────────────────
+
+
+def _entries(data: mmap.mmap) -> list[tuple[int, int, int, tuple]]:
+    """
+    (header_offset, data_start, data_end, key) for every entry, in file order,
+    where key = (crc, compressed size, compression method).
+    """
+    try:
+        with zipfile.ZipFile(data) as zf:
+            infos = sorted(zf.infolist(), key=lambda i: i.header_offset)
+    except (zipfile.BadZipFile, ValueError) as e:  # ValueError: shorter than an end record
+        raise DeltaError(f"Not a valid APK: {e}") from e
+
+    entries = []
+    for info in infos:
+        offset = info.header_offset
+        try:
+            signature, _, flags, _, _, _, _, _, _, name_len, extra_len = LOCAL_HEADER.unpack_from(
+                data, offset
+            )
+        except struct.error as e:
+            raise DeltaError(f"Truncated local header for {info.filename}") from e
+        if signature != LOCAL_HEADER_SIGNATURE:
+            raise DeltaError(f"Bad local header for {info.filename}")
+        start = offset + LOCAL_HEADER.size + name_len + extra_len
+        end = start + info.compress_size
+        if flags & FLAG_DATA_DESCRIPTOR:
+            end += 16 if data[end : end + 4] == DATA_DESCRIPTOR_SIGNATURE else 12
+        entries.append((offset, start, end, (info.CRC, info.compress_size, info.compress_type)))
+    return entries
+
+
+def _index_entries(data: mmap.mmap) -> dict[tuple, list[tuple[int, int]]]:
+    index: dict[tuple, list[tuple[int, int]]] = {}
+    for _, start, end, key in _entries(data):
+        index.setdefault(key, []).append((start, end))
+    return index
+
+
+def _diff(old: mmap.mmap, new: mmap.mmap, old_index: dict, new_entries: list) -> list[tuple]:
+    """Ops as (OP_COPY, old_offset, length) or (OP_INSERT, new_start, new_end), merged."""
+    ops: list[tuple] = []
+
+    def insert(start: int, end: int) -> None:
+        if end <= start:
+            return
+        if ops and ops[-1][0] == OP_INSERT and ops[-1][2] == start:
+            ops[-1] = (OP_INSERT, ops[-1][1], end)
+        else:
+            ops.append((OP_INSERT, start, end))
+
+    def copy(offset: int, length: int) -> None:
+        if ops and ops[-1][0] == OP_COPY and ops[-1][1] + ops[-1][2] == offset:
+            ops[-1] = (OP_COPY, ops[-1][1], ops[-1][2] + length)
+        else:
+            ops.append((OP_COPY, offset, length))
+
+    pos = 0
+    for header_offset, start, end, key in new_entries:
+        insert(pos, start)  # gap before the entry plus its local header
+        match = next(
+            (
+                old_start
+                for old_start, old_end in old_index.get(key, ())
+                if old_end - old_start == end - start and old[old_start:old_end] == new[start:end]
+            ),
+            None,
+        )
+        if match is not None and end > start:
+            copy(match, end - start)
+        else:
+            insert(start, end)
+        pos = end
+    insert(pos, len(new))  # signing block, central directory, end record
+    return ops
+
+
+# ─── Helpers ──────────────────────────────────────────────────────────────────
+
+
+def _copy(src: BinaryIO, dst: BinaryIO, length: int) -> None:
+    while length > 0:
+        chunk = src.read(min(CHUNK_SIZE, length))
+        if not chunk:
+            raise DeltaError("Unexpected end of input")
+        dst.write(chunk)
+        length -= len(chunk)
+
+
+def _sha256(data: mmap.mmap) -> bytes:
+    return hashlib.sha256(data).digest()
+
+
+def _sha256_file(fp: BinaryIO) -> bytes:
+    fp.seek(0)
+    digest = hashlib.sha256()
+    while chunk := fp.read(CHUNK_SIZE):
+        digest.update(chunk)
+    fp.seek(0)
+    return digest.digest()
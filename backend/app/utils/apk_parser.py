@@ -0,0 +1,332 @@
+"""
+APK metadata extraction: manifest fields, native ABIs and signing certificate.
+
+Only the zip central directory, the compiled AndroidManifest.xml entry and the
+APK Signing Block (or the v1 signature file) are read — never the whole APK.
+"""
+
+import hashlib
+import re
+import struct
+import zipfile
+import zlib
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+MANIFEST_ENTRY = "AndroidManifest.xml"
+MAX_ENTRY_SIZE = 4 * 1024 * 1024  # manifests and v1 signature files are a few KB
+MAX_SIGNING_BLOCK_SIZE = 16 * 1024 * 1024
+
+# ─── Binary XML (AXML) chunk types ────────────────────────────────────────────
+RES_XML_TYPE = 0x0003
+RES_STRING_POOL_TYPE = 0x0001
+RES_XML_RESOURCE_MAP_TYPE = 0x0180
+RES_XML_START_ELEMENT_TYPE = 0x0102
+UTF8_FLAG = 0x100
+
+TYPE_REFERENCE = 0x01
+TYPE_STRING = 0x03
+TYPE_INT_DEC = 0x10
+TYPE_INT_HEX = 0x11
+
+# android:* attribute resource ids (stable across SDKs); attribute names may be stripped.
+ATTR_VERSION_CODE = 0x0101021B
+ATTR_VERSION_NAME = 0x0101021C
+ATTR_MIN_SDK = 0x0101020C
+ATTR_TARGET_SDK = 0x01010270
+
+# ─── APK Signing Block ────────────────────────────────────────────────────────
+APK_SIG_BLOCK_MAGIC = b"APK Sig Block 42"
+APK_SIGNATURE_SCHEME_V2_ID = 0x7109871A
+APK_SIGNATURE_SCHEME_V3_ID = 0xF05368C0
+EOCD_SIGNATURE = b"PK\x05\x06"
+EOCD_MIN_SIZE = 22
+MAX_EOCD_SEARCH = EOCD_MIN_SIZE + 0xFFFF
+
+V1_SIGNATURE_RE = re.compile(r"^META-INF/[^/]+\.(RSA|DSA|EC)$", re.IGNORECASE)
+ABI_RE = re.compile(r"^lib/([^/]+)/[^/]+\.so$")
+
+
+class APKParseError(ValueError):
+    """Raised when a file is not a readable APK."""
+
+
+@dataclass
+class APKMetadata:
+    package_name: Optional[str] = None
+    version_code: Optional[int] = None
+    version_name: Optional[str] = None
+    min_sdk: Optional[int] = None
+    target_sdk: Optional[int] = None
+    abis: list[str] = field(default_factory=list)
+    signing_cert_sha256: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def parse_apk_metadata(source: Path | BinaryIO) -> APKMetadata:
+    """
+    Extract indexed metadata from an APK on disk or in a seekable file object.
+
+    Raises:
+        APKParseError if the file is not a zip, has no manifest, or any entry
+        read is damaged, unsupported or oversized.
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as fp:
+            return _parse_apk(fp)
+    source.seek(0)
+    return _parse_apk(source)
+
+
+def _parse_apk(fp: BinaryIO) -> APKMetadata:
+    try:
+        with zipfile.ZipFile(fp) as zf:
+            names = zf.namelist()
+            if MANIFEST_ENTRY not in names:
+                raise APKParseError("AndroidManifest.xml not found")
+            metadata = _parse_manifest(_read_entry(zf, MANIFEST_ENTRY))
+            metadata.abis = sorted({m.group(1) for n in names if (m := ABI_RE.match(n))})
+            metadata.signing_cert_sha256 = _signing_cert_digest(fp, zf, names)
+            return metadata
+    except APKParseError:
+        raise
+    except (zipfile.BadZipFile, zipfile.LargeZipFile) as e:
+        raise APKParseError(f"Not a valid APK: {e}") from e
+    except (
+        # Damaged or unsupported entries: bad deflate data, unknown compression
+        # methods, encrypted or truncated members.
+        zlib.error,
+        NotImplementedError,
+        RuntimeError,
+        EOFError,
+        ValueError,
+        KeyError,
+        OverflowError,
+        struct.error,
+        IndexError,
+        UnicodeDecodeError,
+    ) as e:
+        raise APKParseError(f"Malformed APK: {e}") from e
+
+
+def _read_entry(zf: zipfile.ZipFile, name: str) -> bytes:
+    """Read a small zip entry, refusing one that inflates past MAX_ENTRY_SIZE."""
+    if zf.getinfo(name).file_size > MAX_ENTRY_SIZE:
+        raise APKParseError(f"{name} is larger than {MAX_ENTRY_SIZE} bytes")
+    with zf.open(name) as entry:
+        data = entry.read(MAX_ENTRY_SIZE + 1)
+    if len(data) > MAX_ENTRY_SIZE:
+        raise APKParseError(f"{name} is larger than {MAX_ENTRY_SIZE} bytes")
+    return data
+
+
+# ─── Manifest ─────────────────────────────────────────────────────────────────
+
+
+def _parse_manifest(data: bytes) -> APKMetadata:
+    chunk_type, header_size, _ = struct.unpack_from("<HHI", data, 0)
+    if chunk_type != RES_XML_TYPE:
+        raise APKParseError("AndroidManifest.xml is not compiled binary XML")
+
+    strings: list[str] = []
+    resource_ids: list[int] = []
+    metadata = APKMetadata()
+
+    offset = header_size
+    while offset + 8 <= len(data):
+        chunk_type, header_size, chunk_size = struct.unpack_from("<HHI", data, offset)
+        if chunk_size < 8:
+            break
+        if chunk_type == RES_STRING_POOL_TYPE:
+            strings = _read_string_pool(data, offset, header_size)
+        elif chunk_type == RES_XML_RESOURCE_MAP_TYPE:
+            count = (chunk_size - header_size) // 4
+            resource_ids = list(struct.unpack_from(f"<{count}I", data, offset + header_size))
+        elif chunk_type == RES_XML_START_ELEMENT_TYPE:
+            tag, attrs = _read_start_element(data, offset, header_size, strings, resource_ids)
+            if tag == "manifest":
+                metadata.package_name = _as_str(attrs.get("package"))
+                metadata.version_code = _as_int(attrs.get(ATTR_VERSION_CODE))
+                metadata.version_name = _as_str(attrs.get(ATTR_VERSION_NAME))
+            elif tag == "uses-sdk":
+                metadata.min_sdk = _as_int(attrs.get(ATTR_MIN_SDK))
+                metadata.target_sdk = _as_int(attrs.get(ATTR_TARGET_SDK))
+                if metadata.target_sdk is None:
+                    metadata.target_sdk = metadata.min_sdk
+            elif tag == "application":
+                break  # everything we need precedes <application>
+        offset += chunk_size
+    return metadata
+
+
+def _read_string_pool(data: bytes, start: int, header_size: int) -> list[str]:
+    count, _, flags, strings_start, _ = struct.unpack_from("<IIIII", data, start + 8)
+    offsets = struct.unpack_from(f"<{count}I", data, start + header_size)
+    base = start + strings_start
+    utf8 = bool(flags & UTF8_FLAG)
+    return [_read_utf8(data, base + o) if utf8 else _read_utf16(data, base + o) for o in offsets]
+
+
+def _read_utf8(data: bytes, pos: int) -> str:
+    _, pos = _read_utf8_length(data, pos)  # length in UTF-16 units, unused
+    length, pos = _read_utf8_length(data, pos)
+    return data[pos : pos + length].decode("utf-8", errors="replace")
+
+
+def _read_utf8_length(data: bytes, pos: int) -> tuple[int, int]:
+    length = data[pos]
+    if length & 0x80:
+        return ((length & 0x7F) << 8) | data[pos + 1], pos + 2
+    return length, pos + 1
+
+
+def _read_utf16(data: bytes, pos: int) -> str:
+    (length,) = struct.unpack_from("<H", data, pos)
+    pos += 2
+    if length & 0x8000:
+        (low,) = struct.unpack_from("<H", data, pos)
+        length = ((length & 0x7FFF) << 16) | low
+        pos += 2
+    return data[pos : pos + length * 2].decode("utf-16-le", errors="replace")
+
+
+def _read_start_element(
+    data: bytes, start: int, header_size: int, strings: list[str], resource_ids: list[int]
+) -> tuple[str, dict]:
+    """
+    Returns the tag name and its attributes keyed by android resource id when
+    the attribute has one, otherwise by attribute name.
+    """
+    body = start + header_size
+    _, name_idx, attr_start, attr_size, attr_count = struct.unpack_from("<IIHHH", data, body)
+    tag = strings[name_idx] if name_idx < len(strings) else ""
+
+    attrs: dict = {}
+    pos = body + attr_start
+    for _ in range(attr_count):
+        _, attr_name, raw_value, _, _, data_type, value = struct.unpack_from(
+            "<IIIHBBI", data, pos
+        )
+        pos += attr_size
+        key = resource_ids[attr_name] if attr_name < len(resource_ids) else None
+        if key is None:
+            key = strings[attr_name] if attr_name < len(strings) else attr_name
+        if data_type == TYPE_STRING:
+            attrs[key] = strings[value] if value < len(strings) else None
+        elif data_type in (TYPE_INT_DEC, TYPE_INT_HEX):
+            attrs[key] = value
+        elif data_type == TYPE_REFERENCE:
+            attrs[key] = None  # resolving @string/... would need resources.arsc
+        elif raw_value != 0xFFFFFFFF and raw_value < len(strings):
+            attrs[key] = strings[raw_value]
+    return tag, attrs
+
+
+def _as_str(value) -> Optional[str]:
+    return value if isinstance(value, str) else None
+
+
+def _as_int(value) -> Optional[int]:
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None  # e.g. preview SDK codenames
+
+
+# ─── Signing certificate ──────────────────────────────────────────────────────
+
+
+def _signing_cert_digest(fp: BinaryIO, zf: zipfile.ZipFile, names: list[str]) -> Optional[str]:
+    """SHA-256 of the first signer's DER certificate (v3/v2 block, else v1 PKCS#7)."""
+    cert = _cert_from_signing_block(fp)
+    if cert is None:
+        signature_files = [n for n in names if V1_SIGNATURE_RE.match(n)]
+        if signature_files:
+            cert = _cert_from_pkcs7(_read_entry(zf, signature_files[0]))
+    return hashlib.sha256(cert).hexdigest() if cert else None
+
+
+def _cert_from_signing_block(fp: BinaryIO) -> Optional[bytes]:
+    cd_offset = _central_directory_offset(fp)
+    if cd_offset is None or cd_offset < 32:
+        return None
+    fp.seek(cd_offset - 24)
+    footer = fp.read(24)
+    block_size, magic = struct.unpack("<Q16s", footer)
+    if magic != APK_SIG_BLOCK_MAGIC or block_size > min(cd_offset, MAX_SIGNING_BLOCK_SIZE):
+        return None
+    # Block layout: size(8) | pairs | size(8) | magic(16); pairs are read up to the footer.
+    fp.seek(cd_offset - block_size - 8)
+    block = fp.read(block_size + 8)
+    pairs = block[8:-24]
+
+    values: dict[int, bytes] = {}
+    pos = 0
+    while pos + 12 <= len(pairs):
+        (length,) = struct.unpack_from("<Q", pairs, pos)
+        (pair_id,) = struct.unpack_from("<I", pairs, pos + 8)
+        values[pair_id] = pairs[pos + 12 : pos + 8 + length]
+        pos += 8 + length
+
+    for scheme_id in (APK_SIGNATURE_SCHEME_V3_ID, APK_SIGNATURE_SCHEME_V2_ID):
+        if scheme_id in values:
+            signers = _length_prefixed(values[scheme_id], 0)
+            signer = _length_prefixed(signers, 0)
+            signed_data = _length_prefixed(signer, 0)
+            (digests_len,) = struct.unpack_from("<I", signed_data, 0)
+            certificates = _length_prefixed(signed_data, 4 + digests_len)
+            return _length_prefixed(certificates, 0)
+    return None
+
+
+def _length_prefixed(buf: bytes, pos: int) -> bytes:
+    """Return the uint32-length-prefixed value at `pos`."""
+    (length,) = struct.unpack_from("<I", buf, pos)
+    return buf[pos + 4 : pos + 4 + length]
+
+
+def _central_directory_offset(fp: BinaryIO) -> Optional[int]:
+    fp.seek(0, 2)
+    file_size = fp.tell()
+    tail_size = min(file_size, MAX_EOCD_SEARCH)
+    fp.seek(file_size - tail_size)
+    tail = fp.read(tail_size)
+    eocd = tail.rfind(EOCD_SIGNATURE)
+    if eocd < 0 or eocd + EOCD_MIN_SIZE > len(tail):
+        return None
+    return struct.unpack_from("<I", tail, eocd + 16)[0]
+
+
+def _cert_from_pkcs7(der: bytes) -> Optional[bytes]:
+    """
+    Pull the first certificate out of a PKCS#7 SignedData blob:
+    ContentInfo { oid, [0] SignedData { version, digestAlgs, contentInfo, [0] certificates } }.
+    """
+    _, content, _ = _der_read(der, 0)  # ContentInfo SEQUENCE
+    _, _, pos = _der_read(der, content)  # contentType OID
+    _, explicit, _ = _der_read(der, pos)  # [0] EXPLICIT
+    _, signed_data, end = _der_read(der, explicit)  # SignedData SEQUENCE
+    pos = signed_data
+    for _ in range(3):  # version, digestAlgorithms, contentInfo
+        _, _, pos = _der_read(der, pos)
+    tag, certs, _ = _der_read(der, pos)
+    if tag != 0xA0:
+        return None
+    _, _, cert_end = _der_read(der, certs)
+    return der[certs:cert_end]
+
+
+def _der_read(der: bytes, pos: int) -> tuple[int, int, int]:
+    """Read one DER TLV header. Returns (tag, content_start, content_end)."""
+    tag = der[pos]
+    length = der[pos + 1]
+    pos += 2
+    if length & 0x80:
+        num_bytes = length & 0x7F
+        length = int.from_bytes(der[pos : pos + num_bytes], "big")
+        pos += num_bytes
+    return tag, pos, pos + length
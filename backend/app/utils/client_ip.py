@@ -0,0 +1,51 @@
+"""
+Client address of a request, as seen behind the reverse proxy.
+
+X-Forwarded-For is only believed when the peer is one of TRUSTED_PROXIES.
+Each proxy appends the address it received the request from, so the list is
+read from the right: the client is the right-most address that is not itself
+a trusted proxy. Anything to its left was written by the client and may be
+forged.
+"""
+
+import ipaddress
+from functools import lru_cache
+from typing import Optional, Union
+
+from starlette.datastructures import Headers
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+@lru_cache()
+def _trusted_networks() -> tuple[Network, ...]:
+    return tuple(
+        ipaddress.ip_network(entry.strip(), strict=False)
+        for entry in settings.TRUSTED_PROXIES.split(",")
+        if entry.strip()
+    )
+
+
+def _is_trusted(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _trusted_networks())
+
+
+def get_client_ip(headers: Headers, client: Optional[tuple[str, int]]) -> str:
+    """Right-most untrusted address of X-Forwarded-For from a trusted peer, else the peer address."""
+    peer = client[0] if client else "unknown"
+    forwarded = headers.get("X-Forwarded-For")
+    if not forwarded or not _is_trusted(peer):
+        return peer
+    hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted(hop):
+            return hop
+    return hops[0] if hops else peer  # every hop is a proxy of ours: the request started inside
@@ -2,10 +2,12 @@
 File handling utilities: validation, sanitization, storage path management.
 """
 
+import hashlib
 import os
 import re
 import uuid
 from pathlib import Path
+from typing import Optional
 
 from fastapi import HTTPException, UploadFile, status
 
@@ -40,16 +42,32 @@ def sanitize_filename(filename: str) -> str:
     return f"{safe_name}{ext}"
 
 
-def build_storage_path(project_name: str, version_string: str, filename: str) -> Path:
+def build_storage_path(
+    project_id: int,
+    project_name: str,
+    version_id: int,
+    version_string: str,
+    filename: str,
+    discriminator: Optional[str] = None,
+) -> Path:
     """
-    Construct the storage path for an APK file.
-
-    Path structure: STORAGE_PATH / project_name / version_string / filename
+    Construct the storage path for an APK file, relative to its volume root.
+
+    Path structure: ab / cd / {project_id}-{project_name} /
+    {version_id}-{version_string} / filename, where "abcd" is a hash prefix of
+    the rest, so no directory grows past a few hundred entries however large a
+    project gets. The ids keep names that sanitize alike ("My App", "My_App")
+    apart. A `discriminator` is inserted before the extension
+    (app.<discriminator>.apk) so that each write gets a key of its own.
     """
-    safe_project = re.sub(r"[^\w\-]", "_", project_name)
-    safe_version = re.sub(r"[^\w\-.]", "_", version_string)
+    safe_project = f"{project_id}-" + re.sub(r"[^\w\-]", "_", project_name)
+    safe_version = f"{version_id}-" + re.sub(r"[^\w\-.]", "_", version_string)
     safe_filename = sanitize_filename(filename)
-    return Path(settings.STORAGE_PATH) / safe_project / safe_version / safe_filename
+    if discriminator:
+        path = Path(safe_filename)
+        safe_filename = f"{path.stem}.{discriminator}{path.suffix}"
+    digest = hashlib.sha1(f"{safe_project}/{safe_version}/{safe_filename}".encode()).hexdigest()
+    return Path(digest[:2]) / digest[2:4] / safe_project / safe_version / safe_filename
 
 
 def ensure_directory(path: Path) -> None:
@@ -71,3 +89,20 @@ def delete_file(file_path: str) -> None:
             logger.info(f"Deleted file: {file_path}")
     except OSError as e:
         logger.error(f"Failed to delete file {file_path}: {e}")
+
+
+def remove_empty_parents(file_path: str, root: str) -> None:
+    """
+    Remove the now-empty directories above a deleted file, stopping at `root`.
+
+    Only empty directories are removed, so sibling projects whose names sanitize
+    to the same directory are never touched.
+    """
+    root = Path(root).resolve()
+    parent = Path(file_path).parent.resolve()
+    while parent != root and root in parent.parents:
+        try:
+            parent.rmdir()
+        except OSError:
+            break
+        parent = parent.parent
@@ -0,0 +1,92 @@
+"""
+Version-string parsing into a normalized, index-friendly sort key.
+
+A version is ordered by (major, minor, patch, prerelease) where `prerelease`
+is an encoded string whose plain byte order (COLLATE "C") matches semantic
+version precedence:
+
+    1.2.3-alpha < 1.2.3-alpha.1 < 1.2.3-beta < 1.2.3 < 1.2.3.4-rc < 1.2.3.4
+
+Strings that are not version-like sort below 0.0.0 releases, by their text.
+So do versions with a number too large for the key: a major, minor or patch
+above the BIGINT columns' range, or another numeric part over NUMBER_WIDTH
+digits (e.g. a 20-digit build timestamp).
+"""
+
+import re
+from typing import NamedTuple
+
+VERSION_RE = re.compile(
+    r"^[vV]?(\d+)(?:\.(\d+))?(?:\.(\d+))?"  # major[.minor[.patch]]
+    r"((?:\.\d+)*)"  # extra numeric components, e.g. 1.2.3.4
+    r"(?:-([0-9A-Za-z.\-]+))?"  # pre-release
+    r"(?:\+[0-9A-Za-z.\-]+)?$"  # build metadata (ignored for precedence)
+)
+
+NUMBER_WIDTH = 20  # fits any BIGINT
+MAX_COMPONENT = 2**63 - 1  # semver_major / _minor / _patch are BIGINT
+
+# Separators are chosen so that byte order matches precedence:
+#   ' ' (0x20) ends the extra components and sorts before any of them,
+#   '|' (0x7c) prefixes each extra component,
+#   '-' (0x2d) marks a pre-release, which sorts before '~' (0x7e) = release,
+#   ',' (0x2c) separates pre-release identifiers, below every identifier char.
+END_OF_EXTRAS = " "
+EXTRA_PREFIX = "|"
+PRERELEASE_MARK = "-"
+RELEASE_MARK = "~"
+IDENT_SEPARATOR = ","
+
+
+class VersionKey(NamedTuple):
+    major: int
+    minor: int
+    patch: int
+    prerelease: str
+
+    def columns(self) -> dict:
+        """Column values for the Version model."""
+        return {
+            "semver_major": self.major,
+            "semver_minor": self.minor,
+            "semver_patch": self.patch,
+            "semver_prerelease": self.prerelease,
+        }
+
+
+def parse_version(version_string: str) -> VersionKey:
+    """Parse a version string leniently into its sort key."""
+    match = VERSION_RE.match(version_string.strip())
+    if not match:
+        return _unparsed(version_string)
+
+    major, minor, patch, extras, prerelease = match.groups()
+    core = (int(major), int(minor or 0), int(patch or 0))
+    numbers = [n for n in extras.split(".") if n]
+    numbers += [i for i in (prerelease or "").split(".") if i.isdigit()]
+    if max(core) > MAX_COMPONENT or any(len(n.lstrip("0")) > NUMBER_WIDTH for n in numbers):
+        return _unparsed(version_string)
+
+    key = "".join(EXTRA_PREFIX + _pad(n) for n in extras.split(".") if n) + END_OF_EXTRAS
+    if prerelease:
+        key += PRERELEASE_MARK + IDENT_SEPARATOR.join(
+            _encode_ident(i) for i in prerelease.split(".")
+        )
+    else:
+        key += RELEASE_MARK
+    return VersionKey(*core, key)
+
+
+def _unparsed(version_string: str) -> VersionKey:
+    return VersionKey(0, 0, 0, END_OF_EXTRAS + PRERELEASE_MARK + _encode_ident(version_string))
+
+
+def _pad(number: str) -> str:
+    return number.lstrip("0").rjust(NUMBER_WIDTH, "0")
+
+
+def _encode_ident(identifier: str) -> str:
+    """Numeric identifiers sort numerically and before alphanumeric ones."""
+    if identifier.isdigit():
+        return "0" + _pad(identifier)
+    return "1" + identifier
@@ -0,0 +1,74 @@
+"""
+Mergeable streaming sketches for download analytics.
+"""
+
+import hashlib
+import heapq
+import math
+from typing import Iterable, Optional
+
+_INVERSE_POWERS = [2.0 ** -r for r in range(65)]
+
+
+class HyperLogLog:
+    """
+    Cardinality estimate in 2**precision one-byte registers (standard error
+    about 1.04 / sqrt(2**precision)). Two sketches of the same precision merge
+    by taking the register-wise maximum, so per-worker and per-day sketches can
+    be combined in any order without counting a value twice.
+    """
+
+    def __init__(self, precision: int, registers: Optional[bytes] = None):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"Unsupported HyperLogLog precision {precision}")
+        self.precision = precision
+        size = 1 << precision
+        if registers is not None and len(registers) != size:
+            raise ValueError(f"Expected {size} registers, got {len(registers)}")
+        self.registers = bytearray(registers) if registers is not None else bytearray(size)
+
+    @classmethod
+    def from_bytes(cls, data: Optional[bytes], precision: int) -> "HyperLogLog":
+        """Load a stored sketch; None (nothing stored yet) is an empty one."""
+        return cls(precision, data or None)
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+    def add(self, value: str) -> None:
+        x = int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+        width = 64 - self.precision
+        index = x >> width
+        rank = width - (x & ((1 << width) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(_INVERSE_POWERS[r] for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # linear counting for small cardinalities
+        return round(estimate)
+
+
+def top_counts(counts: dict[int, int], capacity: int) -> dict[int, int]:
+    """The `capacity` largest entries of `counts`, ties broken by the smaller key."""
+    if len(counts) <= capacity:
+        return dict(counts)
+    return dict(heapq.nsmallest(capacity, counts.items(), key=lambda item: (-item[1], item[0])))
+
+
+def merge_counts(summaries: Iterable[dict[int, int]]) -> dict[int, int]:
+    """Sum bounded top-K summaries; a key missing from one summary counts 0 there."""
+    merged: dict[int, int] = {}
+    for summary in summaries:
+        for key, count in summary.items():
+            merged[key] = merged.get(key, 0) + count
+    return merged
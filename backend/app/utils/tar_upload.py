@@ -0,0 +1,101 @@
+"""
+Tar archives as batch uploads: spool the request body, then read each member
+through its own handle so members can be stored concurrently.
+"""
+
+import io
+import os
+import tarfile
+import tempfile
+from pathlib import PurePosixPath
+from typing import AsyncIterator, NamedTuple
+
+
+class TarTooLarge(Exception):
+    pass
+
+
+class TarMember(NamedTuple):
+    filename: str
+    offset: int  # start of the member's data in the archive
+    size: int
+
+
+async def spool_stream(chunks: AsyncIterator[bytes], max_bytes: int) -> str:
+    """
+    Write a request body to a temporary file and return its path; the caller deletes it.
+
+    Raises:
+        TarTooLarge if the body exceeds `max_bytes`.
+    """
+    fd, path = tempfile.mkstemp(prefix="batch-", suffix=".tar")
+    total = 0
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            async for chunk in chunks:
+                total += len(chunk)
+                if total > max_bytes:
+                    raise TarTooLarge()
+                fp.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+def list_members(path: str) -> list[TarMember]:
+    """
+    Regular files in the archive, by base name.
+
+    Raises:
+        tarfile.TarError for a corrupt or compressed archive.
+    """
+    with tarfile.open(path, "r:") as tar:
+        return [
+            TarMember(PurePosixPath(m.name).name, m.offset_data, m.size)
+            for m in tar
+            if m.isfile()
+        ]
+
+
+class FileSection(io.RawIOBase):
+    """Read-only, seekable view of `size` bytes of a file starting at `offset`."""
+
+    def __init__(self, path: str, offset: int, size: int):
+        self._fp = open(path, "rb")
+        self._offset = offset
+        self._size = size
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        remaining = self._size - self._pos
+        if remaining <= 0:
+            return 0
+        view = memoryview(buffer)[: min(len(buffer), remaining)]
+        self._fp.seek(self._offset + self._pos)
+        n = self._fp.readinto(view)
+        self._pos += n
+        return n
+
+    def seek(self, pos: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            pos += self._pos
+        elif whence == io.SEEK_END:
+            pos += self._size
+        if pos < 0:
+            raise ValueError("negative seek position")
+        self._pos = pos
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self) -> None:
+        self._fp.close()
+        super().close()
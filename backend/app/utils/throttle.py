@@ -0,0 +1,29 @@
+"""
+Thread-safe bandwidth throttle for background I/O.
+"""
+
+import threading
+import time
+
+
+class Throttle:
+    """
+    Caps the combined rate of all threads sharing it at `rate` units per second.
+    Each caller reserves its units up front and sleeps until its slot arrives,
+    so bursts are bounded to one chunk per thread. A rate of 0 disables it.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, amount: int) -> None:
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(self._next, now)
+            self._next = start + amount / self.rate
+        if start > now:
+            time.sleep(start - now)
@@ -0,0 +1,102 @@
+"""
+Job handler registry: maps job types to the functions that execute them.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class JobContext:
+    """Everything a handler receives for one attempt of a job."""
+
+    job_id: int
+    job_type: str
+    payload: dict[str, Any]
+    attempt: int
+    max_attempts: int
+    db: Session
+
+    @property
+    def is_last_attempt(self) -> bool:
+        return self.attempt >= self.max_attempts
+
+
+class RescheduleJob(Exception):
+    """Raised by a handler to run again later without counting a failed attempt."""
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__(f"rescheduled in {delay}s")
+        self.delay = delay
+
+
+@dataclass(frozen=True)
+class JobHandler:
+    name: str
+    func: Callable[[JobContext], None]
+    concurrency: Optional[int]
+    max_attempts: int
+    every: Optional[float]  # seconds; periodic jobs are enqueued automatically
+    on_startup: bool  # enqueued once whenever a worker process starts
+
+    @property
+    def limit(self) -> int:
+        """Maximum concurrently running jobs of this type in one process."""
+        override = settings.JOB_CONCURRENCY_OVERRIDES.get(self.name)
+        if override is not None:
+            return override
+        return self.concurrency or settings.JOB_DEFAULT_CONCURRENCY
+
+
+_handlers: dict[str, JobHandler] = {}
+_loaded = False
+
+
+def job_handler(
+    name: str,
+    *,
+    concurrency: Optional[int] = None,
+    max_attempts: Optional[int] = None,
+    every: Optional[float] = None,
+    on_startup: bool = False,
+):
+    """Register the decorated function as the handler for `name` jobs."""
+
+    def decorator(func: Callable[[JobContext], None]) -> Callable[[JobContext], None]:
+        _handlers[name] = JobHandler(
+            name=name,
+            func=func,
+            concurrency=concurrency,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            every=every,
+            on_startup=on_startup,
+        )
+        return func
+
+    return decorator
+
+
+def _load_handlers() -> None:
+    global _loaded
+    if not _loaded:
+        import app.workers.tasks  # noqa: F401  (registers handlers on import)
+
+        _loaded = True
+
+
+def get_handler(name: str) -> JobHandler:
+    _load_handlers()
+    if name not in _handlers:
+        raise KeyError(f"Unknown job type '{name}'")
+    return _handlers[name]
+
+
+def all_handlers() -> list[JobHandler]:
+    _load_handlers()
+    return list(_handlers.values())
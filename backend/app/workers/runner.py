@@ -0,0 +1,257 @@
+"""
+In-process job runner: claims jobs from the Postgres queue and executes them
+on a dedicated thread pool, honouring per-type concurrency limits.
+
+Every uvicorn worker process runs one JobRunner. Claims use
+SELECT ... FOR UPDATE SKIP LOCKED, so any number of processes and nodes can
+share the same queue; a crashed process's jobs are requeued once their
+heartbeat goes stale.
+"""
+
+import asyncio
+import os
+import random
+import socket
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.repositories.job import JobRepository
+from app.utils.logger import get_logger
+from app.workers.registry import JobContext, JobHandler, RescheduleJob, all_handlers, get_handler
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class ClaimedJob:
+    id: int
+    job_type: str
+    payload: dict[str, Any]
+    attempts: int
+    max_attempts: int
+
+
+def _backoff(attempt: int) -> float:
+    delay = min(settings.JOB_BACKOFF_MAX, settings.JOB_BACKOFF_BASE * 2 ** (attempt - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+class JobRunner:
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._running: dict[str, int] = defaultdict(int)
+        self._running_ids: set[int] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._main: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    # ─── Lifecycle ────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        handlers = all_handlers()
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        # One thread per job slot, plus one for claims and maintenance.
+        self._executor = ThreadPoolExecutor(
+            max_workers=sum(h.limit for h in handlers) + 1, thread_name_prefix="job"
+        )
+        self._main = asyncio.create_task(self._run(handlers))
+        logger.info(f"Job runner {self.worker_id} started ({len(handlers)} job types).")
+
+    async def stop(self) -> None:
+        if self._main is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await self._main
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._executor.shutdown(wait=True)
+        self._main = None
+        logger.info(f"Job runner {self.worker_id} stopped.")
+
+    def wake(self) -> None:
+        """Poll the queue now instead of at the next interval. Thread-safe."""
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def running_counts(self) -> dict[str, int]:
+        return dict(self._running)
+
+    # ─── Main loop ────────────────────────────────────────────────────────
+
+    async def _run(self, handlers: list[JobHandler]) -> None:
+        try:
+            await self._call(self._enqueue_startup_jobs, handlers)
+        except Exception as e:
+            logger.error(f"Failed to enqueue startup jobs: {e}")
+        last_maintenance = 0.0
+        while not self._stopping:
+            try:
+                if time.monotonic() - last_maintenance >= settings.JOB_HEARTBEAT_INTERVAL:
+                    last_maintenance = time.monotonic()
+                    await self._call(self._maintenance, handlers, list(self._running_ids))
+                claimed = await self._claim_available(handlers)
+            except Exception as e:
+                logger.error(f"Job runner error: {e}")
+                claimed = False
+            if not claimed and not self._stopping:
+                self._wakeup.clear()
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.JOB_POLL_INTERVAL)
+
+    async def _claim_available(self, handlers: list[JobHandler]) -> bool:
+        claimed_any = False
+        while not self._stopping:
+            job_types = [h.name for h in handlers if self._running[h.name] < h.limit]
+            if not job_types:
+                break
+            job = await self._call(self._claim, job_types)
+            if job is None:
+                break
+            claimed_any = True
+            self._running[job.job_type] += 1
+            self._running_ids.add(job.id)
+            task = asyncio.create_task(self._execute(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return claimed_any
+
+    async def _execute(self, job: ClaimedJob) -> None:
+        try:
+            await self._call(self._run_job, job)
+        finally:
+            self._running[job.job_type] -= 1
+            self._running_ids.discard(job.id)
+            self._wakeup.set()
+
+    def _call(self, func, *args):
+        return self._loop.run_in_executor(self._executor, func, *args)
+
+    # ─── Blocking work (runs on the executor) ────────────────────────────
+
+    def _claim(self, job_types: list[str]) -> Optional[ClaimedJob]:
+        db = SessionLocal()
+        try:
+            job = JobRepository(db).claim(job_types, self.worker_id)
+            if job is None:
+                return None
+            return ClaimedJob(
+                id=job.id,
+                job_type=job.job_type,
+                payload=dict(job.payload or {}),
+                attempts=job.attempts,
+                max_attempts=job.max_attempts,
+            )
+        finally:
+            db.close()
+
+    def _run_job(self, job: ClaimedJob) -> None:
+        handler = get_handler(job.job_type)
+        db = SessionLocal()
+        repo = JobRepository(db)
+        started = time.monotonic()
+        try:
+            ctx = JobContext(
+                job_id=job.id,
+                job_type=job.job_type,
+                payload=job.payload,
+                attempt=job.attempts,
+                max_attempts=job.max_attempts,
+                db=db,
+            )
+            try:
+                handler.func(ctx)
+            except RescheduleJob as r:
+                db.rollback()
+                run_at = datetime.now(timezone.utc) + timedelta(seconds=r.delay)
+                if not repo.mark_retry(job.id, self.worker_id, run_at, None, count_attempt=False):
+                    self._log_lost(job)
+                return
+            except Exception as e:
+                db.rollback()
+                error = f"{type(e).__name__}: {e}"
+                if ctx.is_last_attempt:
+                    if not repo.mark_failed(job.id, self.worker_id, error):
+                        self._log_lost(job)
+                        return
+                    logger.error(f"Job id={job.id} ({job.job_type}) failed permanently: {error}")
+                else:
+                    delay = _backoff(job.attempts)
+                    run_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+                    if not repo.mark_retry(job.id, self.worker_id, run_at, error):
+                        self._log_lost(job)
+                        return
+                    logger.warning(
+                        f"Job id={job.id} ({job.job_type}) attempt {job.attempts} failed, "
+                        f"retrying in {delay:.0f}s: {error}"
+                    )
+                return
+            if not repo.mark_succeeded(job.id, self.worker_id):
+                self._log_lost(job)
+                return
+            logger.info(
+                f"Job id={job.id} ({job.job_type}) succeeded in {time.monotonic() - started:.2f}s"
+            )
+        finally:
+            db.close()
+
+    @staticmethod
+    def _log_lost(job: ClaimedJob) -> None:
+        logger.warning(
+            f"Job id={job.id} ({job.job_type}) was requeued while running here; "
+            f"leaving its outcome to the current holder"
+        )
+
+    def _enqueue_startup_jobs(self, handlers: list[JobHandler]) -> None:
+        db = SessionLocal()
+        try:
+            repo = JobRepository(db)
+            for handler in handlers:
+                if handler.on_startup:
+                    repo.enqueue(
+                        handler.name,
+                        {},
+                        max_attempts=handler.max_attempts,
+                        unique_key=f"startup:{handler.name}",
+                    )
+            db.commit()
+        finally:
+            db.close()
+
+    def _maintenance(self, handlers: list[JobHandler], running_ids: list[int]) -> None:
+        db = SessionLocal()
+        try:
+            repo = JobRepository(db)
+            repo.heartbeat(running_ids)
+            requeued = repo.requeue_stale(settings.JOB_LOCK_TIMEOUT)
+            if requeued:
+                logger.warning(f"Requeued {requeued} stale job(s)")
+            for handler in handlers:
+                if handler.every:
+                    repo.enqueue_if_idle(
+                        handler.name, {}, max_attempts=handler.max_attempts, interval=handler.every
+                    )
+            db.commit()
+        finally:
+            db.close()
+
+
+job_runner = JobRunner()
+
+
+def wake_job_runner() -> None:
+    """Nudge this process's runner after enqueueing work."""
+    job_runner.wake()
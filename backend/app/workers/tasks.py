@@ -0,0 +1,108 @@
+"""
+Background job handlers. Importing this module registers them with the runner.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import get_settings
+from app.repositories.idempotency import IdempotencyRepository
+from app.repositories.project import ProjectRepository
+from app.repositories.rate_limit import RateLimitRepository
+from app.services.deletion import DeletionService
+from app.services.integrity import IntegrityService
+from app.services.jobs import JobService
+from app.services.reconcile import ReconcileService
+from app.services.retention import RetentionService
+from app.services.version import VersionService
+from app.workers.registry import JobContext, RescheduleJob, job_handler
+
+settings = get_settings()
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+@job_handler("purge_deletion", concurrency=1)
+def purge_deletion(ctx: JobContext) -> None:
+    """Purge a deleted project/version a few batches at a time."""
+    service = DeletionService(ctx.db)
+    task_id = ctx.payload["task_id"]
+    try:
+        for _ in range(settings.DELETION_BATCHES_PER_JOB):
+            if service.process_batch(task_id):
+                return
+    except Exception as e:
+        service.record_failure(task_id, str(e), final=ctx.is_last_attempt)
+        raise
+    # Yield the slot so one huge project can't monopolise the worker.
+    raise RescheduleJob()
+
+
+@job_handler("prune_jobs", concurrency=1, every=3600)
+def prune_jobs(ctx: JobContext) -> None:
+    """Drop finished jobs past their retention period."""
+    JobService(ctx.db).prune_finished()
+
+
+@job_handler("prune_rate_limits", concurrency=1, every=3600)
+def prune_rate_limits(ctx: JobContext) -> None:
+    """Drop shared rate-limit buckets idle for an hour; they have long since refilled."""
+    if settings.RATE_LIMIT_BACKEND == "postgres":
+        RateLimitRepository(ctx.db).prune(datetime.now(timezone.utc) - timedelta(hours=1))
+
+
+@job_handler("prune_idempotency_keys", concurrency=1, every=3600)
+def prune_idempotency_keys(ctx: JobContext) -> None:
+    """Drop idempotency keys past their TTL."""
+    IdempotencyRepository(ctx.db).prune(datetime.now(timezone.utc))
+
+
+@job_handler("backfill_version_keys", concurrency=1, on_startup=True)
+def backfill_version_keys(ctx: JobContext) -> None:
+    """Compute semver sort keys for versions created before the columns existed."""
+    if VersionService(ctx.db).backfill_sort_keys(BACKFILL_BATCH_SIZE) == BACKFILL_BATCH_SIZE:
+        raise RescheduleJob()
+
+
+@job_handler("reconcile_storage", concurrency=1, every=settings.RECONCILE_INTERVAL or None)
+def reconcile_storage(ctx: JobContext) -> None:
+    """Reconcile storage against apk_files a few fan-out directories at a time."""
+    service = ReconcileService(ctx.db)
+    run_id = ctx.payload.get("run_id")
+    if run_id is None:
+        # Periodic trigger: start a report-only run, which is processed by its own job.
+        service.start_scheduled()
+        return
+    try:
+        for _ in range(settings.RECONCILE_UNITS_PER_JOB):
+            if service.process_unit(run_id):
+                return
+    except Exception as e:
+        service.record_failure(run_id, str(e), final=ctx.is_last_attempt)
+        raise
+    raise RescheduleJob()
+
+
+@job_handler("recount_storage_usage", concurrency=1, every=settings.QUOTA_RECOUNT_INTERVAL or None)
+def recount_storage_usage(ctx: JobContext) -> None:
+    """Recompute per-project usage counters from file rows, correcting any drift."""
+    ProjectRepository(ctx.db).recount_usage()
+
+
+@job_handler("apply_retention", concurrency=1, every=settings.RETENTION_INTERVAL or None)
+def apply_retention(ctx: JobContext) -> None:
+    """Schedule deletion of versions expired by their project's retention rules."""
+    if RetentionService(ctx.db).sweep(settings.RETENTION_MAX_VERSIONS_PER_RUN) is None:
+        raise RescheduleJob()
+
+
+@job_handler("backfill_checksums", concurrency=1, on_startup=True)
+def backfill_checksums(ctx: JobContext) -> None:
+    """Compute SHA-256 for files uploaded before checksums were recorded."""
+    if IntegrityService(ctx.db).backfill_checksums(BACKFILL_BATCH_SIZE) == BACKFILL_BATCH_SIZE:
+        raise RescheduleJob()
+
+
+@job_handler("scrub_storage", concurrency=1, every=settings.SCRUB_INTERVAL or None)
+def scrub_storage(ctx: JobContext) -> None:
+    """Re-hash the least recently verified files and flag any that changed."""
+    IntegrityService(ctx.db).scrub_pass()
@@ -0,0 +1,83 @@
+"""
+Rebalance script: move stored APKs between storage volumes while the app runs.
+Run inside the container:
+
+    python rebalance.py status
+    python rebalance.py drain --from disk1 [--to disk2] [--limit 100] [--dry-run]
+    python rebalance.py drain --from legacy    # adopt files stored before volumes existed
+    python rebalance.py balance [--tolerance 0.05] [--dry-run]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.core.database import SessionLocal
+from app.services.rebalance import RebalanceService
+
+LEGACY = "legacy"
+
+
+def print_status(service: RebalanceService) -> None:
+    for u in service.usage():
+        if u.total_bytes is None:
+            space = "unbounded"
+        else:
+            space = (
+                f"free={u.free_bytes / 1024**3:8.1f} GB / {u.total_bytes / 1024**3:8.1f} GB "
+                f"({u.used_fraction:.0%} used)"
+            )
+        print(f"  {u.id:<12} {u.location:<30} weight={u.weight:<4g} {space}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="show volume usage")
+
+    drain = sub.add_parser("drain", help="move files off one volume")
+    drain.add_argument("--from", dest="source", required=True, help=f"volume id, or '{LEGACY}'")
+    drain.add_argument("--to", dest="target", help="volume id (default: roomiest other volume)")
+    drain.add_argument("--limit", type=int, help="stop after this many files")
+    drain.add_argument("--dry-run", action="store_true")
+
+    balance = sub.add_parser("balance", help="even out used space across volumes")
+    balance.add_argument("--tolerance", type=float, default=0.05)
+    balance.add_argument("--dry-run", action="store_true")
+
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        service = RebalanceService(db)
+        if args.command == "status":
+            print_status(service)
+            return
+
+        if args.command == "drain":
+            known = set(service.storage.volumes)
+            if args.target == LEGACY:
+                parser.error("files can only be moved onto a configured volume")
+            for volume_id in (args.source, args.target):
+                if volume_id and volume_id != LEGACY and volume_id not in known:
+                    parser.error(f"unknown volume '{volume_id}' (configured: {', '.join(known)})")
+            source = None if args.source == LEGACY else args.source
+            moved, moved_bytes = service.drain(source, args.target, args.limit, args.dry_run)
+        else:
+            moved, moved_bytes = service.balance(args.tolerance, args.dry_run)
+
+        verb = "Would move" if args.dry_run else "Moved"
+        print(f"✅ {verb} {moved} files ({moved_bytes / 1024**2:.1f} MB)")
+        print_status(service)
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Rebalance failed: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+ProjectAccessCache: an invalidation during a load must not be undone by it.
+"""
+
+from app.services import access
+from app.services.access import ProjectAccessCache
+
+
+class FakeUserRepository:
+    rows: dict[int, frozenset[int]] = {}
+    during_load = None  # called mid-query, as a concurrent revoke would land
+
+    def __init__(self, db):
+        pass
+
+    def get_project_ids(self, user_id: int) -> frozenset[int]:
+        result = self.rows[user_id]  # the snapshot this query reads
+        if FakeUserRepository.during_load:
+            hook, FakeUserRepository.during_load = FakeUserRepository.during_load, None
+            hook()
+        return result
+
+
+def test_invalidation_during_load_is_not_overwritten(monkeypatch):
+    monkeypatch.setattr(access, "UserRepository", FakeUserRepository)
+    cache = ProjectAccessCache()
+    FakeUserRepository.rows = {7: frozenset({1, 2})}
+
+    def revoke():
+        FakeUserRepository.rows = {7: frozenset({1})}
+        cache._drop_user(7)
+
+    FakeUserRepository.during_load = revoke
+    assert cache.allowed_projects(None, 7) == frozenset({1, 2})  # the racing read itself
+    assert cache.allowed_projects(None, 7) == frozenset({1})  # but it was not cached
+
+
+def test_flush_during_load_is_not_overwritten(monkeypatch):
+    monkeypatch.setattr(access, "UserRepository", FakeUserRepository)
+    cache = ProjectAccessCache()
+    FakeUserRepository.rows = {7: frozenset({1, 2})}
+
+    def revoke():
+        FakeUserRepository.rows = {7: frozenset()}
+        cache._drop_all()
+
+    FakeUserRepository.during_load = revoke
+    cache.allowed_projects(None, 7)
+    assert cache.allowed_projects(None, 7) == frozenset()
+
+
+def test_loads_are_cached(monkeypatch):
+    monkeypatch.setattr(access, "UserRepository", FakeUserRepository)
+    cache = ProjectAccessCache()
+    FakeUserRepository.rows = {7: frozenset({3})}
+    assert cache.allowed_projects(None, 7) == frozenset({3})
+    FakeUserRepository.rows = {7: frozenset({4})}
+    assert cache.allowed_projects(None, 7) == frozenset({3})
+    cache._drop_user(7)
+    assert cache.allowed_projects(None, 7) == frozenset({4})
@@ -0,0 +1,71 @@
+"""
+UploadAdmission: querying the volumes must not stall the event loop.
+"""
+
+import asyncio
+import time
+
+from app.core import admission
+from app.core.admission import UploadAdmission
+from app.services.storage import StorageService, StorageVolume
+from app.storage import LocalBackend
+
+
+class SlowVolumes(StorageService):
+    """One volume whose disk_usage takes `delay` seconds, like a hung mount."""
+
+    delay = 0.3
+
+    def __init__(self):
+        self.volumes = {"main": StorageVolume(id="main", backend=LocalBackend("/"), weight=1.0)}
+
+    def capacities(self):
+        time.sleep(self.delay)
+        return {"main": (10**12, 10**12)}
+
+
+def test_slow_volume_query_does_not_block_the_loop(monkeypatch):
+    monkeypatch.setattr(admission, "StorageService", SlowVolumes)
+
+    async def main():
+        gate = UploadAdmission()
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        ticket = await gate.admit("1", 1000, 10_000)
+        task.cancel()
+        await gate.release(ticket)
+        return ticket, ticks, gate
+
+    ticket, ticks, gate = asyncio.run(main())
+    assert ticket.volume_id == "main"
+    assert ticks >= 10  # the loop kept running while the volumes were queried
+    assert (gate.count, gate.bytes, gate.volume_bytes, gate.user_count) == (0, 0, {}, {})
+
+
+def test_slot_is_released_when_no_volume_has_room(monkeypatch):
+    class Full(SlowVolumes):
+        delay = 0
+
+        def capacities(self):
+            return {"main": (10**6, 0)}
+
+    monkeypatch.setattr(admission, "StorageService", Full)
+
+    async def main():
+        gate = UploadAdmission()
+        try:
+            await gate.admit("1", 1000, 10_000)
+        except admission.AdmissionRejected as e:
+            return gate, e
+        return gate, None
+
+    gate, error = asyncio.run(main())
+    assert error is not None and error.status_code == 507
+    assert (gate.count, gate.bytes, gate.user_count, gate.user_bytes) == (0, 0, {}, {})
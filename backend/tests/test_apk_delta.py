@@ -0,0 +1,100 @@
+"""
+Round trips through app.utils.apk_delta on small synthetic zips.
+"""
+
+import hashlib
+import io
+import random
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from app.utils.apk_delta import DeltaError, apply_delta, build_delta
+
+
+def _payload(seed: int, size: int) -> bytes:
+    return random.Random(seed).randbytes(size)  # incompressible, so copies dominate the patch
+
+
+def _write_zip(path: Path, entries: dict[str, bytes], streamed: bool = False) -> Path:
+    """With `streamed`, entries get data descriptors as from a non-seekable writer."""
+    buffer = io.BytesIO()
+    target = _Unseekable(buffer) if streamed else buffer
+    with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in entries.items():
+            zf.writestr(name, data)
+    path.write_bytes(buffer.getvalue())
+    return path
+
+
+class _Unseekable(io.RawIOBase):
+    def __init__(self, inner: io.BytesIO):
+        self.inner = inner
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        return self.inner.write(b)
+
+    def flush(self) -> None:
+        pass
+
+
+def _sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _round_trip(tmp_path: Path, old: Path, new: Path) -> int:
+    patch = tmp_path / "out.patch"
+    size = build_delta(old, new, patch)
+    rebuilt = tmp_path / "rebuilt.apk"
+    with open(rebuilt, "wb") as out:
+        apply_delta(old, patch, out)
+    assert _sha256(rebuilt) == _sha256(new)
+    return size
+
+
+@pytest.mark.parametrize("streamed", [False, True])
+def test_round_trip_reproduces_target(tmp_path, streamed):
+    shared = {f"lib/arm64-v8a/lib{i}.so": _payload(i, 64 * 1024) for i in range(4)}
+    old = _write_zip(
+        tmp_path / "old.apk",
+        {"AndroidManifest.xml": b"manifest v1", **shared, "classes.dex": _payload(100, 8 * 1024)},
+        streamed,
+    )
+    new = _write_zip(
+        tmp_path / "new.apk",
+        # Reordered, one entry changed, one added.
+        {"classes.dex": _payload(101, 8 * 1024), **dict(reversed(shared.items())),
+         "AndroidManifest.xml": b"manifest v2", "assets/new.bin": _payload(102, 4 * 1024)},
+        streamed,
+    )
+
+    size = _round_trip(tmp_path, old, new)
+    assert size < new.stat().st_size // 2  # the shared libraries are copied, not inserted
+
+
+def test_round_trip_with_nothing_in_common(tmp_path):
+    old = _write_zip(tmp_path / "old.apk", {"a.bin": _payload(1, 2048)})
+    new = _write_zip(tmp_path / "new.apk", {"b.bin": _payload(2, 2048), "c.txt": b""})
+    _round_trip(tmp_path, old, new)
+
+
+def test_patch_rejects_a_different_base(tmp_path):
+    old = _write_zip(tmp_path / "old.apk", {"a.bin": _payload(1, 2048)})
+    new = _write_zip(tmp_path / "new.apk", {"a.bin": _payload(1, 2048), "b.bin": b"b"})
+    other = _write_zip(tmp_path / "other.apk", {"a.bin": _payload(3, 2048)})
+    patch = tmp_path / "out.patch"
+    build_delta(old, new, patch)
+    with pytest.raises(DeltaError):
+        apply_delta(other, patch, io.BytesIO())
+
+
+def test_build_rejects_non_zip_input(tmp_path):
+    old = tmp_path / "old.apk"
+    old.write_bytes(b"not a zip at all")
+    new = _write_zip(tmp_path / "new.apk", {"a.bin": b"a"})
+    with pytest.raises(DeltaError):
+        build_delta(old, new, tmp_path / "out.patch")
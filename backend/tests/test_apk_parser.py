@@ -0,0 +1,173 @@
+"""
+app.utils.apk_parser against minimal APKs built in memory: a compiled
+AndroidManifest.xml, native libraries and an APK Signing Block.
+"""
+
+import hashlib
+import io
+import struct
+import zipfile
+
+import pytest
+
+from app.utils.apk_parser import (
+    APK_SIG_BLOCK_MAGIC,
+    APK_SIGNATURE_SCHEME_V2_ID,
+    ATTR_MIN_SDK,
+    ATTR_TARGET_SDK,
+    ATTR_VERSION_CODE,
+    ATTR_VERSION_NAME,
+    APKParseError,
+    parse_apk_metadata,
+)
+
+CERT = b"0\x82\x01\x00" + bytes(range(256))  # opaque to the parser: only its digest matters
+
+# The first four strings are android attributes, mapped to resource ids.
+STRINGS = [
+    "versionCode", "versionName", "minSdkVersion", "targetSdkVersion",
+    "package", "manifest", "uses-sdk", "com.example.app", "1.2.3", "application",
+]
+RESOURCE_IDS = [ATTR_VERSION_CODE, ATTR_VERSION_NAME, ATTR_MIN_SDK, ATTR_TARGET_SDK]
+TYPE_STRING, TYPE_INT_DEC = 0x03, 0x10
+
+
+# ─── Builders ─────────────────────────────────────────────────────────────────
+
+
+def _chunk(chunk_type: int, header: bytes, body: bytes) -> bytes:
+    header_size = 8 + len(header)
+    return struct.pack("<HHI", chunk_type, header_size, header_size + len(body)) + header + body
+
+
+def _string_pool(strings: list[str]) -> bytes:
+    data, offsets = b"", []
+    for s in strings:
+        encoded = s.encode()
+        offsets.append(len(data))
+        data += bytes([len(s), len(encoded)]) + encoded + b"\0"
+    data += b"\0" * (-len(data) % 4)
+    index = struct.pack(f"<{len(offsets)}I", *offsets)
+    header = struct.pack("<IIIII", len(strings), 0, 0x100, 28 + len(index), 0)
+    return _chunk(0x0001, header, index + data)
+
+
+def _start_element(name: str, attrs: list[tuple[str, int, int]]) -> bytes:
+    """`attrs` as (attribute name, data type, data) triples."""
+    body = struct.pack("<IIHHHHHH", 0xFFFFFFFF, STRINGS.index(name), 20, 20, len(attrs), 0, 0, 0)
+    for attr, data_type, value in attrs:
+        raw = value if data_type == TYPE_STRING else 0xFFFFFFFF
+        body += struct.pack("<IIIHBBI", 0xFFFFFFFF, STRINGS.index(attr), raw, 8, 0, data_type, value)
+    return _chunk(0x0102, struct.pack("<II", 1, 0xFFFFFFFF), body)
+
+
+def _manifest() -> bytes:
+    chunks = (
+        _string_pool(STRINGS)
+        + _chunk(0x0180, b"", struct.pack(f"<{len(RESOURCE_IDS)}I", *RESOURCE_IDS))
+        + _start_element(
+            "manifest",
+            [
+                ("versionCode", TYPE_INT_DEC, 42),
+                ("versionName", TYPE_STRING, STRINGS.index("1.2.3")),
+                ("package", TYPE_STRING, STRINGS.index("com.example.app")),
+            ],
+        )
+        + _start_element(
+            "uses-sdk", [("minSdkVersion", TYPE_INT_DEC, 24), ("targetSdkVersion", TYPE_INT_DEC, 34)]
+        )
+        + _start_element("application", [])
+    )
+    return _chunk(0x0003, b"", chunks)
+
+
+def _lp(value: bytes) -> bytes:
+    return struct.pack("<I", len(value)) + value
+
+
+def _signing_block(cert: bytes) -> bytes:
+    signed_data = _lp(b"") + _lp(_lp(cert))  # digests, certificates
+    signer = _lp(signed_data) + _lp(b"") + _lp(b"")  # signed data, signatures, public key
+    value = _lp(_lp(signer))
+    pairs = struct.pack("<QI", 4 + len(value), APK_SIGNATURE_SCHEME_V2_ID) + value
+    size = len(pairs) + 8 + 16
+    return struct.pack("<Q", size) + pairs + struct.pack("<Q", size) + APK_SIG_BLOCK_MAGIC
+
+
+def _apk(manifest: bytes, signing_block: bytes = b"", extra: dict[str, bytes] | None = None) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("AndroidManifest.xml", manifest)
+        zf.writestr("classes.dex", b"dex\n035\0")
+        for name, data in (extra or {}).items():
+            zf.writestr(name, data)
+    data = buffer.getvalue()
+    if not signing_block:
+        return data
+    # The block sits right before the central directory, whose offset moves past it.
+    eocd = data.rfind(b"PK\x05\x06")
+    (cd_offset,) = struct.unpack_from("<I", data, eocd + 16)
+    data = data[:cd_offset] + signing_block + data[cd_offset:]
+    eocd += len(signing_block)
+    return data[: eocd + 16] + struct.pack("<I", cd_offset + len(signing_block)) + data[eocd + 20 :]
+
+
+LIBS = {
+    "lib/arm64-v8a/libapp.so": b"\x7fELF",
+    "lib/armeabi-v7a/libapp.so": b"\x7fELF",
+    "lib/arm64-v8a/nested/ignored.txt": b"",
+    "assets/lib/x86/libfake.so": b"",
+}
+
+
+# ─── Tests ────────────────────────────────────────────────────────────────────
+
+
+def test_manifest_fields_and_abis():
+    metadata = parse_apk_metadata(io.BytesIO(_apk(_manifest(), extra=LIBS)))
+    assert metadata.package_name == "com.example.app"
+    assert metadata.version_code == 42
+    assert metadata.version_name == "1.2.3"
+    assert (metadata.min_sdk, metadata.target_sdk) == (24, 34)
+    assert metadata.abis == ["arm64-v8a", "armeabi-v7a"]
+    assert metadata.signing_cert_sha256 is None
+
+
+def test_v2_signing_block_certificate_digest():
+    apk = _apk(_manifest(), _signing_block(CERT))
+    metadata = parse_apk_metadata(io.BytesIO(apk))
+    assert metadata.signing_cert_sha256 == hashlib.sha256(CERT).hexdigest()
+    assert metadata.package_name == "com.example.app"
+
+
+def test_reads_from_path(tmp_path):
+    path = tmp_path / "app.apk"
+    path.write_bytes(_apk(_manifest(), _signing_block(CERT)))
+    assert parse_apk_metadata(path).signing_cert_sha256 == hashlib.sha256(CERT).hexdigest()
+
+
+@pytest.mark.parametrize("keep", [0.5, 0.9])
+def test_truncated_file(keep):
+    apk = _apk(_manifest(), _signing_block(CERT), LIBS)
+    with pytest.raises(APKParseError):
+        parse_apk_metadata(io.BytesIO(apk[: int(len(apk) * keep)]))
+
+
+def test_corrupt_axml():
+    manifest = bytearray(_manifest())
+    struct.pack_into("<I", manifest, 16, 100_000)  # string count far past the chunk
+    with pytest.raises(APKParseError):
+        parse_apk_metadata(io.BytesIO(_apk(bytes(manifest))))
+
+
+def test_plain_text_manifest():
+    with pytest.raises(APKParseError):
+        parse_apk_metadata(io.BytesIO(_apk(b'<manifest package="x"/>')))
+
+
+def test_missing_manifest():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        zf.writestr("classes.dex", b"")
+    with pytest.raises(APKParseError):
+        parse_apk_metadata(io.BytesIO(buffer.getvalue()))
@@ -0,0 +1,35 @@
+"""
+X-Forwarded-For handling in app.utils.client_ip with the default
+TRUSTED_PROXIES (loopback only).
+"""
+
+from starlette.datastructures import Headers
+
+from app.utils.client_ip import get_client_ip
+
+
+def ip(forwarded: str | None, peer: str) -> str:
+    headers = Headers({"X-Forwarded-For": forwarded} if forwarded is not None else {})
+    return get_client_ip(headers, (peer, 12345))
+
+
+def test_header_from_untrusted_peer_is_ignored():
+    assert ip("1.2.3.4", "203.0.113.7") == "203.0.113.7"
+
+
+def test_right_most_untrusted_hop_is_the_client():
+    assert ip("1.2.3.4, 198.51.100.2", "127.0.0.1") == "198.51.100.2"
+    assert ip("198.51.100.2, 127.0.0.1", "::1") == "198.51.100.2"
+
+
+def test_forged_left_entries_do_not_win():
+    assert ip("10.9.9.9, 198.51.100.2", "127.0.0.1") == "198.51.100.2"
+
+
+def test_only_trusted_hops_falls_back_to_first():
+    assert ip("127.0.0.1", "127.0.0.1") == "127.0.0.1"
+
+
+def test_no_header_or_peer():
+    assert ip(None, "198.51.100.2") == "198.51.100.2"
+    assert get_client_ip(Headers({}), None) == "unknown"
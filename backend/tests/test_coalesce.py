@@ -0,0 +1,123 @@
+"""
+SingleFlight and coalesce() from app.core.coalesce: concurrent callers share one run.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core import coalesce as coalesce_module
+from app.core.coalesce import SingleFlight, coalesce
+
+
+def _slow(calls: list, result, delay: float = 0.2):
+    def fn():
+        calls.append(threading.get_ident())
+        time.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return fn
+
+
+def test_concurrent_calls_share_one_run():
+    async def main():
+        flight, calls = SingleFlight(), []
+        fn = _slow(calls, "listing")
+        return calls, await asyncio.gather(*(flight.do("key", fn, 5) for _ in range(50)))
+
+    calls, results = asyncio.run(main())
+    assert len(calls) == 1
+    assert [r for r, _ in results] == ["listing"] * 50
+    assert sum(leader for _, leader in results) == 1
+
+
+def test_followers_get_the_leaders_exception():
+    async def main():
+        flight = SingleFlight()
+        fn = _slow([], LookupError("gone"))
+        return await asyncio.gather(*(flight.do("key", fn, 5) for _ in range(5)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, LookupError) for r in results)
+
+
+def test_cancelled_leader_does_not_fail_followers():
+    async def main():
+        flight, calls = SingleFlight(), []
+        fn = _slow(calls, "listing")
+        leader = asyncio.ensure_future(flight.do("key", fn, 5))
+        await asyncio.sleep(0.05)
+        follower = asyncio.ensure_future(flight.do("key", fn, 5))
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return calls, await follower
+
+    calls, (result, was_leader) = asyncio.run(main())
+    assert (len(calls), result, was_leader) == (1, "listing", False)
+
+
+def test_follower_computes_alone_after_wait():
+    async def main():
+        flight, calls = SingleFlight(), []
+        slow = asyncio.ensure_future(flight.do("key", _slow(calls, "slow", delay=0.5), 5))
+        await asyncio.sleep(0.05)
+        fast = await flight.do("key", _slow(calls, "fast", delay=0), 0.05)
+        return fast, await slow
+
+    fast, slow = asyncio.run(main())
+    assert fast == ("fast", True)
+    assert slow == ("slow", True)
+
+
+def test_finished_calls_are_forgotten():
+    async def main():
+        flight, calls = SingleFlight(), []
+        fn = _slow(calls, "listing", delay=0)
+        await flight.do("key", fn, 5)
+        await flight.do("key", fn, 5)
+        return calls, flight._calls
+
+    calls, pending = asyncio.run(main())
+    assert len(calls) == 2
+    assert pending == {}
+
+
+class FakeSession:
+    def __init__(self, opened: list):
+        self.closed = False
+        opened.append(self)
+
+    def close(self):
+        self.closed = True
+
+
+def test_shared_call_keeps_its_own_session_past_a_cancelled_leader(monkeypatch):
+    opened, seen = [], []
+    monkeypatch.setattr(coalesce_module, "SessionLocal", lambda: FakeSession(opened))
+    monkeypatch.setattr(coalesce_module, "single_flight", SingleFlight())
+
+    def listing(db):
+        time.sleep(0.2)
+        seen.append((db, db.closed))
+        return "listing"
+
+    async def main():
+        leader = asyncio.ensure_future(coalesce("list_versions", (1,), listing))
+        await asyncio.sleep(0.05)
+        follower = asyncio.ensure_future(coalesce("list_versions", (1,), listing))
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert [db.closed for db in opened] == [False]  # still in use after the leader went away
+        return await follower
+
+    assert asyncio.run(main()) == "listing"
+    assert seen == [(opened[0], False)]
+    assert opened[0].closed
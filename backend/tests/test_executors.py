@@ -0,0 +1,64 @@
+"""
+Workload isolation: metadata calls stay fast while the download and upload
+pools are saturated with blocking work.
+"""
+
+import asyncio
+import statistics
+import threading
+import time
+
+from app.core.config import get_settings
+from app.core.executors import Workload, run_in
+
+settings = get_settings()
+
+API_CALLS = 200
+MAX_API_LATENCY = 0.05  # seconds; an unsaturated pool answers in well under a millisecond
+
+
+def _metadata_read() -> int:
+    return sum(range(1000))
+
+
+async def _api_latencies() -> list[float]:
+    latencies = []
+    for _ in range(API_CALLS):
+        started = time.perf_counter()
+        await run_in(Workload.API, _metadata_read)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def test_api_latency_steady_while_download_and_upload_pools_are_saturated():
+    release = threading.Event()
+
+    async def main():
+        baseline = await _api_latencies()
+        # Twice each pool's size: every thread blocked and as much work again queued.
+        blocked = [
+            asyncio.create_task(run_in(workload, release.wait, 10))
+            for workload, threads in (
+                (Workload.DOWNLOAD, settings.EXECUTOR_DOWNLOAD_THREADS),
+                (Workload.UPLOAD, settings.EXECUTOR_UPLOAD_THREADS),
+            )
+            for _ in range(threads * 2)
+        ]
+        await asyncio.sleep(0.1)
+        try:
+            # The saturated pools really are stuck ...
+            for workload in (Workload.DOWNLOAD, Workload.UPLOAD):
+                probe = asyncio.create_task(run_in(workload, _metadata_read))
+                done, _ = await asyncio.wait({probe}, timeout=0.2)
+                assert not done, f"{workload.value} pool was not saturated"
+                blocked.append(probe)
+            # ... while metadata calls go through as before.
+            loaded = await _api_latencies()
+        finally:
+            release.set()
+            await asyncio.gather(*blocked)
+        return baseline, loaded
+
+    baseline, loaded = asyncio.run(main())
+    assert max(loaded) < MAX_API_LATENCY, f"slowest API call took {max(loaded) * 1000:.1f} ms"
+    assert statistics.median(loaded) < statistics.median(baseline) * 5 + 0.005
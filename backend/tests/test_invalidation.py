@@ -0,0 +1,210 @@
+"""
+Cross-worker invalidation: two InvalidationBus instances, each on the real
+PgPubSub listener thread, talking through an in-memory stand-in for Postgres
+LISTEN/NOTIFY.
+"""
+
+import socket
+import statistics
+import threading
+import time
+from collections import deque
+
+import pytest
+
+from app.core.config import get_settings
+from app.core.invalidation import InvalidationBus
+from app.core.pubsub import PgPubSub
+
+settings = get_settings()
+
+TARGET_LATENCY = 0.1  # seconds from publish in one worker to apply in another
+
+
+class FakePostgres:
+    """Delivers pg_notify to every listening connection, as the server does."""
+
+    def __init__(self):
+        self.connections: list["FakeConnection"] = []
+        self.lock = threading.Lock()
+        self.next_pid = 100
+        self.current: dict[PgPubSub, "FakeConnection"] = {}
+
+    def connect(self) -> "FakeConnection":
+        with self.lock:
+            self.next_pid += 1
+            connection = FakeConnection(self, self.next_pid)
+            self.connections.append(connection)
+        return connection
+
+    def notify(self, sender_pid: int, channel: str, payload: str) -> None:
+        with self.lock:
+            targets = [c for c in self.connections if channel in c.listening]
+        for connection in targets:
+            connection.deliver(sender_pid, channel, payload)
+
+    def drop(self, connection: "FakeConnection") -> None:
+        with self.lock:
+            if connection in self.connections:
+                self.connections.remove(connection)
+        connection.lost = True
+        connection.deliver(0, "", "")  # wake the listener so it notices
+
+
+class FakeConnection:
+    """Both the pooled connection and its pg8000 DBAPI connection."""
+
+    def __init__(self, server: FakePostgres, pid: int):
+        self.server = server
+        self.pid = pid
+        self.notifications: deque = deque()
+        self.listening: set[str] = set()
+        self.lost = False
+        self._usock, self._peer = socket.socketpair()
+        self._usock.setblocking(False)
+        self.dbapi_connection = self
+
+    def deliver(self, pid: int, channel: str, payload: str) -> None:
+        if channel:
+            self.notifications.append((pid, channel, payload))
+        try:
+            self._peer.send(b"\0")
+        except OSError:
+            pass
+
+    def cursor(self) -> "FakeCursor":
+        return FakeCursor(self)
+
+    def close(self) -> None:
+        self.server.drop(self)
+
+
+class FakeCursor:
+    def __init__(self, connection: FakeConnection):
+        self.connection = connection
+
+    def execute(self, sql: str, params=None) -> None:
+        if self.connection.lost:
+            raise ConnectionError("server closed the connection")
+        if sql.startswith("SELECT pg_notify"):
+            self.connection.server.notify(self.connection.pid, *params)
+        elif sql == "SELECT 1":
+            try:
+                while self.connection._usock.recv(4096):
+                    pass
+            except BlockingIOError:
+                pass
+
+
+def _worker(server: FakePostgres) -> tuple[PgPubSub, InvalidationBus]:
+    pubsub = PgPubSub()
+    bus = InvalidationBus(pubsub)
+
+    def connect():
+        connection = server.connect()
+        connection.listening.update(pubsub._handlers)
+        server.current[pubsub] = connection
+        return connection, connection.pid
+
+    pubsub._connect = connect
+    return pubsub, bus
+
+
+@pytest.fixture
+def workers(monkeypatch):
+    monkeypatch.setattr(settings, "PUBSUB_RECONNECT_DELAY", 0.05)
+    server = FakePostgres()
+    pairs = [_worker(server) for _ in range(2)]
+    for pubsub, _ in pairs:
+        pubsub.start()
+    yield server, pairs
+    for pubsub, _ in pairs:
+        pubsub.stop()
+
+
+class Cache:
+    """A process-local cache that records when each key was dropped."""
+
+    def __init__(self):
+        self.entries: dict = {}
+        self.applied: dict = {}
+        self.flushes = 0
+        self.changed = threading.Condition()
+
+    def apply(self, key) -> None:
+        with self.changed:
+            self.entries.pop(key, None)
+            self.applied[key] = time.monotonic()
+            self.changed.notify_all()
+
+    def flush(self) -> None:
+        with self.changed:
+            self.entries.clear()
+            self.flushes += 1
+            self.changed.notify_all()
+
+    def wait_for(self, predicate, timeout: float = 2.0) -> bool:
+        with self.changed:
+            return self.changed.wait_for(predicate, timeout)
+
+
+def _wait_connected(server: FakePostgres, count: int) -> None:
+    deadline = time.monotonic() + 2
+    while len(server.connections) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(server.connections) == count
+
+
+def test_invalidations_apply_in_other_workers_within_target(workers):
+    server, [(_, publisher), (_, receiver)] = workers
+    local, remote = Cache(), Cache()
+    publisher.register("listing", local.apply, local.flush)
+    receiver.register("listing", remote.apply, remote.flush)
+    _wait_connected(server, 2)
+
+    latencies = []
+    for i in range(50):
+        remote.entries[i] = "stale"
+        sent = time.monotonic()
+        publisher.publish("listing", i)
+        assert remote.wait_for(lambda: i in remote.applied), f"invalidation {i} never arrived"
+        latencies.append(remote.applied[i] - sent)
+
+    assert remote.entries == {}
+    assert local.applied == {}  # the publisher updates its own cache itself, not from the bus
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    assert p99 < TARGET_LATENCY, f"p99 {p99 * 1000:.1f} ms, median {statistics.median(latencies) * 1000:.1f} ms"
+
+
+def test_burst_is_batched_and_deduplicated(workers):
+    server, [(_, publisher), (_, receiver)] = workers
+    remote = Cache()
+    receiver.register("listing", remote.apply, remote.flush)
+    _wait_connected(server, 2)
+
+    for i in range(500):
+        publisher.publish("listing", i % 50)
+    assert remote.wait_for(lambda: len(remote.applied) == 50)
+
+
+def test_reconnect_flushes_what_was_missed(workers):
+    server, [(_, publisher), (receiver_pubsub, receiver)] = workers
+    remote = Cache()
+    receiver.register("listing", remote.apply, remote.flush)
+    _wait_connected(server, 2)
+    flushes_before = remote.flushes
+
+    # The receiver's connection drops; what is published meanwhile never reaches it.
+    server.drop(server.current[receiver_pubsub])
+    remote.entries["k"] = "stale"
+    publisher.publish("listing", "k")
+    time.sleep(0.01)
+
+    # On reconnecting, every cache is flushed, which covers the lost invalidation.
+    assert remote.wait_for(lambda: remote.flushes > flushes_before and not remote.entries)
+    assert "k" not in remote.applied
+    _wait_connected(server, 2)
+
+    publisher.publish("listing", "after")
+    assert remote.wait_for(lambda: "after" in remote.applied)
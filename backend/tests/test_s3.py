@@ -0,0 +1,177 @@
+"""
+S3Writer / S3Backend against an in-memory stand-in for the boto3 client,
+so no boto3 or object store is needed.
+"""
+
+import hashlib
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.config import get_settings
+from app.storage.s3 import APK_MEDIA_TYPE, S3Backend
+
+settings = get_settings()
+
+
+class FakeBody:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.closed = False
+
+    def iter_chunks(self, size: int):
+        for i in range(0, len(self.data), size):
+            yield self.data[i : i + size]
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class FakeS3:
+    """The client calls S3Backend makes, with the semantics of a real store."""
+
+    def __init__(self, part_delay: float = 0.0):
+        self.objects: dict[tuple[str, str], bytes] = {}
+        self.uploads: dict[str, dict[int, bytes]] = {}
+        self.calls: list[str] = []
+        self.part_delay = part_delay
+        self.lock = threading.Lock()
+        self.last_get: dict = {}
+
+    def _log(self, name: str) -> None:
+        with self.lock:
+            self.calls.append(name)
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self._log("put_object")
+        self.objects[(Bucket, Key)] = Body
+
+    def create_multipart_upload(self, Bucket, Key, ContentType):
+        self._log("create_multipart_upload")
+        upload_id = f"upload-{len(self.uploads)}"
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        time.sleep(random.uniform(0, self.part_delay))  # parts finish out of order
+        with self.lock:
+            if UploadId in self.uploads:  # a part landing after an abort would be stored
+                self.uploads[UploadId][PartNumber] = Body
+            self.calls.append(f"upload_part:{PartNumber}")
+        return {"ETag": hashlib.md5(Body).hexdigest()}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self._log("complete_multipart_upload")
+        parts = MultipartUpload["Parts"]
+        stored = self.uploads.pop(UploadId)
+        assert [p["PartNumber"] for p in parts] == list(range(1, len(stored) + 1))
+        for part in parts:
+            assert part["ETag"] == hashlib.md5(stored[part["PartNumber"]]).hexdigest()
+        self.objects[(Bucket, Key)] = b"".join(stored[p["PartNumber"]] for p in parts)
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self._log("abort_multipart_upload")
+        with self.lock:
+            self.leftover_parts = self.uploads.pop(UploadId)
+
+    def get_object(self, Bucket, Key, Range=None):
+        self.last_get = {"Key": Key, "Range": Range}
+        data = self.objects[(Bucket, Key)]
+        if Range:
+            start, _, end = Range.removeprefix("bytes=").partition("-")
+            data = data[int(start) : int(end) + 1 if end else None]
+        return {"Body": FakeBody(data)}
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        self.presigned = (operation, Params, ExpiresIn)
+        return f"https://s3.example/{Params['Bucket']}/{Params['Key']}?expires={ExpiresIn}"
+
+
+def _backend(client: FakeS3, prefix: str = "apks") -> S3Backend:
+    # Built by hand: the constructor creates a real boto3 client.
+    backend = S3Backend.__new__(S3Backend)
+    backend.bucket, backend.prefix, backend.client = "bucket", prefix, client
+    backend.uri = f"s3://bucket/{prefix}"
+    backend.executor = ThreadPoolExecutor(max_workers=8)
+    return backend
+
+
+@pytest.fixture(autouse=True)
+def small_parts(monkeypatch):
+    monkeypatch.setattr(settings, "S3_PART_SIZE", 10)
+    monkeypatch.setattr(settings, "S3_UPLOAD_CONCURRENCY", 3)
+
+
+def _write(backend: S3Backend, key: str, data: bytes, chunk: int = 7) -> None:
+    writer = backend.open_writer(key)
+    for i in range(0, len(data), chunk):
+        writer.write(data[i : i + chunk])
+    writer.commit()
+
+
+def test_small_object_is_one_put():
+    client = FakeS3()
+    _write(_backend(client), "a/app.apk", b"tiny")
+    assert client.calls == ["put_object"]
+    assert client.objects[("bucket", "apks/a/app.apk")] == b"tiny"
+
+
+def test_multipart_parts_are_numbered_and_ordered():
+    client = FakeS3(part_delay=0.02)
+    data = bytes(random.Random(1).randbytes(95))  # 9 full parts and a short last one
+    _write(_backend(client), "a/app.apk", data)
+
+    assert client.objects[("bucket", "apks/a/app.apk")] == data
+    parts = sorted(int(c.split(":")[1]) for c in client.calls if c.startswith("upload_part"))
+    assert parts == list(range(1, 11))
+    assert client.calls[0] == "create_multipart_upload"
+    assert client.calls[-1] == "complete_multipart_upload"
+
+
+def test_exact_multiple_of_part_size_has_no_empty_part():
+    client = FakeS3()
+    _write(_backend(client), "k", b"x" * 30, chunk=10)
+    assert sum(c.startswith("upload_part") for c in client.calls) == 3
+    assert client.objects[("bucket", "apks/k")] == b"x" * 30
+
+
+def test_abort_waits_for_parts_in_flight():
+    client = FakeS3(part_delay=0.2)
+    writer = _backend(client).open_writer("k")
+    writer.write(b"y" * 30)  # three parts, all in flight
+    writer.abort()
+
+    assert client.calls[-1] == "abort_multipart_upload"
+    assert not writer.pending
+    # Every part had finished (or never started) before the abort, so none is left behind
+    # to land afterwards.
+    time.sleep(0.3)
+    assert sum(c.startswith("upload_part") for c in client.calls) == len(client.leftover_parts)
+
+
+def test_ranged_get():
+    client = FakeS3()
+    backend = _backend(client)
+    _write(backend, "k", b"0123456789abcdef")
+
+    assert b"".join(backend.get("k")) == b"0123456789abcdef"
+    assert client.last_get["Range"] is None
+    assert b"".join(backend.get("k", 4, 7)) == b"4567"
+    assert client.last_get == {"Key": "apks/k", "Range": "bytes=4-7"}
+    assert b"".join(backend.get("k", 10)) == b"abcdef"
+    assert client.last_get["Range"] == "bytes=10-"
+
+
+def test_presigned_url():
+    client = FakeS3()
+    url = _backend(client, prefix="").presigned_url("a/b/app.apk", "app.apk", 300)
+
+    operation, params, expires = client.presigned
+    assert (operation, expires) == ("get_object", 300)
+    assert params["Key"] == "a/b/app.apk"
+    assert params["ResponseContentDisposition"] == 'attachment; filename="app.apk"'
+    assert params["ResponseContentType"] == APK_MEDIA_TYPE
+    assert url.startswith("https://s3.example/bucket/a/b/app.apk")
@@ -0,0 +1,98 @@
+"""
+Sort keys from app.utils.semver must order like semantic version precedence.
+The keys are compared as tuples, which matches the ORDER BY on the columns:
+plain string comparison of ASCII equals COLLATE "C".
+"""
+
+import random
+
+import pytest
+
+from app.utils.semver import parse_version
+
+
+def ordered(*versions: str) -> None:
+    keys = [parse_version(v) for v in versions]
+    for (a, ka), (b, kb) in zip(zip(versions, keys), zip(versions[1:], keys[1:])):
+        assert ka < kb, f"{a} should sort before {b}"
+    shuffled = list(versions)
+    random.Random(0).shuffle(shuffled)
+    assert sorted(shuffled, key=parse_version) == list(versions)
+
+
+def test_semver_spec_precedence():
+    ordered(
+        "1.0.0-alpha",
+        "1.0.0-alpha.1",
+        "1.0.0-alpha.beta",
+        "1.0.0-beta",
+        "1.0.0-beta.2",
+        "1.0.0-beta.11",
+        "1.0.0-rc.1",
+        "1.0.0",
+    )
+
+
+def test_prerelease_sorts_before_release():
+    ordered("1.2.3-rc.1", "1.2.3", "1.2.4-alpha", "1.2.4")
+
+
+def test_numeric_identifiers_compare_numerically():
+    ordered("1.0.0-2", "1.0.0-10", "1.0.0-100")
+    ordered("1.0.0-rc.9", "1.0.0-rc.10")
+
+
+def test_numeric_identifiers_sort_before_alphanumeric():
+    ordered("1.0.0-1", "1.0.0-99999", "1.0.0-a", "1.0.0-alpha")
+    ordered("1.0.0-rc.1", "1.0.0-rc.1a")
+
+
+def test_core_components_compare_numerically():
+    ordered("1.9.0", "1.10.0", "2.0.0", "10.0.0")
+    ordered("0.0.9", "0.0.10", "0.1.0")
+
+
+def test_extra_numeric_components():
+    ordered("1.2.3-rc", "1.2.3", "1.2.3.4-rc", "1.2.3.4", "1.2.3.10", "1.2.4")
+
+
+def test_missing_components_default_to_zero():
+    assert parse_version("1") == parse_version("1.0.0")
+    assert parse_version("1.2") == parse_version("1.2.0")
+    assert parse_version("v1.2.3") == parse_version("1.2.3")
+
+
+@pytest.mark.parametrize("metadata", ["+build.5", "+20240101", "+sha.abc-def"])
+def test_build_metadata_is_ignored(metadata):
+    assert parse_version(f"1.2.3{metadata}") == parse_version("1.2.3")
+    assert parse_version(f"1.2.3-rc.1{metadata}") == parse_version("1.2.3-rc.1")
+
+
+def test_leading_zeros_do_not_change_order():
+    assert parse_version("1.2.3-rc.007") == parse_version("1.2.3-rc.7")
+    ordered("1.2.3-rc.007", "1.2.3-rc.8")
+
+
+def test_non_version_strings_sort_below_releases():
+    ordered("latest", "0.0.0", "0.1.0")
+    ordered("latest", "nightly-a", "nightly-b")
+
+
+@pytest.mark.parametrize(
+    "version",
+    [
+        "20240101123456789012",  # 20-digit build timestamp as the major
+        "1.9223372036854775808.0",  # 2**63
+        "1.2.3.123456789012345678901",
+        "1.2.3-rc.123456789012345678901",
+    ],
+)
+def test_numbers_too_large_for_the_key_sort_as_text(version):
+    key = parse_version(version)
+    assert max(key.major, key.minor, key.patch) <= 2**63 - 1
+    assert key < parse_version("0.0.0")
+
+
+def test_largest_bigint_component_still_parses():
+    assert parse_version("9223372036854775807.0.0").major == 2**63 - 1
+    ordered("9223372036854775806.0.0", "9223372036854775807.0.0")
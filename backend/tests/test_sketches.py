@@ -0,0 +1,60 @@
+"""
+Accuracy and merging of the download analytics sketches in app.utils.sketches.
+"""
+
+import math
+
+import pytest
+
+from app.utils.sketches import HyperLogLog, top_counts
+
+
+def _ips(start: int, count: int) -> list[str]:
+    return [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(start, start + count)]
+
+
+@pytest.mark.parametrize("precision", [11, 14])
+@pytest.mark.parametrize("cardinality", [50, 1_000, 20_000, 200_000])
+def test_estimate_within_expected_error(precision, cardinality):
+    hll = HyperLogLog(precision)
+    for ip in _ips(0, cardinality):
+        hll.add(ip)
+    # Hashing is deterministic, so this is a fixed check; 4 standard errors leaves
+    # room for an unlucky input without hiding a broken estimator.
+    standard_error = 1.04 / math.sqrt(1 << precision)
+    assert abs(hll.count() - cardinality) <= max(2, 4 * standard_error * cardinality)
+
+
+def test_duplicates_do_not_count():
+    hll = HyperLogLog(11)
+    for _ in range(5):
+        for ip in _ips(0, 300):
+            hll.add(ip)
+    assert abs(hll.count() - 300) <= 300 * 4 * 1.04 / math.sqrt(1 << 11)
+
+
+def test_merge_estimates_the_union():
+    a, b, union = HyperLogLog(14), HyperLogLog(14), HyperLogLog(14)
+    for ip in _ips(0, 30_000):
+        a.add(ip)
+        union.add(ip)
+    for ip in _ips(20_000, 30_000):  # overlaps a by 10k
+        b.add(ip)
+        union.add(ip)
+    a.merge(b)
+    assert a.to_bytes() == union.to_bytes()
+    assert abs(a.count() - 50_000) <= 4 * 1.04 / math.sqrt(1 << 14) * 50_000
+
+
+def test_round_trips_through_bytes():
+    hll = HyperLogLog(11)
+    for ip in _ips(0, 1_000):
+        hll.add(ip)
+    restored = HyperLogLog.from_bytes(hll.to_bytes(), 11)
+    assert restored.count() == hll.count()
+    assert HyperLogLog.from_bytes(None, 11).count() == 0
+
+
+def test_top_counts_keeps_the_largest():
+    counts = {1: 5, 2: 50, 3: 7, 4: 50, 5: 1}
+    assert top_counts(counts, 3) == {2: 50, 4: 50, 3: 7}
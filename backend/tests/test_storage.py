@@ -0,0 +1,58 @@
+"""
+Storage keys: a new upload never lands on bytes another row still uses.
+"""
+
+import asyncio
+import hashlib
+import io
+
+import pytest
+from fastapi import UploadFile
+
+from app.services import storage
+from app.services.storage import StorageService, StorageVolume
+from app.storage import LocalBackend
+from app.utils.file_handler import build_storage_path
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    # Quota bookkeeping lives in the database; these tests only look at the bytes.
+    monkeypatch.setattr(storage, "reserve_project_bytes", lambda project_id, size: None)
+    monkeypatch.setattr(storage, "release_project_bytes", lambda project_id, size: None)
+    service = StorageService.__new__(StorageService)
+    service.volumes = {"main": StorageVolume(id="main", backend=LocalBackend(str(tmp_path)), weight=1.0)}
+    return service
+
+
+def _upload(data: bytes, filename: str = "app.apk") -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), size=len(data), filename=filename)
+
+
+def _save(service: StorageService, data: bytes) -> storage.StoredFile:
+    return asyncio.run(service.save_apk(_upload(data), 1, "My App", 7, "1.0.0", "main"))
+
+
+def test_reupload_of_same_name_keeps_referenced_bytes(service):
+    original = _save(service, b"first build" * 1000)
+    # The original row is deleted while a reference row keeps (volume, original.file_path);
+    # the blob stays. Uploading the same name to the same version again:
+    replacement = _save(service, b"second build" * 1000)
+
+    assert replacement.file_path != original.file_path
+    backend = service.volumes["main"].backend
+    kept = b"".join(backend.get(original.file_path))
+    assert hashlib.sha256(kept).hexdigest() == original.sha256
+    assert b"".join(backend.get(replacement.file_path)) == b"second build" * 1000
+
+
+def test_keys_keep_the_upload_name():
+    key = build_storage_path(1, "My App", 7, "1.0.0", "my app.apk", "abc123")
+    assert key.parts[2:] == ("1-My_App", "7-1.0.0", "my_app.abc123.apk")
+
+
+def test_names_that_sanitize_alike_get_distinct_keys():
+    a = build_storage_path(1, "My App", 7, "1.0+a", "app.apk")
+    b = build_storage_path(2, "My_App", 8, "1.0_a", "app.apk")
+    assert a.parts[2:4] == ("1-My_App", "7-1.0_a")
+    assert b.parts[2:4] == ("2-My_App", "8-1.0_a")